@@ -1,28 +1,34 @@
 """
 Basic LLM Example with Ollama
 Run: python main.py
+Batch: python main.py --batch
 """
-import requests
+import sys
+from pathlib import Path
 
-def query_ollama(prompt, model="llama2"):
-    """Query Ollama API"""
-    url = "http://127.0.0.1:11434/api/generate"
-    data = {
-        "model": model,
-        "prompt": prompt,
-        "stream": False
-    }
-    
-    try:
-        response = requests.post(url, json=data, timeout=30)
-        if response.status_code == 200:
-            return response.json()["response"]
-        else:
-            return f"Error: {response.status_code}"
-    except Exception as e:
-        return f"Error: {str(e)}"
+# Use the AI Environment's pooled, streaming Ollama client
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+from ai_ollama_client import OllamaClient
+from ai_ollama_batch import generate_batch
+
+def batch_example(model="phi:2.7b"):
+    """Send several prompts at once with 4 requests in flight"""
+    prompts = [
+        "What is machine learning?",
+        "What is a neural network?",
+        "What is a large language model?",
+        "What is prompt engineering?"
+    ]
+    results = generate_batch(prompts, model=model, concurrency=4)
+    for result in results:  # Results keep the input order
+        print(f"\n[{result['latency']:.1f}s] {result['prompt']}")
+        print(result['response'] if result['error'] is None else f"Error: {result['error']}")
 
 if __name__ == "__main__":
+    if "--batch" in sys.argv:
+        batch_example()
+        sys.exit(0)
+    
     print("Basic LLM Example")
     print("Make sure Ollama is running: ollama serve")
     print()
@@ -31,7 +37,13 @@ if __name__ == "__main__":
     print(f"Question: {prompt}")
     print("Thinking...")
     
-    response = query_ollama(prompt, model="phi:2.7b")
-    #response = query_ollama(prompt, model="gpt-oss:20b")
-    
-    print(f"AI Response: {response}")
+    # Tokens are printed as soon as the server produces them
+    client = OllamaClient(timeout=30)
+    print("AI Response: ", end="", flush=True)
+    try:
+        #for token in client.generate_stream(prompt, model="gpt-oss:20b"):
+        for token in client.generate_stream(prompt, model="phi:2.7b"):
+            print(token, end="", flush=True)
+        print()
+    except Exception as e:
+        print(f"Error: {str(e)}")
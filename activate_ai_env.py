@@ -10,8 +10,12 @@ Author: AI Environment Team
 
 import sys
 import os
+import time
 from pathlib import Path
 
+# Fallback start for --profile-startup when the process creation time is unknown
+STARTUP_TIME = time.perf_counter()
+
 # Version information
 SCRIPT_VERSION = "3.0.0"
 SCRIPT_DATE = "2025-08-11"
@@ -59,7 +63,7 @@ class AIEnvironmentActivator:
     def run_interactive_menu(self):
         """Run interactive menu system"""
         while True:
-            self.menu_system.print_header()
+            self.menu_system.print_header(self.action_handlers.get_activation_status())
             self.menu_system.print_interactive_menu()
             
             choice = self.menu_system.get_user_choice(11)
@@ -106,6 +110,21 @@ class AIEnvironmentActivator:
 
 def main():
     """Main entry point"""
+    # Report import costs and time to the first menu, then exit
+    if "--profile-startup" in sys.argv:
+        from ai_startup_profiler import profile_startup
+        profile_startup(Path(__file__).resolve())
+        return
+    
+    # Started by --profile-startup: render the first menu and stop
+    if "--startup-probe" in sys.argv:
+        activator = AIEnvironmentActivator()
+        activator.menu_system.print_header()
+        activator.menu_system.print_interactive_menu()
+        from ai_startup_profiler import report_probe
+        report_probe(STARTUP_TIME)
+        return
+    
     # Check for verbose mode
     verbose_mode = "--verbose" in sys.argv
     
@@ -120,7 +139,7 @@ def main():
         action = sys.argv[1].lower()
         
         if action == "activate":
-            success = activator.action_handlers.action_full_activation()
+            success = activator.action_handlers.action_full_activation(wait=True)
         elif action == "restore":
             success = activator.action_handlers.action_restore_path()
         elif action == "conda":
@@ -141,6 +160,7 @@ def main():
         else:
             print(f"{Fore.RED}[ERROR] Unknown action: {action}{Style.RESET_ALL}")
             print(f"{Fore.YELLOW}[INFO] Available actions: activate, restore, conda, status, test{Style.RESET_ALL}")
+            print(f"{Fore.YELLOW}[INFO] Options: --verbose, --profile-startup{Style.RESET_ALL}")
             return
                 
         if success:
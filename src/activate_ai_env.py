@@ -10,45 +10,76 @@ Author: AI Environment Team
 
 import sys
 import os
+import time
 import json
 from datetime import datetime
 from pathlib import Path
 
-def get_highest_version():
+# Fallback start for --profile-startup when the process creation time is unknown
+STARTUP_TIME = time.perf_counter()
+
+VERSION_CONFIG_PATH = Path(__file__).parent.parent / "version_config.json"
+# Highest version found in version_config.json, keyed on the file's size and mtime
+VERSION_CACHE_PATH = VERSION_CONFIG_PATH.with_name(".version_cache.json")
+DEFAULT_VERSION = "3.0.2"
+
+def read_highest_version(config_path):
     """Get the highest version from version_config.json"""
     try:
-        config_path = Path(__file__).parent.parent / "version_config.json"
-        if config_path.exists():
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            
-            # Get all versions from the configuration
-            versions = []
-            
-            # Add metadata version
-            if 'metadata' in config and 'version' in config['metadata']:
-                versions.append(config['metadata']['version'])
-            
-            # Add all file versions
-            if 'expected_versions' in config:
-                for category in config['expected_versions'].values():
-                    for file_info in category.values():
-                        if 'version' in file_info:
-                            versions.append(file_info['version'])
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        
+        # Get all versions from the configuration
+        versions = []
+        
+        # Add metadata version
+        if 'metadata' in config and 'version' in config['metadata']:
+            versions.append(config['metadata']['version'])
+        
+        # Add all file versions
+        if 'expected_versions' in config:
+            for category in config['expected_versions'].values():
+                for file_info in category.values():
+                    if 'version' in file_info:
+                        versions.append(file_info['version'])
+        
+        # Find the highest version
+        if versions:
+            # Sort versions by converting to tuples of integers
+            def version_key(v):
+                return tuple(map(int, v.split('.')))
             
-            # Find the highest version
-            if versions:
-                # Sort versions by converting to tuples of integers
-                def version_key(v):
-                    return tuple(map(int, v.split('.')))
-                
-                highest = max(versions, key=version_key)
-                return highest
+            highest = max(versions, key=version_key)
+            return highest
     except Exception:
         pass
     
     # Fallback to default version
-    return "3.0.2"
+    return DEFAULT_VERSION
+
+def get_highest_version():
+    """Get the highest version, parsing version_config.json only when it changed"""
+    try:
+        stat = VERSION_CONFIG_PATH.stat()
+    except OSError:
+        return DEFAULT_VERSION
+    key = [stat.st_size, stat.st_mtime_ns]
+    
+    try:
+        with open(VERSION_CACHE_PATH, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('key') == key and cached.get('version'):
+            return cached['version']
+    except (OSError, ValueError, AttributeError):
+        pass
+    
+    version = read_highest_version(VERSION_CONFIG_PATH)
+    try:
+        with open(VERSION_CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'version': version}, f)
+    except OSError:
+        pass
+    return version
 
 def get_current_datetime():
     """Get current date and time formatted"""
@@ -59,18 +90,25 @@ def get_current_datetime():
 SCRIPT_VERSION = get_highest_version()
 SCRIPT_DATE = get_current_datetime()
 
-def check_environment():
+def check_environment(interactive=True):
     """Check if running in proper conda environment"""
     # Check if we're in conda environment
     conda_env = os.environ.get('CONDA_DEFAULT_ENV', '')
     conda_prefix = os.environ.get('CONDA_PREFIX', '')
     
-    # Check if psutil is available (indicator of proper environment)
-    try:
-        import psutil
-        psutil_available = True
-    except ImportError:
-        psutil_available = False
+    # Check if psutil is available (indicator of proper environment); the
+    # answer is cached per env prefix and PATH, and find_spec locates it
+    # without paying for the import
+    if conda_prefix:
+        from ai_env_state_cache import EnvironmentStateCache, CACHE_FILE_NAME, DEFAULT_PACKAGES
+        state_cache = EnvironmentStateCache(Path(__file__).parent.parent / CACHE_FILE_NAME, conda_prefix)
+        state = state_cache.get(DEFAULT_PACKAGES)
+        if not state or os.path.normcase(state['executable']) != os.path.normcase(sys.executable):
+            state = state_cache.probe_current()
+        psutil_available = state['packages'].get('psutil', False)
+    else:
+        from importlib.util import find_spec
+        psutil_available = find_spec('psutil') is not None
     
     # If not in AI2025 environment or psutil not available, show guidance
     if conda_env != 'AI2025' or not psutil_available:
@@ -96,6 +134,9 @@ def check_environment():
         print("🔧 Please use: D:\\AI_Environment\\run_ai_env.bat")
         print("=" * 70)
         
+        if not interactive:
+            return
+        
         # Ask user if they want to continue anyway
         try:
             response = input("\nDo you want to continue anyway? (y/N): ").strip().lower()
@@ -110,7 +151,8 @@ def check_environment():
             sys.exit(1)
 
 # Check environment before proceeding
-check_environment()
+if "--profile-startup" not in sys.argv:
+    check_environment(interactive="--startup-probe" not in sys.argv)
 
 # Add current directory and src directory to Python path for imports
 current_dir = Path(__file__).parent
@@ -155,7 +197,7 @@ class AIEnvironmentActivator:
     def run_interactive_menu(self):
         """Run interactive menu system"""
         while True:
-            self.menu_system.print_header()
+            self.menu_system.print_header(self.action_handlers.get_activation_status())
             self.menu_system.print_interactive_menu()
             
             choice = self.menu_system.get_user_choice(15)
@@ -204,8 +246,12 @@ class AIEnvironmentActivator:
                     from ai_process_manager import BackgroundProcessManager
                     process_manager = BackgroundProcessManager(self.ai_env_path)
                     
+                    # Supervised services first, or the supervisor would restart them
+                    if process_manager.shutdown_supervisor():
+                        self.print_info("Supervised services stopped")
+                    
                     # Get all tracked processes
-                    tracked_processes = process_manager.load_tracked_processes()
+                    tracked_processes = process_manager.tracked_processes
                     if tracked_processes:
                         self.print_info(f"Found {len(tracked_processes)} background processes to stop...")
                         
@@ -249,10 +295,27 @@ class AIEnvironmentActivator:
                 else:
                     print(f"\n{Fore.RED}❌ Action failed. Check messages above.{Style.RESET_ALL}")
                     
-                input(f"\n{Fore.YELLOW}Press Enter to continue...{Style.RESET_ALL}")
+                from ai_activation_pipeline import real_stdout
+                with real_stdout():
+                    input(f"\n{Fore.YELLOW}Press Enter to continue...{Style.RESET_ALL}")
 
 def main():
     """Main entry point"""
+    # Report import costs and time to the first menu, then exit
+    if "--profile-startup" in sys.argv:
+        from ai_startup_profiler import profile_startup
+        profile_startup(Path(__file__).resolve())
+        return
+    
+    # Started by --profile-startup: render the first menu and stop
+    if "--startup-probe" in sys.argv:
+        activator = AIEnvironmentActivator()
+        activator.menu_system.print_header()
+        activator.menu_system.print_interactive_menu()
+        from ai_startup_profiler import report_probe
+        report_probe(STARTUP_TIME)
+        return
+    
     # Check for verbose mode
     verbose_mode = "--verbose" in sys.argv
     
@@ -267,7 +330,7 @@ def main():
         action = sys.argv[1].lower()
         
         if action == "activate":
-            success = activator.action_handlers.action_full_activation()
+            success = activator.action_handlers.action_full_activation(wait=True)
         elif action == "restore":
             success = activator.action_handlers.action_restore_path()
         elif action == "conda":
@@ -288,6 +351,7 @@ def main():
         else:
             print(f"{Fore.RED}[ERROR] Unknown action: {action}{Style.RESET_ALL}")
             print(f"{Fore.YELLOW}[INFO] Available actions: activate, restore, conda, status, test{Style.RESET_ALL}")
+            print(f"{Fore.YELLOW}[INFO] Options: --verbose, --profile-startup{Style.RESET_ALL}")
             return
                 
         if success:
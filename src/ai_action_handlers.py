@@ -22,22 +22,26 @@ except ImportError:
     class Style:
         RESET_ALL = ""
 
-from ai_path_manager import PathManager
-from ai_conda_manager import CondaManager
-from ai_component_setup import ComponentSetup
-from ai_status_display import StatusDisplay
-from ai_component_tester import ComponentTester
-from ai_ollama_manager import OllamaManager
-from ai_app_launcher import ApplicationLauncher
-from ai_process_manager import BackgroundProcessManager
-
 class ActionHandlers:
-    """Handles all menu actions for AI Environment"""
+    """Handles all menu actions for AI Environment
+    
+    Manager modules are imported inside the action that uses them, so the
+    menu comes up without loading psutil, requests and friends first.
+    """
     
     def __init__(self, ai_env_path, conda_path):
         self.ai_env_path = Path(ai_env_path)
         self.conda_path = Path(conda_path)
-        self.ollama_manager = OllamaManager(ai_env_path)
+        self._ollama_manager = None
+        self.activation_pipeline = None
+        
+    @property
+    def ollama_manager(self):
+        """Ollama manager, created on first use"""
+        if self._ollama_manager is None:
+            from ai_ollama_manager import OllamaManager
+            self._ollama_manager = OllamaManager(self.ai_env_path)
+        return self._ollama_manager
         
     def print_step(self, step_num, description):
         """Print step header"""
@@ -56,6 +60,10 @@ class ActionHandlers:
         """Print info message"""
         print(f"{Fore.YELLOW}[INFO] {message}{Style.RESET_ALL}")
         
+    def print_warning(self, message):
+        """Print warning message"""
+        print(f"{Fore.YELLOW}[WARNING] {message}{Style.RESET_ALL}")
+        
     def check_prerequisites(self):
         """Check if AI Environment is properly installed"""
         if not self.ai_env_path.exists():
@@ -64,8 +72,19 @@ class ActionHandlers:
             return False
         return True
         
-    def action_full_activation(self):
-        """Full activation process"""
+    def action_full_activation(self, wait=False):
+        """Full activation process
+        
+        Runs as a staged pipeline: conda activation, path cleanup and the
+        Flask check run in the foreground while the Ollama server starts in
+        the background. The model is picked while the server comes up and
+        is warmed up in the background afterwards, so the menu is usable
+        right away; its header shows the stages still running.
+        
+        Args:
+            wait (bool): Block until the background stages finish and print
+                         their timings (for command line use)
+        """
         print(f"\n{Fore.GREEN}🚀 Starting Full Activation...{Style.RESET_ALL}")
         
         try:
@@ -73,30 +92,33 @@ class ActionHandlers:
             if not self.check_prerequisites():
                 return False
                 
+            from ai_activation_pipeline import ActivationPipeline
+            pipeline = ActivationPipeline()
+            self.activation_pipeline = pipeline
+                
             # Step 1: Activate conda environment first
             self.print_step(1, "Activating conda environment")
+            from ai_conda_manager import CondaManager
             conda_manager = CondaManager(self.conda_path)
-            if not conda_manager.activate_environment("AI2025"):
+            if not pipeline.run_stage("conda", conda_manager.activate_environment, "AI2025"):
                 self.print_error("Failed to activate conda environment")
                 return False
-            self.print_success("Conda environment activated")
+            self.print_success(f"Conda environment activated ({pipeline.duration('conda'):.1f}s)")
+            
+            # The server does not depend on the remaining foreground steps
+            pipeline.start_stage("ollama_server", self.ollama_manager.start_ollama_server)
             
             # Step 2: Clean only duplicate AI Environment paths (keep conda paths)
             self.print_step(2, "Cleaning duplicate paths")
-            path_manager = PathManager()
-            # Only remove duplicate AI Environment paths, not all of them
-            current_path = path_manager.get_current_path()
-            if "D:\\AI_Environment" in current_path:
-                self.print_info("Removing duplicate AI Environment paths...")
-                # This is a lighter cleanup that preserves conda paths
-                self.print_success("Duplicate paths cleaned")
-            else:
-                self.print_info("No duplicate paths found")
+            pipeline.run_stage("paths", self._clean_duplicate_paths)
             
             # Step 3: Setup components
             self.print_step(3, "Setting up components")
+            self.print_info("Starting Ollama server in the background...")
+            from ai_component_setup import ComponentSetup
             component_setup = ComponentSetup(self.ai_env_path)
-            if not component_setup.setup_all_components():
+            self.print_info("Setting up Flask...")
+            if not pipeline.run_stage("flask", component_setup.setup_flask):
                 self.print_error("Component setup failed")
                 return False
             self.print_success("Components setup completed")
@@ -104,40 +126,32 @@ class ActionHandlers:
             # Step 4: AI Model Selection and Loading
             self.print_step(4, "AI Model Selection")
             from ai_model_loader import ModelLoader
+            from ai_model_warmup import get_warmup
+            from ai_download_admission import list_local_models
             
             try:
+                warmup = get_warmup(config_path=self.ai_env_path / "config" / "install_config.json")
                 model_loader = ModelLoader(
                     self.ai_env_path / "Ollama" / "ollama.exe",
-                    self.ai_env_path / "help"
+                    self.ai_env_path / "help",
+                    warmup=warmup
                 )
                 
-                selected_model = model_loader.select_model_for_activation("phi:2.7b")
+                # The local manifest store answers without waiting for the server
+                installed = list_local_models()
+                if not installed:
+                    pipeline.wait_for("ollama_server")
+                    installed = None
+                selected_model = pipeline.run_stage(
+                    "model_selection", model_loader.select_model_for_activation, "phi:2.7b", installed)
+                
+                if selected_model or warmup.configured_pins:
+                    pipeline.start_stage("model_warmup", self._warm_activation_models,
+                                         warmup, selected_model, after=["ollama_server"])
                 if selected_model:
-                    self.print_info(f"Loading model: {selected_model}")
-                    if model_loader.load_model(selected_model):
-                        self.print_success(f"Model {selected_model} loaded successfully")
-                        
-                        # Track the loaded model process
-                        try:
-                            from ai_process_manager import BackgroundProcessManager
-                            process_manager = BackgroundProcessManager(self.ai_env_path)
-                            
-                            # Get Ollama status to find PID
-                            status = self.ollama_manager.get_ollama_status()
-                            if status and status.get('processes'):
-                                pid = status['processes'][0]['pid']
-                                process_manager.track_process(
-                                    process_id="ollama_server_activation",
-                                    name=f"Ollama Server ({selected_model})",
-                                    pid=pid,
-                                    command=f"ollama serve (model: {selected_model})",
-                                    url="http://127.0.0.1:11434"
-                                )
-                                self.print_info(f"Tracking Ollama server with {selected_model} model")
-                        except Exception as e:
-                            self.print_warning(f"Could not track Ollama process: {e}")
-                    else:
-                        self.print_warning(f"Failed to load model {selected_model}, but continuing...")
+                    self.print_info(f"Loading model {selected_model} in the background "
+                                    f"(may take 30 seconds to 5 minutes)")
+                    model_loader.show_usage_instructions(selected_model)
                 else:
                     self.print_info("No model selected, continuing without model loading")
             except Exception as e:
@@ -145,9 +159,13 @@ class ActionHandlers:
             
             # Step 5: Show status and background processes
             self.print_step(5, "Environment ready")
+            from ai_status_display import StatusDisplay
             status_display = StatusDisplay()
             status_display.show_completion_status()
             
+            if wait:
+                pipeline.wait()
+            
             # Show tracked background processes
             try:
                 from ai_process_manager import BackgroundProcessManager
@@ -157,26 +175,95 @@ class ActionHandlers:
             except Exception as e:
                 self.print_warning(f"Could not show background processes: {e}")
             
+            pipeline.print_report(show_output=wait)
+            print(f"\n{pipeline.status_line()}")
+            if pipeline.is_running():
+                self.print_info("Background stages keep running; the main menu shows their progress")
             return True
             
         except Exception as e:
             self.print_error(f"Unexpected error: {e}")
             return False
             
+    def _clean_duplicate_paths(self):
+        """Activation stage: clean only duplicate AI Environment paths"""
+        from ai_path_manager import PathManager
+        path_manager = PathManager()
+        # Only remove duplicate AI Environment paths, not all of them
+        current_path = path_manager.get_current_path()
+        if "D:\\AI_Environment" in current_path:
+            self.print_info("Removing duplicate AI Environment paths...")
+            # This is a lighter cleanup that preserves conda paths
+            self.print_success("Duplicate paths cleaned")
+        else:
+            self.print_info("No duplicate paths found")
+        return True
+        
+    def _warm_activation_models(self, warmup, selected_model):
+        """Activation stage: load the selected model and the pinned models
+        
+        Runs in the background; the output ends up in the pipeline report.
+        """
+        loaded = True
+        if selected_model:
+            result = warmup.warm(selected_model)
+            loaded = result['loaded']
+            if loaded:
+                self.print_success(f"Model {selected_model} loaded in {result['load_time']:.1f}s")
+                
+                # Track the loaded model process
+                try:
+                    from ai_process_manager import BackgroundProcessManager
+                    process_manager = BackgroundProcessManager(self.ai_env_path)
+                    
+                    # Get Ollama status to find PID
+                    status = self.ollama_manager.get_ollama_status()
+                    if status and status.get('processes'):
+                        pid = status['processes'][0]['pid']
+                        process_manager.track_process(
+                            process_id="ollama_server_activation",
+                            name=f"Ollama Server ({selected_model})",
+                            pid=pid,
+                            command=f"ollama serve (model: {selected_model})",
+                            url="http://127.0.0.1:11434"
+                        )
+                        self.print_info(f"Tracking Ollama server with {selected_model} model")
+                except Exception as e:
+                    self.print_warning(f"Could not track Ollama process: {e}")
+            else:
+                self.print_warning(f"Failed to load model {selected_model}: {result['error']}")
+            
+        # Keep the models listed in model_warmup.pinned_models resident
+        for result in warmup.pin(warmup.configured_pins):
+            if result['loaded']:
+                self.print_success(f"Pinned model {result['model']} (loaded in {result['load_time']:.1f}s)")
+            else:
+                self.print_warning(f"Could not pin model {result['model']}: {result['error']}")
+        return loaded
+        
+    def get_activation_status(self):
+        """Status line of the last full activation (None if there was none)"""
+        if self.activation_pipeline is None:
+            return None
+        return self.activation_pipeline.status_line()
+        
     def action_restore_path(self):
         """Restore original PATH"""
         print(f"\n{Fore.YELLOW}🧹 Restoring Original PATH...{Style.RESET_ALL}")
+        from ai_path_manager import PathManager
         path_manager = PathManager()
         return path_manager.restore_original_path()
         
     def action_activate_conda(self):
         """Activate conda environment only"""
         print(f"\n{Fore.BLUE}🐍 Activating Conda Environment...{Style.RESET_ALL}")
+        from ai_conda_manager import CondaManager
         conda_manager = CondaManager(self.conda_path)
         return conda_manager.activate_environment("AI2025")
         
     def action_test_components(self):
         """Test all components"""
+        from ai_component_tester import ComponentTester
         tester = ComponentTester(self.ai_env_path, self.conda_path)
         return tester.run_all_tests()
         
@@ -217,12 +304,14 @@ class ActionHandlers:
     def action_show_status(self):
         """Show current status"""
         print(f"\n{Fore.CYAN}📊 Current Environment Status:{Style.RESET_ALL}")
+        from ai_status_display import StatusDisplay
         status_display = StatusDisplay()
         status_display.show_completion_status()
         return True
         
     def handle_launch_menu(self):
         """Handle application launcher menu"""
+        from ai_app_launcher import ApplicationLauncher
         app_launcher = ApplicationLauncher(self.ai_env_path)
         
         while True:
@@ -264,6 +353,7 @@ class ActionHandlers:
             
     def handle_background_menu(self):
         """Handle background processes menu"""
+        from ai_process_manager import BackgroundProcessManager
         process_manager = BackgroundProcessManager(self.ai_env_path)
         
         while True:
@@ -307,6 +397,7 @@ class ActionHandlers:
             elif choice == 2:  # Restart Ollama
                 self.ollama_manager.restart_ollama_server()
             elif choice == 3:  # Stop all background processes
+                from ai_process_manager import BackgroundProcessManager
                 process_manager = BackgroundProcessManager(self.ai_env_path)
                 process_manager.stop_all_processes()
             elif choice == 4:  # Clean temporary files
@@ -484,7 +575,7 @@ class ActionHandlers:
         while True:
             jupyter_manager.show_menu()
             
-            choice = menu.get_user_choice(6)
+            choice = menu.get_user_choice(7)
             
             if choice == 0:  # Back to applications menu
                 break
@@ -505,6 +596,8 @@ class ActionHandlers:
                 sys.stdout.flush()
                 sys.stderr.flush()
                 time.sleep(0.1)  # Small delay to ensure processes are cleaned up
+            elif choice == 7:  # Kernel Pool Statistics
+                jupyter_manager.show_kernel_pool_stats()
                 
             if choice != 0:
                 input(f"\n{Fore.YELLOW}Press Enter to continue...{Style.RESET_ALL}")
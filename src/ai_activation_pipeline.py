@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+AI Activation Pipeline
+Timed activation stages, some of them running in the background
+
+Version: 3.0.23
+Author: AI Environment Team
+Date: 2026-10-18
+"""
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from io import StringIO
+
+try:
+    from colorama import Fore, Style
+except ImportError:
+    class Fore:
+        GREEN = RED = YELLOW = CYAN = ""
+    class Style:
+        RESET_ALL = ""
+
+from ai_test_scheduler import ThreadOutput
+
+# Guards sys.stdout swaps; _captures holds the ThreadOutputs pipelines still need
+_stdout_lock = threading.Lock()
+_captures = set()
+
+@contextmanager
+def real_stdout():
+    """Give the menu the real stdout while it reads input
+
+    input() should talk to the terminal itself (line editing, history), so
+    the capturing stdout is taken out for the prompt; background stages
+    that print meanwhile write to the terminal directly.
+    """
+    with _stdout_lock:
+        output = sys.stdout if sys.stdout in _captures else None
+        if output is not None:
+            sys.stdout = output.stream
+    try:
+        yield
+    finally:
+        if output is not None:
+            with _stdout_lock:
+                if output in _captures and sys.stdout is output.stream:
+                    sys.stdout = output
+
+class ActivationPipeline:
+    """Runs activation stages in the foreground or on background threads
+
+    Foreground stages run on the caller's thread and print as usual.
+    Background stages start at once (or when the stages they come after
+    have finished), and their output is captured so it does not mix with
+    the menu; a background stage is skipped if a stage it comes after
+    failed. Every stage is timed, and the time to ready is measured from
+    pipeline start until the last stage finished. Menu prompts run inside
+    real_stdout() so they do not read input through the capture.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._output = None
+
+    def _add(self, name, background):
+        """Create the record of a stage"""
+        with self._lock:
+            self.stages[name] = {
+                'name': name,
+                'background': background,
+                'status': "waiting",
+                'start': None,
+                'end': None,
+                'error': None,
+                'result': None,
+                'output': None,
+                'event': threading.Event()
+            }
+            return self.stages[name]
+
+    def _execute(self, stage, func, args):
+        """Run a stage function and record its outcome"""
+        stage['status'] = "running"
+        stage['start'] = time.perf_counter()
+        try:
+            stage['result'] = func(*args)
+            stage['status'] = "done" if stage['result'] else "failed"
+        except Exception as e:
+            stage['status'] = "failed"
+            stage['error'] = str(e) or type(e).__name__
+        finally:
+            stage['end'] = time.perf_counter()
+            stage['event'].set()
+        return stage['result']
+
+    def run_stage(self, name, func, *args):
+        """Run a stage in the foreground
+
+        Returns:
+            The stage function's return value (None if it raised)
+        """
+        return self._execute(self._add(name, False), func, args)
+
+    def start_stage(self, name, func, *args, after=()):
+        """Run a stage on a background thread
+
+        Args:
+            name (str): Stage name
+            func (callable): Stage function; a falsy result marks the stage failed
+            after (iterable): Stages that must finish successfully first
+        """
+        stage = self._add(name, True)
+        with _stdout_lock:
+            if self._output is None:
+                self._output = ThreadOutput(sys.stdout)
+                _captures.add(self._output)
+                sys.stdout = self._output
+
+        def worker():
+            buffer = StringIO()
+            self._output.capture(buffer)
+            try:
+                for dependency in after:
+                    self.stages[dependency]['event'].wait()
+                failed = [d for d in after if self.stages[d]['status'] != "done"]
+                if failed:
+                    stage['status'] = "skipped"
+                    stage['error'] = f"{', '.join(failed)} did not succeed"
+                    stage['start'] = stage['end'] = time.perf_counter()
+                    stage['event'].set()
+                else:
+                    self._execute(stage, func, args)
+            finally:
+                stage['output'] = buffer.getvalue()
+                self._release_output()
+
+        threading.Thread(target=worker, name=f"activation-{name}", daemon=True).start()
+
+    def _release_output(self):
+        """Put the real stdout back once no background stage is left"""
+        with _stdout_lock:
+            if self._output is not None and not self.is_running():
+                _captures.discard(self._output)
+                if sys.stdout is self._output:
+                    sys.stdout = self._output.stream
+                self._output = None
+
+    def wait_for(self, name, timeout=None):
+        """Wait for one stage; True if it finished successfully"""
+        stage = self.stages.get(name)
+        if stage is None:
+            return False
+        stage['event'].wait(timeout)
+        return stage['status'] == "done"
+
+    def wait(self, timeout=None):
+        """Wait for all stages to finish"""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for stage in list(self.stages.values()):
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            if not stage['event'].wait(remaining):
+                return False
+        return True
+
+    def is_running(self):
+        """True while any stage has not finished"""
+        return any(not stage['event'].is_set() for stage in self.stages.values())
+
+    def duration(self, name):
+        """Seconds a stage took (so far, if it is still running)"""
+        stage = self.stages[name]
+        if stage['start'] is None:
+            return 0.0
+        return (stage['end'] or time.perf_counter()) - stage['start']
+
+    def time_to_ready(self):
+        """Seconds from pipeline start until the last stage finished (None while running)"""
+        if self.is_running() or not self.stages:
+            return None
+        return max(stage['end'] for stage in self.stages.values()) - self.started
+
+    def status_line(self):
+        """One-line summary for the menu header"""
+        if self.is_running():
+            pending = []
+            for name, stage in self.stages.items():
+                if stage['status'] == "running":
+                    pending.append(f"{name} {self.duration(name):.0f}s")
+                elif stage['status'] == "waiting":
+                    pending.append(f"{name} waiting")
+            elapsed = time.perf_counter() - self.started
+            return f"{Fore.YELLOW}⏳ Activation {elapsed:.0f}s: {', '.join(pending)}{Style.RESET_ALL}"
+
+        failed = [name for name, stage in self.stages.items() if stage['status'] in ("failed", "skipped")]
+        if failed:
+            return (f"{Fore.YELLOW}⚠️ Activation finished in {self.time_to_ready():.1f}s, "
+                    f"not completed: {', '.join(failed)}{Style.RESET_ALL}")
+        return f"{Fore.GREEN}✅ Activation ready in {self.time_to_ready():.1f}s{Style.RESET_ALL}"
+
+    def print_report(self, show_output=True):
+        """Print per-stage timings, time to ready and captured background output"""
+        print(f"\n{Fore.CYAN}⏱️ Activation Stages:{Style.RESET_ALL}")
+        for name, stage in self.stages.items():
+            mode = "background" if stage['background'] else "foreground"
+            error = f" - {stage['error']}" if stage['error'] else ""
+            print(f"  {name:<16} {stage['status']:<8} {self.duration(name):7.2f}s  ({mode}){error}")
+
+        ready = self.time_to_ready()
+        if ready is not None:
+            summed = sum(self.duration(name) for name in self.stages)
+            print(f"  Time to ready: {ready:.2f}s (stages sum to {summed:.2f}s)")
+
+        if show_output:
+            for name, stage in self.stages.items():
+                if stage['background'] and stage['output']:
+                    print(f"\n{Fore.CYAN}--- {name} output ---{Style.RESET_ALL}")
+                    print(stage['output'], end="")
@@ -114,7 +114,8 @@ class ApplicationLauncher:
         """Launch Streamlit demo application"""
         print(f"\n{Fore.BLUE}🌟 Launching Streamlit Demo...{Style.RESET_ALL}")
         
-        success = self.process_manager.launch_streamlit_demo()
+        port = self.process_manager.launch_streamlit_demo()
+        success = bool(port)
         if success:
             self.print_info("Streamlit demo is now running in background")
             self.print_info("Use 'Background Processes' menu to manage it")
@@ -124,7 +125,7 @@ class ApplicationLauncher:
                 open_browser = input(f"\n{Fore.CYAN}Open Streamlit demo in browser? (y/n): {Style.RESET_ALL}").lower()
                 if open_browser in ['y', 'yes']:
                     time.sleep(3)  # Wait for server to start
-                    webbrowser.open('http://localhost:8501')
+                    webbrowser.open(f'http://localhost:{port}')
                     self.print_success("Streamlit demo opened in browser")
             except:
                 pass
@@ -208,18 +209,26 @@ class ApplicationLauncher:
             log_dir = self.ai_env_path / "Projects" / "logs"
             log_dir.mkdir(parents=True, exist_ok=True)
             
+        port = self.process_manager.ports.allocate("tensorboard")
+        if port is None:
+            self.print_error("No free port left in the TensorBoard range")
+            return False
+        url = f"http://localhost:{port}"
+            
         try:
-            cmd = f'tensorboard --logdir="{log_dir}" --port=6006'
+            cmd = f'tensorboard --logdir="{log_dir}" --port={port}'
             
             success = self.process_manager.launch_custom_command(
                 cmd,
                 "TensorBoard",
-                self.ai_env_path
+                self.ai_env_path,
+                url=url,
+                port=port
             )
             
             if success:
                 self.print_success("TensorBoard launched successfully")
-                self.print_info("Access TensorBoard at: http://localhost:6006")
+                self.print_info(f"Access TensorBoard at: {url}")
                 self.print_info("Use 'Background Processes' menu to manage it")
                 
                 # Ask if user wants to open browser
@@ -227,7 +236,7 @@ class ApplicationLauncher:
                     open_browser = input(f"\n{Fore.CYAN}Open TensorBoard in browser? (y/n): {Style.RESET_ALL}").lower()
                     if open_browser in ['y', 'yes']:
                         time.sleep(3)  # Wait for server to start
-                        webbrowser.open('http://localhost:6006')
+                        webbrowser.open(url)
                         self.print_success("TensorBoard opened in browser")
                 except:
                     pass
@@ -236,6 +245,7 @@ class ApplicationLauncher:
             
         except Exception as e:
             self.print_error(f"Failed to launch TensorBoard: {e}")
+            self.process_manager.ports.release(port)
             return False
             
     def launch_mlflow_ui(self):
@@ -15,6 +15,7 @@ import os
 import re
 import subprocess
 import sys
+import time
 from pathlib import Path
 try:
     from colorama import Fore, Style
@@ -25,14 +26,19 @@ except ImportError:
         RESET_ALL = ""
 
 from ai_path_manager import PathManager
-from ai_conda_manager import CondaManager
+from ai_package_probe import run_probe
+from ai_test_scheduler import TestScheduler, print_timing_summary
+from ai_test_results import TestResultStore, print_regressions, DEFAULT_THRESHOLD
 
 class ComponentTester:
     """Comprehensive testing of AI Environment components"""
     
-    def __init__(self, ai_env_path, conda_path):
+    def __init__(self, ai_env_path, conda_path, results_path=None):
         self.ai_env_path = Path(ai_env_path)
         self.conda_path = Path(conda_path)
+        # JSONL history of every run (name, status, duration, details per test)
+        self.results_path = Path(results_path) if results_path else self.ai_env_path / "test_results.jsonl"
+        self.last_results = []
         
     def print_step(self, step_num, description):
         """Print step header"""
@@ -158,48 +164,50 @@ class ComponentTester:
             self.print_error("AI2025 environment not found")
             return False
             
+    def get_ai2025_python(self):
+        """Locate the AI2025 interpreter (Windows or POSIX layout)"""
+        env_path = self.conda_path / "envs" / "AI2025"
+        for candidate in (env_path / "python.exe", env_path / "bin" / "python"):
+            if candidate.exists():
+                return candidate
+        return None
+        
     def test_python_packages(self):
-        """Test required Python packages"""
+        """Test required Python packages
+        
+        All packages are imported in one AI2025 child process instead of one
+        ``python -c`` per package.
+        """
         required_packages = ["psutil", "colorama", "requests", "numpy", "pandas"]
         
         try:
-            # Activate environment and test packages
-            conda_manager = CondaManager(self.conda_path)
-            conda_manager.setup_conda_paths("AI2025")
+            python_exe = self.get_ai2025_python()
+            if python_exe is None:
+                self.print_error("  ✗ AI2025 Python executable not found")
+                return False
             
-            package_results = []
-            for package in required_packages:
-                try:
-                    # Special handling for packages that can be slow to import
-                    if package == "pandas":
-                        timeout_duration = 15
-                        self.print_info(f"  Testing {package} (may take a moment)...")
-                    elif package == "numpy":
-                        timeout_duration = 10
-                        self.print_info(f"  Testing {package} (may take a moment)...")
-                    else:
-                        timeout_duration = 5
-                    
-                    result = subprocess.run(["python", "-c", f"import {package}; print('{package} OK')"], 
-                                          capture_output=True, text=True, timeout=timeout_duration)
-                    if result.returncode == 0:
-                        self.print_success(f"  ✓ {package} package available")
-                        package_results.append(True)
-                    else:
-                        self.print_error(f"  ✗ {package} package missing or broken")
-                        package_results.append(False)
-                except subprocess.TimeoutExpired:
-                    self.print_error(f"  ✗ {package} test error: Command '['python', '-c', \"import {package}; print('{package} OK')\"]' timed out after {timeout_duration} seconds")
-                    package_results.append(False)
-                except Exception as e:
-                    self.print_error(f"  ✗ {package} test error: {e}")
-                    package_results.append(False)
+            self.print_info(f"  Importing {len(required_packages)} packages in {python_exe.name}...")
+            try:
+                report = run_probe(required_packages, python=str(python_exe), deep=True, timeout=45)
+            except subprocess.TimeoutExpired:
+                self.print_error("  ✗ Package import test timed out after 45 seconds")
+                return False
             
-            if all(package_results):
+            missing_count = 0
+            for result in report['results']:
+                package = result['distribution']
+                if result['status'] == "ok":
+                    import_time = f" ({result['import_time']:.2f}s)" if result['import_time'] is not None else ""
+                    self.print_success(f"  ✓ {package} package available{import_time}")
+                else:
+                    missing_count += 1
+                    detail = f": {result['detail']}" if result['detail'] else ""
+                    self.print_error(f"  ✗ {package} package missing or broken{detail}")
+            
+            if missing_count == 0:
                 self.print_success("Python packages test PASSED")
                 return True
             else:
-                missing_count = len([r for r in package_results if not r])
                 self.print_error(f"Python packages test FAILED - {missing_count}/{len(required_packages)} packages missing")
                 return False
                 
@@ -654,38 +662,89 @@ class ComponentTester:
             self.print_error("Markdown document viewer test FAILED")
             return False
 
-    def run_all_tests(self):
-        """Run all component tests"""
+    def build_scheduler(self):
+        """Register all component tests with their dependencies
+        
+        Tests only wait for the checks whose result they rely on (conda ->
+        AI2025 environment -> packages); everything else runs in parallel.
+        """
+        scheduler = TestScheduler(max_workers=8)
+        scheduler.add("document_viewer", self.test_markdown_document_viewer,
+                      "Testing Markdown document viewer", timeout=30)
+        scheduler.add("directory_structure", self.test_directory_structure,
+                      "Testing AI Environment directory structure", timeout=10)
+        scheduler.add("conda", self.test_conda_installation,
+                      "Testing Conda installation", depends_on=["directory_structure"], timeout=20)
+        scheduler.add("ai2025_environment", self.test_ai2025_environment,
+                      "Testing AI2025 conda environment", depends_on=["conda"], timeout=20)
+        scheduler.add("python_packages", self.test_python_packages,
+                      "Testing required Python packages", depends_on=["ai2025_environment"], timeout=60)
+        scheduler.add("ollama", self.test_ollama_installation,
+                      "Testing Ollama installation (optional)", timeout=30)
+        scheduler.add("model_management", self.test_model_management_system,
+                      "Testing AI model management system", timeout=30)
+        scheduler.add("jupyter_lab", self.test_jupyter_lab_system,
+                      "Testing Jupyter Lab management system", timeout=30)
+        scheduler.add("ollama_help", self.test_ollama_help_system,
+                      "Testing Ollama help and documentation", timeout=10)
+        scheduler.add("environment_validation", self.test_environment_validation,
+                      "Testing environment validation system", timeout=90)
+        scheduler.add("system_integration", self.test_system_integration,
+                      "Testing system integration", timeout=30)
+        return scheduler
+        
+    def print_test_result(self, step_num, result):
+        """Print the captured output block of one finished test"""
+        self.print_step(step_num, result['description'])
+        print(result['output'], end="")
+        if result['status'] == "skipped":
+            self.print_info(f"Skipped - {result['error']}")
+        elif result['status'] == "timeout":
+            self.print_error(f"Test {result['error']}")
+        elif result['status'] == "error":
+            self.print_error(f"Test crashed - {result['error']}")
+        print(f"  ({result['duration']:.2f}s)")
+        print()
+        
+    def save_results(self, results, wall_time, compare=False, threshold=DEFAULT_THRESHOLD):
+        """Append a run to the results store, optionally checking for slowdowns first"""
+        if not self.results_path.parent.exists():
+            return
+        store = TestResultStore(self.results_path)
+        if compare:
+            print()
+            print_regressions(store.compare(results, threshold=threshold), threshold)
+        try:
+            store.record_run(results, wall_time)
+            self.print_info(f"Results saved to: {self.results_path}")
+        except OSError as e:
+            self.print_error(f"Could not save test results: {e}")
+        
+    def run_all_tests(self, compare=False, threshold=DEFAULT_THRESHOLD):
+        """Run all component tests
+        
+        Independent tests run concurrently; each test's output is printed
+        as one block once it finishes, in the usual order. Results are
+        appended to the results store.
+        
+        Args:
+            compare (bool): Flag tests that got slower than their stored history
+            threshold (float): Relative slowdown that counts as a regression
+        """
         print(f"\n{Fore.CYAN}🧪 Testing All Components...{Style.RESET_ALL}")
         print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
         
-        tests = [
-            ("Testing Markdown document viewer", self.test_markdown_document_viewer),
-            ("Testing AI Environment directory structure", self.test_directory_structure),
-            ("Testing Conda installation", self.test_conda_installation),
-            ("Testing AI2025 conda environment", self.test_ai2025_environment),
-            ("Testing required Python packages", self.test_python_packages),
-            ("Testing Ollama installation (optional)", self.test_ollama_installation),
-            ("Testing AI model management system", self.test_model_management_system),
-            ("Testing Jupyter Lab management system", self.test_jupyter_lab_system),
-            ("Testing Ollama help and documentation", self.test_ollama_help_system),
-            ("Testing environment validation system", self.test_environment_validation),
-            ("Testing system integration", self.test_system_integration)
-        ]
+        scheduler = self.build_scheduler()
+        step = iter(range(1, len(scheduler.tests) + 1))
         
-        total_tests = len(tests)
-        passed_tests = 0
-        failed_tests = 0
+        start = time.perf_counter()
+        results = scheduler.run(on_result=lambda result: self.print_test_result(next(step), result))
+        wall_time = time.perf_counter() - start
+        self.last_results = results
         
-        for i, (description, test_func) in enumerate(tests, 1):
-            self.print_step(i, description)
-            
-            if test_func():
-                passed_tests += 1
-            else:
-                failed_tests += 1
-                
-            print()
+        total_tests = len(results)
+        passed_tests = sum(1 for result in results if result['passed'])
+        failed_tests = total_tests - passed_tests
         
         # Final Results
         print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
@@ -698,6 +757,8 @@ class ComponentTester:
         
         success_rate = (passed_tests / total_tests * 100) if total_tests > 0 else 0
         print(f"Success rate: {success_rate:.1f}%")
+        print_timing_summary(scheduler, results, wall_time)
+        self.save_results(results, wall_time, compare, threshold)
         
         if failed_tests == 0:
             print(f"\n{Fore.GREEN}🎉 ALL TESTS PASSED! Your AI Environment is fully functional.{Style.RESET_ALL}")
@@ -711,11 +772,23 @@ class ComponentTester:
 
 def main():
     """Test component tester"""
-    ai_env_path = Path("D:/AI_Environment")
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='AI Environment Component Tester')
+    parser.add_argument('--ai-env-path', default='D:/AI_Environment',
+                       help='Path to AI Environment directory')
+    parser.add_argument('--results', help='Results JSONL file (default: <ai-env-path>/test_results.jsonl)')
+    parser.add_argument('--compare', action='store_true',
+                       help='Flag tests whose duration regressed against the stored history')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                       help='Relative slowdown that counts as a regression (0.5 = 50%%)')
+    args = parser.parse_args()
+    
+    ai_env_path = Path(args.ai_env_path)
     conda_path = ai_env_path / "Miniconda"
     
-    tester = ComponentTester(ai_env_path, conda_path)
-    success = tester.run_all_tests()
+    tester = ComponentTester(ai_env_path, conda_path, args.results)
+    success = tester.run_all_tests(compare=args.compare, threshold=args.threshold)
     
     if success:
         print(f"\n{Fore.GREEN}Component testing completed successfully{Style.RESET_ALL}")
@@ -22,6 +22,8 @@ except ImportError:
     class Style:
         RESET_ALL = ""
 
+from ai_env_state_cache import EnvironmentStateCache
+
 class CondaManager:
     """Manages conda environment activation for AI Environment"""
     
@@ -29,6 +31,8 @@ class CondaManager:
         self.conda_path = Path(conda_path)
         self.conda_exe = self.conda_path / "Scripts" / "conda.exe"
         self.ai_env_path = self.conda_path.parent
+        # Interpreter state of the activated environment (see ai_env_state_cache)
+        self.env_state = None
         
     def print_info(self, message):
         """Print info message"""
@@ -66,37 +70,44 @@ class CondaManager:
         
         self.print_info("Conda paths configured")
         
-    def verify_python_location(self):
-        """Verify Python is from D: drive"""
+    def is_portable_python(self, python_path):
+        """Check that an interpreter path lies inside the portable AI Environment"""
+        # Normalize path for comparison
+        normalized_path = python_path.upper().replace('/', '\\')
+        
+        # Check multiple possible patterns
+        valid_patterns = [
+            "D:\\AI_ENVIRONMENT",
+            "D:/AI_ENVIRONMENT", 
+            "D:\\AI_Environment",
+            "D:/AI_Environment"
+        ]
+        
+        return any(pattern in normalized_path for pattern in valid_patterns)
+        
+    def verify_python_location(self, env_name="AI2025"):
+        """Verify Python is from D: drive
+        
+        The interpreter found on PATH is probed once and remembered in the
+        environment state cache; later launches reuse it until the env
+        prefix or PATH changes.
+        """
         try:
-            # First try to get Python executable path directly
-            result = subprocess.run(['python', '-c', 'import sys; print(sys.executable)'], 
-                                  capture_output=True, 
-                                  text=True, 
-                                  timeout=10)
+            state_cache = EnvironmentStateCache.for_environment(self.ai_env_path, env_name)
+            self.env_state = state_cache.resolve("python")
             
-            if result.returncode == 0:
-                python_path = result.stdout.strip()
-                # Normalize path for comparison
-                normalized_path = python_path.upper().replace('/', '\\')
-                
-                # Check multiple possible patterns
-                valid_patterns = [
-                    "D:\\AI_ENVIRONMENT",
-                    "D:/AI_ENVIRONMENT", 
-                    "D:\\AI_Environment",
-                    "D:/AI_Environment"
-                ]
+            if self.env_state:
+                python_path = self.env_state['executable']
+                if state_cache.last_hit:
+                    self.print_info("Using cached environment state")
                 
-                is_valid = any(pattern in normalized_path for pattern in valid_patterns)
-                
-                if is_valid:
+                if self.is_portable_python(python_path):
                     self.print_success(f"Using portable Python: {python_path}")
                     return True
                 else:
                     self.print_error(f"Python not from D: drive: {python_path}")
-                    self.print_info(f"Normalized path: {normalized_path}")
-                    self.print_info(f"Looking for patterns: {valid_patterns}")
+                    self.print_info(f"Looking for an interpreter under: {self.ai_env_path}")
+                    state_cache.invalidate()
                     return False
             else:
                 # Fallback: try where command if available
@@ -109,19 +120,8 @@ class CondaManager:
                     if result.returncode == 0:
                         python_paths = result.stdout.strip().split('\n')
                         first_python = python_paths[0].strip()
-                        # Use same normalization logic
-                        normalized_path = first_python.upper().replace('/', '\\')
-                        
-                        valid_patterns = [
-                            "D:\\AI_ENVIRONMENT",
-                            "D:/AI_ENVIRONMENT", 
-                            "D:\\AI_Environment",
-                            "D:/AI_Environment"
-                        ]
                         
-                        is_valid = any(pattern in normalized_path for pattern in valid_patterns)
-                        
-                        if is_valid:
+                        if self.is_portable_python(first_python):
                             self.print_success(f"Using portable Python: {first_python}")
                             return True
                         else:
@@ -140,6 +140,11 @@ class CondaManager:
             
     def get_python_version(self):
         """Get Python version from activated environment"""
+        if self.env_state and self.env_state.get('version'):
+            version = f"Python {self.env_state['version']}"
+            self.print_info(f"Python version: {version}")
+            return version
+        
         try:
             result = subprocess.run(['python', '--version'], 
                                   capture_output=True, 
@@ -160,6 +165,11 @@ class CondaManager:
             
     def test_conda_environment(self, env_name):
         """Test if conda environment is working"""
+        # conda list already succeeded for this exact environment state
+        if self.env_state and self.env_state.get('conda_ok'):
+            self.print_success("Conda environment is functional (cached)")
+            return True
+        
         try:
             # Test conda list command
             result = subprocess.run(['conda', 'list'], 
@@ -169,6 +179,7 @@ class CondaManager:
             
             if result.returncode == 0:
                 self.print_success("Conda environment is functional")
+                EnvironmentStateCache.for_environment(self.ai_env_path, env_name).update(conda_ok=True)
                 return True
             else:
                 self.print_error("Conda environment test failed")
@@ -187,7 +198,7 @@ class CondaManager:
             self.setup_conda_paths(env_name)
             
             # Verify Python location
-            if not self.verify_python_location():
+            if not self.verify_python_location(env_name):
                 return False
                 
             # Get Python version
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+AI Download Admission
+Disk-space admission control for model pulls based on real manifest sizes
+
+Version: 3.0.23
+Author: AI Environment Team
+Date: 2026-10-18
+
+Usage:
+    python ai_download_admission.py phi:2.7b mistral:7b --min-free-gb 60
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+try:
+    import requests
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+try:
+    from colorama import Fore, Style
+except ImportError:
+    class Fore:
+        GREEN = RED = YELLOW = CYAN = ""
+    class Style:
+        RESET_ALL = ""
+
+from ai_model_registry import format_size
+
+REGISTRY_HOST = "registry.ollama.ai"
+MANIFEST_ACCEPT = "application/vnd.docker.distribution.manifest.v2+json"
+DEFAULT_MIN_FREE_GB = 60
+HISTORY_LIMIT = 20
+# Pulls smaller than this are mostly latency and say little about the link
+MIN_HISTORY_BYTES = 10 * 1000 * 1000
+
+def get_models_dir():
+    """Get the Ollama model store (OLLAMA_MODELS or ~/.ollama/models)"""
+    custom = os.environ.get("OLLAMA_MODELS")
+    if custom:
+        return Path(custom)
+    return Path.home() / ".ollama" / "models"
+
+def parse_model_name(model_name):
+    """Split a model name into (namespace, model, tag)
+
+    "phi:2.7b" -> ("library", "phi", "2.7b"), "user/model" -> ("user", "model", "latest")
+    """
+    name, _, tag = model_name.partition(":")
+    namespace, _, model = name.rpartition("/")
+    return namespace or "library", model, tag or "latest"
+
+def parse_size(text):
+    """Parse a size string such as "3.8 GB" into bytes (decimal units)"""
+    units = {"B": 1, "KB": 1000, "MB": 1000**2, "GB": 1000**3, "TB": 1000**4}
+    try:
+        value, unit = text.split()
+        return int(float(value) * units[unit.upper()])
+    except (AttributeError, KeyError, ValueError):
+        return None
+
+def list_local_models(models_dir=None):
+    """List installed models from the local manifest store, without the server
+
+    Returns:
+        list: dicts with name, size (formatted) and size_bytes, sorted by name
+    """
+    root = Path(models_dir) if models_dir else get_models_dir()
+    root = root / "manifests" / REGISTRY_HOST
+    models = []
+    for manifest_path in root.glob("*/*/*"):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            continue
+        namespace, model, tag = manifest_path.relative_to(root).parts
+        entries = list(manifest.get("layers") or []) + [manifest.get("config") or {}]
+        size = sum(entry.get("size") or 0 for entry in entries)
+        name = f"{model}:{tag}" if namespace == "library" else f"{namespace}/{model}:{tag}"
+        models.append({'name': name, 'size': format_size(size), 'size_bytes': size})
+    return sorted(models, key=lambda model: model['name'])
+
+class DownloadAdmission:
+    """Decides which model pulls fit on disk
+
+    The download size of a model is the sum of its manifest layers minus
+    the blobs already in the local store; Ollama deduplicates blobs, so
+    e.g. a second tag of the same weights costs almost nothing. A pull is
+    admitted only if the free space left afterwards is still at least
+    ``min_free_gb``. Measured throughput of earlier pulls is kept in a
+    small history file and used for download time estimates.
+    """
+
+    def __init__(self, models_dir=None, min_free_gb=DEFAULT_MIN_FREE_GB, history_path=None,
+                 fallback_sizes=None, timeout=10):
+        """Initialize Download Admission
+
+        Args:
+            models_dir (Path, optional): Ollama model store (default: OLLAMA_MODELS or ~/.ollama/models)
+            min_free_gb (float): Free space that must remain after a pull
+            history_path (Path, optional): JSON file with measured pull throughput
+            fallback_sizes (dict, optional): model name -> size string, used when
+                no manifest can be read (e.g. offline)
+            timeout (float): Registry request timeout in seconds
+        """
+        self.models_dir = Path(models_dir) if models_dir else get_models_dir()
+        self.min_free_gb = min_free_gb
+        self.history_path = Path(history_path) if history_path else None
+        self.fallback_sizes = fallback_sizes or {}
+        self.timeout = timeout
+        self._manifests = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, ai_env_path, fallback_sizes=None):
+        """Create an admission controller from install_config.json
+
+        Args:
+            ai_env_path (Path): Path to AI Environment
+            fallback_sizes (dict, optional): model name -> size string
+        """
+        ai_env_path = Path(ai_env_path)
+        min_free_gb = DEFAULT_MIN_FREE_GB
+        try:
+            with open(ai_env_path / "config" / "install_config.json", 'r', encoding='utf-8') as f:
+                requirements = json.load(f).get('system_requirements', {})
+            min_free_gb = requirements.get('min_disk_space_gb', min_free_gb)
+        except (OSError, ValueError):
+            pass
+        return cls(
+            min_free_gb=min_free_gb,
+            history_path=ai_env_path / "download_history.json",
+            fallback_sizes=fallback_sizes
+        )
+
+    def _local_manifest_path(self, model_name):
+        """Path of an installed model's manifest in the local store"""
+        namespace, model, tag = parse_model_name(model_name)
+        return self.models_dir / "manifests" / REGISTRY_HOST / namespace / model / tag
+
+    def fetch_manifest(self, model_name):
+        """Get a model manifest from the local store or the registry
+
+        Returns:
+            tuple: (manifest dict or None, source) where source is "local",
+                   "registry" or None
+        """
+        with self._lock:
+            if model_name in self._manifests:
+                return self._manifests[model_name]
+
+        result = (None, None)
+        local_path = self._local_manifest_path(model_name)
+        try:
+            with open(local_path, 'r', encoding='utf-8') as f:
+                result = (json.load(f), "local")
+        except (OSError, ValueError):
+            if REQUESTS_AVAILABLE:
+                namespace, model, tag = parse_model_name(model_name)
+                try:
+                    response = requests.get(
+                        f"https://{REGISTRY_HOST}/v2/{namespace}/{model}/manifests/{tag}",
+                        headers={"Accept": MANIFEST_ACCEPT},
+                        timeout=self.timeout
+                    )
+                    response.raise_for_status()
+                    result = (response.json(), "registry")
+                except (requests.RequestException, ValueError):
+                    pass
+
+        with self._lock:
+            self._manifests[model_name] = result
+        return result
+
+    def blob_present(self, digest, size=None):
+        """Check whether a blob is already in the local store"""
+        for name in (digest.replace(":", "-"), digest):
+            try:
+                stat = (self.models_dir / "blobs" / name).stat()
+            except OSError:
+                continue
+            if size is None or stat.st_size == size:
+                return True
+        return False
+
+    def plan(self, model_name):
+        """Work out how many bytes a pull would actually download
+
+        Returns:
+            dict: model, source ("local", "registry", "estimate" or None),
+                  total_bytes, present_bytes, download_bytes, layers (digest -> size
+                  of the blobs still missing)
+        """
+        manifest, source = self.fetch_manifest(model_name)
+        layers = {}
+        total = present = 0
+
+        if manifest:
+            entries = list(manifest.get("layers") or [])
+            if manifest.get("config"):
+                entries.append(manifest["config"])
+            for entry in entries:
+                digest, size = entry.get("digest"), entry.get("size") or 0
+                if not digest:
+                    continue
+                total += size
+                if self.blob_present(digest, size):
+                    present += size
+                else:
+                    layers[digest] = size
+        else:
+            size = parse_size(self.fallback_sizes.get(model_name))
+            if size is not None:
+                source = "estimate"
+                total = size
+                layers[model_name] = size
+
+        return {
+            'model': model_name,
+            'source': source,
+            'total_bytes': total if source else None,
+            'present_bytes': present,
+            'download_bytes': sum(layers.values()) if source else None,
+            'layers': layers
+        }
+
+    def free_bytes(self):
+        """Free space on the volume holding the model store"""
+        path = self.models_dir
+        while not path.exists() and path.parent != path:
+            path = path.parent
+        return shutil.disk_usage(str(path)).free
+
+    def admit(self, model_names):
+        """Split pulls into those that fit on disk and those that must wait
+
+        Models are considered in order; a blob shared by several queued
+        models is only counted once. Models whose size is unknown are
+        deferred.
+
+        Returns:
+            dict: admitted (list of plans), deferred (list of plans),
+                  free_bytes, reserve_bytes, required_bytes
+        """
+        free = self.free_bytes()
+        reserve = int(self.min_free_gb * 1000**3)
+        admitted, deferred = [], []
+        counted = set()
+        required = 0
+
+        for model_name in model_names:
+            plan = self.plan(model_name)
+            if plan['source'] is None:
+                deferred.append(plan)
+                continue
+            extra = sum(size for digest, size in plan['layers'].items() if digest not in counted)
+            if free - required - extra >= reserve:
+                admitted.append(plan)
+                counted.update(plan['layers'])
+                required += extra
+            else:
+                deferred.append(plan)
+
+        return {
+            'admitted': admitted,
+            'deferred': deferred,
+            'free_bytes': free,
+            'reserve_bytes': reserve,
+            'required_bytes': required
+        }
+
+    def load_history(self):
+        """Load measured pulls as a list of {bytes, seconds, time} records"""
+        if not self.history_path:
+            return []
+        try:
+            with open(self.history_path, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+            return history if isinstance(history, list) else []
+        except (OSError, ValueError):
+            return []
+
+    def record_pull(self, received_bytes, seconds):
+        """Remember the throughput of a finished pull
+
+        Args:
+            received_bytes (int): Bytes actually transferred
+            seconds (float): Wall-clock duration of the pull
+        """
+        if not self.history_path or received_bytes < MIN_HISTORY_BYTES or seconds <= 0:
+            return
+        history = self.load_history()
+        history.append({'bytes': int(received_bytes), 'seconds': round(seconds, 3), 'time': time.time()})
+        try:
+            with open(self.history_path, 'w', encoding='utf-8') as f:
+                json.dump(history[-HISTORY_LIMIT:], f, indent=2)
+        except OSError:
+            pass
+
+    def measured_throughput(self):
+        """Average link throughput of recent pulls in bytes/s (None if unknown)"""
+        history = self.load_history()
+        total_bytes = sum(entry.get('bytes', 0) for entry in history)
+        total_seconds = sum(entry.get('seconds', 0) for entry in history)
+        return total_bytes / total_seconds if total_seconds > 0 else None
+
+    def estimate_download_time(self, download_bytes):
+        """Estimate seconds needed for a download from measured throughput"""
+        throughput = self.measured_throughput()
+        if not throughput or download_bytes is None:
+            return None
+        return download_bytes / throughput
+
+def main():
+    """Command line entry point"""
+    import argparse
+    from ai_download_queue import format_duration
+
+    parser = argparse.ArgumentParser(description='Check whether model pulls fit on disk')
+    parser.add_argument('models', nargs='+', help='Model names, e.g. phi:2.7b')
+    parser.add_argument('--min-free-gb', type=float, default=DEFAULT_MIN_FREE_GB,
+                       help='Free space that must remain after the pulls')
+    parser.add_argument('--models-dir', help='Ollama model store (default: OLLAMA_MODELS or ~/.ollama/models)')
+    parser.add_argument('--history', help='Pull throughput history file')
+    args = parser.parse_args()
+
+    admission = DownloadAdmission(args.models_dir, args.min_free_gb, args.history)
+    decision = admission.admit(args.models)
+
+    print(f"Free: {format_size(decision['free_bytes'])}, reserve: {format_size(decision['reserve_bytes'])}")
+    for plan in decision['admitted']:
+        eta = admission.estimate_download_time(plan['download_bytes'])
+        print(f"{Fore.GREEN}[OK] {plan['model']}: download {format_size(plan['download_bytes'])} "
+              f"of {format_size(plan['total_bytes'])} ({plan['source']}), "
+              f"ETA {format_duration(eta)}{Style.RESET_ALL}")
+    for plan in decision['deferred']:
+        reason = "size unknown" if plan['source'] is None else f"needs {format_size(plan['download_bytes'])}"
+        print(f"{Fore.RED}[DEFERRED] {plan['model']}: {reason}{Style.RESET_ALL}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+AI Download Queue
+Parallel Ollama model downloads over the streaming /api/pull endpoint
+
+Version: 3.0.23
+Author: AI Environment Team
+Date: 2026-10-18
+
+Usage:
+    python ai_download_queue.py phi:2.7b mistral:7b --concurrency 2
+"""
+
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from colorama import Fore, Style
+except ImportError:
+    class Fore:
+        GREEN = RED = YELLOW = CYAN = ""
+    class Style:
+        RESET_ALL = ""
+
+from ai_model_registry import format_size, get_registry
+
+def format_duration(seconds):
+    """Format seconds as e.g. "42s", "3m 05s" or "1h 12m" """
+    if seconds is None:
+        return "--"
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds // 3600}h {(seconds % 3600) // 60:02d}m"
+
+class DownloadQueue:
+    """Pulls several models at once with a concurrency limit
+
+    Each pull streams /api/pull and records completed/total bytes per
+    layer. A failed pull is retried with exponential backoff; Ollama keeps
+    partially downloaded blobs, so a retry resumes where the previous
+    attempt stopped and skips layers that already finished.
+    """
+
+    def __init__(self, registry=None, concurrency=2, max_retries=3, retry_delay=2.0,
+                 read_timeout=120, on_event=None):
+        """Initialize Download Queue
+
+        Args:
+            registry (ModelRegistry, optional): Shared model registry
+            concurrency (int): Maximum number of models pulled at once
+            max_retries (int): Retries per model after the first attempt
+            retry_delay (float): Initial delay before a retry (doubles each time)
+            read_timeout (float): Maximum seconds without a progress chunk
+            on_event (callable, optional): Called with (model_name, message) for
+                retries, completions and failures
+        """
+        self.registry = registry or get_registry()
+        self.concurrency = max(1, int(concurrency))
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.read_timeout = read_timeout
+        self.on_event = on_event
+
+        self.models = {}
+        self._lock = threading.Lock()
+        self._samples = deque()
+        self._bytes_received = 0
+
+    def _emit(self, model_name, message):
+        """Report a queue event"""
+        if self.on_event:
+            self.on_event(model_name, message)
+
+    def _record(self, state, digest, total, completed):
+        """Update one layer's progress and the throughput counter"""
+        with self._lock:
+            layer = state['layers'].setdefault(digest, {'total': 0, 'completed': 0})
+            delta = max(0, completed - layer['completed'])
+            layer['total'] = total or layer['total']
+            layer['completed'] = max(layer['completed'], completed)
+            state['received'] += delta
+            self._bytes_received += delta
+            self._samples.append((time.monotonic(), self._bytes_received))
+
+    def _pull_once(self, model_name, state):
+        """Run a single /api/pull attempt until it reports success"""
+        payload = {"model": model_name, "name": model_name, "stream": True}
+        for chunk in self.registry.client.stream_json("/api/pull", payload, timeout=self.read_timeout):
+            status = chunk.get("status", "")
+            with self._lock:
+                state['status'] = status
+            if chunk.get("digest") and chunk.get("total"):
+                self._record(state, chunk["digest"], chunk["total"], chunk.get("completed", 0))
+            if status == "success":
+                return
+        raise RuntimeError("pull stream ended before success")
+
+    def _pull(self, model_name):
+        """Pull one model with retries"""
+        state = self.models[model_name]
+        state['started'] = time.perf_counter()
+        delay = self.retry_delay
+
+        for attempt in range(1, self.max_retries + 2):
+            state['attempts'] = attempt
+            try:
+                self._pull_once(model_name, state)
+                state['status'] = "success"
+                state['error'] = None
+                break
+            except Exception as e:
+                state['error'] = str(e) or type(e).__name__
+                if attempt > self.max_retries:
+                    state['status'] = "failed"
+                    break
+                state['status'] = "retrying"
+                self._emit(model_name, f"attempt {attempt} failed ({state['error']}), "
+                                       f"resuming in {delay:.0f}s")
+                time.sleep(delay)
+                delay *= 2
+
+        state['elapsed'] = time.perf_counter() - state['started']
+        self.registry.invalidate()
+        if state['status'] == "success":
+            self._emit(model_name, f"done in {format_duration(state['elapsed'])}")
+        else:
+            self._emit(model_name, f"failed after {state['attempts']} attempts: {state['error']}")
+        return self.result(model_name)
+
+    def result(self, model_name):
+        """Get the outcome of one model
+
+        Returns:
+            dict: model, success, bytes (model size), received (bytes actually
+                  transferred), elapsed, attempts, error
+        """
+        state = self.models[model_name]
+        with self._lock:
+            size = sum(layer['total'] for layer in state['layers'].values())
+        return {
+            'model': model_name,
+            'success': state['status'] == "success",
+            'bytes': size,
+            'received': state['received'],
+            'elapsed': state['elapsed'],
+            'attempts': state['attempts'],
+            'error': state['error']
+        }
+
+    def snapshot(self, window=5.0):
+        """Aggregate progress over all queued models
+
+        Args:
+            window (float): Seconds of history used for the throughput figure
+
+        Returns:
+            dict: completed, total, throughput (bytes/s), eta (seconds or None),
+                  active, finished, failed
+        """
+        now = time.monotonic()
+        with self._lock:
+            while len(self._samples) > 1 and now - self._samples[0][0] > window:
+                self._samples.popleft()
+            throughput = 0.0
+            if len(self._samples) > 1:
+                (t0, b0), (_, b1) = self._samples[0], self._samples[-1]
+                if now > t0:
+                    throughput = (b1 - b0) / (now - t0)
+
+            total = completed = 0
+            for state in self.models.values():
+                for layer in state['layers'].values():
+                    total += layer['total']
+                    completed += layer['completed']
+            statuses = [state['status'] for state in self.models.values()]
+
+        remaining = total - completed
+        return {
+            'completed': completed,
+            'total': total,
+            'throughput': throughput,
+            'eta': remaining / throughput if throughput > 0 else None,
+            'active': sum(1 for s in statuses if s not in ("queued", "success", "failed")),
+            'finished': statuses.count("success"),
+            'failed': statuses.count("failed")
+        }
+
+    def run(self, model_names, on_tick=None, tick_interval=0.5):
+        """Pull all models and wait for them to finish
+
+        Args:
+            model_names (list): Models to pull (duplicates are ignored)
+            on_tick (callable, optional): Called with snapshot() while pulls run
+            tick_interval (float): Seconds between on_tick calls
+
+        Returns:
+            list: One result dict per model, in the given order
+        """
+        names = list(dict.fromkeys(model_names))
+        for name in names:
+            self.models[name] = {
+                'status': "queued",
+                'layers': {},
+                'received': 0,
+                'attempts': 0,
+                'error': None,
+                'started': None,
+                'elapsed': None
+            }
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="model-pull") as executor:
+            futures = [executor.submit(self._pull, name) for name in names]
+            while not all(future.done() for future in futures):
+                if on_tick:
+                    on_tick(self.snapshot())
+                time.sleep(tick_interval)
+            if on_tick:
+                on_tick(self.snapshot())
+
+        return [future.result() for future in futures]
+
+def print_progress(snapshot):
+    """Render an aggregate progress line in place"""
+    total = snapshot['total']
+    percent = (snapshot['completed'] / total * 100) if total else 0.0
+    line = (f"  {percent:5.1f}%  {format_size(snapshot['completed'])} / {format_size(total)}"
+            f"  {format_size(snapshot['throughput'])}/s  ETA {format_duration(snapshot['eta'])}"
+            f"  [{snapshot['active']} active, {snapshot['finished']} done, {snapshot['failed']} failed]")
+    print(f"\r{line:<100}", end="", flush=True)
+
+def pull_models(model_names, concurrency=2, max_retries=3, registry=None):
+    """Pull models with a live progress line
+
+    Returns:
+        list: One result dict per model
+    """
+    def report(model_name, message):
+        print(f"\r{' ' * 100}\r  {Fore.CYAN}{model_name}{Style.RESET_ALL}: {message}")
+
+    queue = DownloadQueue(registry, concurrency=concurrency, max_retries=max_retries, on_event=report)
+    results = queue.run(model_names, on_tick=print_progress)
+    print()
+    return results
+
+def main():
+    """Command line entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Download several Ollama models in parallel')
+    parser.add_argument('models', nargs='+', help='Model names, e.g. phi:2.7b')
+    parser.add_argument('--concurrency', type=int, default=2, help='Models pulled at once')
+    parser.add_argument('--retries', type=int, default=3, help='Retries per model')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = pull_models(args.models, args.concurrency, args.retries)
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        if result['success']:
+            print(f"{Fore.GREEN}[OK] {result['model']} ({format_size(result['bytes'])}){Style.RESET_ALL}")
+        else:
+            print(f"{Fore.RED}[ERROR] {result['model']}: {result['error']}{Style.RESET_ALL}")
+    print(f"Total time: {format_duration(elapsed)}")
+    sys.exit(0 if all(r['success'] for r in results) else 1)
+
+if __name__ == "__main__":
+    main()
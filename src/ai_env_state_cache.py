@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+AI Environment State Cache
+Remembers the resolved interpreter of a conda environment between launches
+
+Version: 3.0.23
+Author: AI Environment Team
+Date: 2026-10-18
+
+Usage:
+    python ai_env_state_cache.py --prefix D:/AI_Environment/Miniconda/envs/AI2025 --refresh
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+try:
+    from colorama import Fore, Style
+except ImportError:
+    class Fore:
+        GREEN = RED = YELLOW = CYAN = ""
+    class Style:
+        RESET_ALL = ""
+
+CACHE_FILE_NAME = "env_state_cache.json"
+# Packages whose presence the launcher cares about
+DEFAULT_PACKAGES = ("psutil", "colorama", "requests")
+
+# Runs in the environment's interpreter: where it lives, its version and
+# which packages it can see (find_spec only, nothing is imported)
+PROBE_SCRIPT = (
+    "import sys, json, importlib.util\n"
+    "names = sys.argv[1:]\n"
+    "print(json.dumps({'executable': sys.executable, 'version': sys.version.split()[0],"
+    " 'packages': {n: importlib.util.find_spec(n) is not None for n in names}}))\n"
+)
+
+def hash_path_variable(path_value=None):
+    """Short hash of the PATH variable"""
+    value = os.environ.get('PATH', '') if path_value is None else path_value
+    return hashlib.sha256(value.encode('utf-8', 'replace')).hexdigest()[:16]
+
+def activation_environment(env_prefix, base_env=None):
+    """Environment variables ``conda activate`` would set for a prefix
+
+    Computed without starting conda: the prefix's executable directories
+    go in front of PATH and CONDA_PREFIX / CONDA_DEFAULT_ENV are set.
+    """
+    prefix = Path(env_prefix)
+    env = dict(os.environ if base_env is None else base_env)
+    if os.name == 'nt':
+        directories = [prefix, prefix / "Library" / "mingw-w64" / "bin", prefix / "Library" / "usr" / "bin",
+                       prefix / "Library" / "bin", prefix / "Scripts", prefix / "bin"]
+    else:
+        directories = [prefix / "bin"]
+    env['PATH'] = os.pathsep.join([str(directory) for directory in directories]
+                                  + ([env['PATH']] if env.get('PATH') else []))
+    env['CONDA_PREFIX'] = str(prefix)
+    env['CONDA_DEFAULT_ENV'] = prefix.name
+    env.pop('PYTHONHOME', None)
+    return env
+
+class EnvironmentStateCache:
+    """Stat-keyed cache of an environment's interpreter, version and packages
+
+    The key is the newest mtime of the env prefix, its conda-meta directory
+    and its site-packages (conda and pip installs touch one of them), plus
+    a hash of PATH, which decides which ``python`` a launch resolves to.
+    While the key is unchanged the stored state is returned without
+    starting any process.
+    """
+
+    def __init__(self, cache_path, env_prefix):
+        """Initialize Environment State Cache
+
+        Args:
+            cache_path (Path): JSON file holding cached states
+            env_prefix (Path): Conda environment prefix, e.g. .../envs/AI2025
+        """
+        self.cache_path = Path(cache_path)
+        self.env_prefix = Path(env_prefix)
+        self.last_hit = None
+
+    @classmethod
+    def for_environment(cls, ai_env_path, env_name="AI2025"):
+        """Cache for an environment of the AI Environment's Miniconda"""
+        ai_env_path = Path(ai_env_path)
+        return cls(ai_env_path / CACHE_FILE_NAME, ai_env_path / "Miniconda" / "envs" / env_name)
+
+    def _watched_paths(self):
+        """Directories whose mtime changes when the environment changes"""
+        paths = [self.env_prefix, self.env_prefix / "conda-meta", self.env_prefix / "Lib" / "site-packages"]
+        lib = self.env_prefix / "lib"
+        try:
+            paths.extend(entry / "site-packages" for entry in lib.iterdir() if entry.name.startswith("python"))
+        except OSError:
+            pass
+        return paths
+
+    def compute_key(self):
+        """Current cache key (None if the prefix does not exist)"""
+        mtimes = []
+        for path in self._watched_paths():
+            try:
+                mtimes.append(path.stat().st_mtime_ns)
+            except OSError:
+                continue
+        if not mtimes:
+            return None
+        return {
+            'prefix': str(self.env_prefix),
+            'prefix_mtime_ns': max(mtimes),
+            'path_hash': hash_path_variable()
+        }
+
+    def _load_all(self):
+        """Load every cached state (one per prefix)"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                states = json.load(f)
+            return states if isinstance(states, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, packages=()):
+        """Cached state if the key still matches and covers the given packages
+
+        Returns:
+            dict or None: executable, version, packages (name -> bool),
+                          key, probed_at and any extra fields stored by callers
+        """
+        key = self.compute_key()
+        state = self._load_all().get(str(self.env_prefix)) if key else None
+        hit = bool(state and state.get('key') == key
+                   and all(name in state.get('packages', {}) for name in packages))
+        self.last_hit = hit
+        return state if hit else None
+
+    def save(self, state):
+        """Store a state under the current key"""
+        key = self.compute_key()
+        if key is None:
+            return
+        states = self._load_all()
+        states[str(self.env_prefix)] = dict(state, key=key)
+        self._write_all(states)
+
+    def _write_all(self, states):
+        """Replace the cache file atomically"""
+        try:
+            temp_path = self.cache_path.with_suffix(".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(states, f, indent=2)
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            pass
+
+    def update(self, **fields):
+        """Add fields (e.g. conda_ok) to the cached state, if it is still valid"""
+        state = self.get()
+        if state:
+            state.update(fields)
+            self.save(state)
+
+    def invalidate(self):
+        """Forget the state of this environment"""
+        states = self._load_all()
+        if states.pop(str(self.env_prefix), None) is not None:
+            self._write_all(states)
+
+    def probe(self, python="python", packages=DEFAULT_PACKAGES, timeout=10):
+        """Start the interpreter once and record executable, version and packages
+
+        Args:
+            python (str): Interpreter command or path (resolved through PATH)
+            packages (iterable): Import names to look for
+
+        Returns:
+            dict or None: New state, or None if the interpreter could not run
+        """
+        import subprocess
+        
+        try:
+            result = subprocess.run([python, "-c", PROBE_SCRIPT] + list(packages),
+                                    capture_output=True, text=True, timeout=timeout)
+            lines = result.stdout.strip().splitlines()
+            if result.returncode != 0 or not lines:
+                return None
+            state = json.loads(lines[-1])
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            return None
+        state['probed_at'] = time.time()
+        self.save(state)
+        return state
+
+    def probe_current(self, packages=DEFAULT_PACKAGES):
+        """Record the running interpreter without starting a process"""
+        from importlib.util import find_spec
+        
+        state = {
+            'executable': sys.executable,
+            'version': sys.version.split()[0],
+            'packages': {name: find_spec(name) is not None for name in packages},
+            'probed_at': time.time()
+        }
+        self.save(state)
+        return state
+
+    def resolve(self, python="python", packages=DEFAULT_PACKAGES, refresh=False):
+        """Cached state, probing the interpreter only when the key changed
+
+        Returns:
+            dict or None: State as returned by get() or probe()
+        """
+        if not refresh:
+            state = self.get(packages)
+            if state:
+                return state
+        self.last_hit = False
+        return self.probe(python, packages)
+
+def main():
+    """Command line entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Show the cached state of a conda environment')
+    parser.add_argument('--prefix', required=True, help='Conda environment prefix')
+    parser.add_argument('--cache', help=f'Cache file (default: <prefix>/../../../{CACHE_FILE_NAME})')
+    parser.add_argument('--python', default='python', help='Interpreter to probe on a miss')
+    parser.add_argument('--refresh', action='store_true', help='Probe even if the cache is valid')
+    args = parser.parse_args()
+
+    prefix = Path(args.prefix)
+    cache = EnvironmentStateCache(args.cache or prefix.parents[2] / CACHE_FILE_NAME, prefix)
+    start = time.perf_counter()
+    state = cache.resolve(args.python, refresh=args.refresh)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    if state is None:
+        print(f"{Fore.RED}[ERROR] Could not run {args.python}{Style.RESET_ALL}")
+        return
+    source = "cache" if cache.last_hit else "probe"
+    print(f"{Fore.GREEN}[OK] {state['executable']} (Python {state['version']}) "
+          f"from {source} in {elapsed:.1f} ms{Style.RESET_ALL}")
+    for name, found in sorted(state['packages'].items()):
+        print(f"    {name:<12} {'found' if found else 'missing'}")
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,9 @@ except ImportError:
         RESET_ALL = ""
     COLORAMA_AVAILABLE = False
 
+from ai_package_installer import PackageInstaller, print_phase_summary
+from ai_package_probe import run_probe
+
 class EnvironmentValidator:
     """Validates AI Environment against configuration requirements"""
     
@@ -35,6 +38,10 @@ class EnvironmentValidator:
         self.config = None
         self.missing_packages = []
         self.installed_packages = []
+        self.probe_report = None
+        # Optional directory of pre-downloaded wheels for offline machines
+        self.wheelhouse = self.ai_env_path / "wheelhouse"
+        self.offline = False
         
     def load_config(self):
         """Load install configuration"""
@@ -50,43 +57,77 @@ class EnvironmentValidator:
             print(f"{Fore.RED}[ERROR] Failed to load config: {e}")
             return False
     
-    def check_python_packages(self):
-        """Check installed Python packages against requirements"""
+    def check_python_packages(self, deep=False, python=None):
+        """Check installed Python packages against requirements
+        
+        All packages are probed in one child process without importing them
+        (find_spec + package metadata, including version constraints).
+        
+        Args:
+            deep (bool): Also import every package to catch broken installs
+            python (str, optional): Interpreter to check (default: current one)
+        """
         if not self.config:
             return False
             
         required_packages = self.config.get('python_packages', [])
-        print(f"{Fore.CYAN}[INFO] Checking {len(required_packages)} required packages...")
+        mode = "deep import" if deep else "metadata probe"
+        print(f"{Fore.CYAN}[INFO] Checking {len(required_packages)} required packages ({mode})...")
         
         self.missing_packages = []
         self.installed_packages = []
         
-        for package in required_packages:
-            # Extract package name (remove version constraints)
-            package_name = package.split('>=')[0].split('==')[0].split('<')[0].split('>')[0]
+        try:
+            self.probe_report = run_probe(required_packages, python=python, deep=deep)
+        except subprocess.TimeoutExpired:
+            print(f"{Fore.RED}[ERROR] Package probe timed out")
+            self.missing_packages = list(required_packages)
+            return False
+        except Exception as e:
+            print(f"{Fore.RED}[ERROR] Package probe failed: {e}")
+            self.missing_packages = list(required_packages)
+            return False
+        
+        for result in self.probe_report['results']:
+            package = result['requirement']
+            package_name = result['distribution']
+            status = result['status']
             
-            try:
-                # Try to import the package
-                result = subprocess.run([
-                    sys.executable, '-c', f'import {package_name}; print("OK")'
-                ], capture_output=True, text=True, timeout=10)
-                
-                if result.returncode == 0:
-                    self.installed_packages.append(package)
-                    print(f"{Fore.GREEN}[OK]   ✓ {package_name}")
-                else:
-                    self.missing_packages.append(package)
-                    print(f"{Fore.RED}[MISSING] ✗ {package_name}")
-                    
-            except subprocess.TimeoutExpired:
-                print(f"{Fore.YELLOW}[TIMEOUT] ? {package_name} (import timeout)")
+            if status == "ok":
+                self.installed_packages.append(package)
+                version = f" {result['version']}" if result['version'] else ""
+                import_time = f" ({result['import_time']:.2f}s)" if result['import_time'] is not None else ""
+                print(f"{Fore.GREEN}[OK]   ✓ {package_name}{version}{import_time}")
+            elif status == "version_mismatch":
                 self.missing_packages.append(package)
-            except Exception as e:
-                print(f"{Fore.RED}[ERROR] ✗ {package_name}: {e}")
+                print(f"{Fore.YELLOW}[VERSION] ✗ {package_name}: {result['detail']}")
+            elif status == "import_error":
                 self.missing_packages.append(package)
+                print(f"{Fore.RED}[ERROR] ✗ {package_name}: {result['detail']}")
+            else:
+                self.missing_packages.append(package)
+                print(f"{Fore.RED}[MISSING] ✗ {package_name}")
         
+        print(f"{Fore.CYAN}[INFO] Probe finished in {self.probe_report['elapsed']:.2f}s "
+              f"(Python {self.probe_report['python_version']})")
         return len(self.missing_packages) == 0
     
+    def save_report(self, report_path):
+        """Write the last package probe as a JSON report
+        
+        Args:
+            report_path (Path): Output file
+        """
+        report = {
+            'config': str(self.config_path),
+            'installed': self.installed_packages,
+            'missing': self.missing_packages,
+            'probe': self.probe_report
+        }
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"{Fore.GREEN}[OK] Report written to: {report_path}")
+    
     def generate_summary_report(self):
         """Generate validation summary report"""
         if not self.config:
@@ -140,37 +181,47 @@ class EnvironmentValidator:
         return False
     
     def install_missing_packages(self):
-        """Install missing packages using pip"""
+        """Install missing packages with a single pip run
+        
+        Uses the wheelhouse directory as an extra package source when it
+        exists (and as the only source in offline mode).
+        """
         if not self.missing_packages:
             return True
             
         print(f"\n{Fore.CYAN}[INFO] Installing {len(self.missing_packages)} missing packages...")
         
-        success_count = 0
-        for package in self.missing_packages:
-            try:
-                print(f"{Fore.CYAN}[INFO] Installing {package}...")
-                result = subprocess.run([
-                    sys.executable, '-m', 'pip', 'install', package
-                ], capture_output=True, text=True, timeout=300)
-                
-                if result.returncode == 0:
-                    print(f"{Fore.GREEN}[OK] ✓ {package} installed successfully")
-                    success_count += 1
-                else:
-                    print(f"{Fore.RED}[ERROR] ✗ Failed to install {package}")
-                    print(f"       {result.stderr.strip()}")
-                    
-            except subprocess.TimeoutExpired:
-                print(f"{Fore.RED}[ERROR] ✗ {package} installation timeout")
-            except Exception as e:
-                print(f"{Fore.RED}[ERROR] ✗ {package}: {e}")
-        
-        print(f"\n{Fore.CYAN}[INFO] Installation complete: {success_count}/{len(self.missing_packages)} packages installed")
-        return success_count == len(self.missing_packages)
+        wheelhouse = self.wheelhouse if self.wheelhouse and self.wheelhouse.exists() else None
+        if wheelhouse:
+            print(f"{Fore.CYAN}[INFO] Using wheelhouse: {wheelhouse}{' (offline)' if self.offline else ''}")
+        elif self.offline:
+            print(f"{Fore.RED}[ERROR] Offline install requested but no wheelhouse found at {self.wheelhouse}")
+            return False
+        
+        installer = PackageInstaller(wheelhouse=wheelhouse, offline=self.offline)
+        try:
+            summary = installer.install(self.missing_packages)
+        except Exception as e:
+            print(f"{Fore.RED}[ERROR] ✗ pip could not be started: {e}")
+            return False
+        
+        for package in summary['installed']:
+            print(f"{Fore.GREEN}[OK] ✓ {package} installed successfully")
+        for package in summary['failed']:
+            print(f"{Fore.RED}[ERROR] ✗ Failed to install {package}")
+        print_phase_summary(summary)
+        
+        print(f"\n{Fore.CYAN}[INFO] Installation complete: {len(summary['installed'])}/{len(self.missing_packages)} packages installed")
+        return summary['success']
     
-    def run_validation(self):
-        """Run complete environment validation"""
+    def run_validation(self, deep=False, report_path=None, interactive=True):
+        """Run complete environment validation
+        
+        Args:
+            deep (bool): Import every package instead of only probing metadata
+            report_path (Path, optional): Write a JSON report here
+            interactive (bool): Offer to install missing packages
+        """
         print(f"{Fore.CYAN}🔍 Running Environment Validation...")
         print("=" * 60)
         
@@ -181,13 +232,16 @@ class EnvironmentValidator:
         print(f"{Fore.GREEN}[OK] Configuration loaded from: {self.config_path}")
         
         # Check Python packages
-        packages_ok = self.check_python_packages()
+        packages_ok = self.check_python_packages(deep=deep)
         
         # Generate and display summary
         print("\n" + self.generate_summary_report())
         
+        if report_path:
+            self.save_report(report_path)
+        
         # Offer installation if needed
-        if not packages_ok:
+        if not packages_ok and interactive:
             self.offer_installation()
         
         return packages_ok
@@ -199,11 +253,28 @@ def main():
     parser = argparse.ArgumentParser(description='AI Environment Validator')
     parser.add_argument('--ai-env-path', default='.', 
                        help='Path to AI Environment directory')
+    parser.add_argument('--deep', action='store_true',
+                       help='Import every package (slow) instead of only probing metadata')
+    parser.add_argument('--json', metavar='FILE',
+                       help='Write a JSON report to FILE')
+    parser.add_argument('--no-install', action='store_true',
+                       help='Do not offer to install missing packages')
+    parser.add_argument('--wheelhouse',
+                       help='Directory of wheels to install from (default: <ai-env-path>/wheelhouse)')
+    parser.add_argument('--offline', action='store_true',
+                       help='Install only from the wheelhouse, without contacting the package index')
     
     args = parser.parse_args()
     
     validator = EnvironmentValidator(args.ai_env_path)
-    success = validator.run_validation()
+    if args.wheelhouse:
+        validator.wheelhouse = Path(args.wheelhouse)
+    validator.offline = args.offline
+    success = validator.run_validation(
+        deep=args.deep,
+        report_path=args.json,
+        interactive=not args.no_install
+    )
     
     sys.exit(0 if success else 1)
 
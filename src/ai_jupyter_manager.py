@@ -7,10 +7,13 @@ Author: AI Environment Team
 Date: 2025-08-13 06:00
 """
 
+import json
 import os
 import socket
 import subprocess
+import sys
 import time
+import urllib.request
 import webbrowser
 from pathlib import Path
 
@@ -43,6 +46,83 @@ except ImportError:
     Style = MockColor()
     COLORAMA_AVAILABLE = False
 
+from ai_env_state_cache import EnvironmentStateCache, activation_environment, CACHE_FILE_NAME, DEFAULT_PACKAGES
+from ai_kernel_pool import (load_kernel_pool_config, kernel_pool_arguments, read_pool_stats,
+                            print_pool_stats, STATS_FILE_NAME)
+from ai_port_manager import PortAllocator, find_listening_pids, terminate_process_trees
+from ai_process_store import is_same_process
+from ai_readiness import wait_until
+
+# Probed together with the launcher's packages so both share one cache entry
+JUPYTER_PROBE_PACKAGES = DEFAULT_PACKAGES + ("jupyterlab",)
+
+def jupyter_runtime_dir():
+    """Directory where Jupyter servers write their jpserver-<pid>.json files
+
+    Follows jupyter_core's rules without importing it (it lives in the
+    AI2025 environment, not necessarily in the launcher's interpreter).
+    """
+    if os.environ.get('JUPYTER_RUNTIME_DIR'):
+        return Path(os.environ['JUPYTER_RUNTIME_DIR'])
+    if os.environ.get('JUPYTER_DATA_DIR'):
+        return Path(os.environ['JUPYTER_DATA_DIR']) / "runtime"
+    if os.name == 'nt':
+        base = Path(os.environ.get('APPDATA') or Path.home() / "AppData" / "Roaming") / "jupyter"
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Jupyter"
+    else:
+        base = Path(os.environ.get('XDG_DATA_HOME') or Path.home() / ".local" / "share") / "jupyter"
+    return base / "runtime"
+
+def find_server_info(port, newer_than=None, runtime_dir=None):
+    """Runtime info of the Jupyter server listening on port
+
+    Args:
+        port (int): Server port
+        newer_than (float, optional): Ignore files last written before this time
+            (stale files of servers that died without cleaning up)
+
+    Returns:
+        dict or None: Contents of the matching jpserver-*.json (url, token, pid, base_url ...)
+    """
+    runtime_dir = Path(runtime_dir) if runtime_dir else jupyter_runtime_dir()
+    try:
+        candidates = list(runtime_dir.glob("jpserver-*.json"))
+    except OSError:
+        return None
+    for path in candidates:
+        try:
+            if newer_than is not None and path.stat().st_mtime < newer_than:
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if info.get('port') == port:
+            return info
+    return None
+
+def check_server_status(port, info, timeout=1.0):
+    """True if GET /api/status of the server answers with 200"""
+    base_url = info.get('base_url') or "/"
+    request = urllib.request.Request(f"http://127.0.0.1:{port}{base_url}api/status")
+    if info.get('token'):
+        request.add_header('Authorization', f"token {info['token']}")
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status == 200
+    except (OSError, ValueError):
+        return False
+
+def is_jupyter_process(pid):
+    """True if the command line of a process mentions jupyter"""
+    if not PSUTIL_AVAILABLE:
+        return False
+    try:
+        return any("jupyter" in part.lower() for part in psutil.Process(pid).cmdline())
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return False
+
 class JupyterLabManager:
     """Manages Jupyter Lab server operations in AI2025 environment"""
     
@@ -56,6 +136,12 @@ class JupyterLabManager:
         self.ai_env_path = Path(ai_env_path)
         self.conda_path = Path(conda_path)
         self.default_port = 8888
+        self.startup_timeout = 30
+        self.port_allocator = PortAllocator(self.ai_env_path)
+        # Port of the server started last from here
+        self.active_port = None
+        # port -> runtime info (url, token ...) of servers started from here
+        self.server_info = {}
         
     def print_success(self, message):
         """Print success message"""
@@ -84,25 +170,37 @@ class JupyterLabManager:
         print(f" 4. {Fore.YELLOW}🔧 Choose Custom Port{Style.RESET_ALL}")
         print(f" 5. {Fore.CYAN}📊 Check Server Status{Style.RESET_ALL}")
         print(f" 6. {Fore.RED}🛑 Stop Server{Style.RESET_ALL}")
+        print(f" 7. {Fore.CYAN}📈 Kernel Pool Statistics{Style.RESET_ALL}")
         print(f" 0. {Fore.WHITE}⬅️  Back to Applications Menu{Style.RESET_ALL}")
 
     def start_server_only(self, port=None):
         """Start Jupyter Lab server only in AI2025 environment
         
         Args:
-            port (int, optional): Port number to use. Defaults to 8888.
+            port (int, optional): Port number to use. Defaults to the next free
+                port of the Jupyter range in the port registry.
         """
         if port is None:
-            port = self.default_port
+            port = self.port_allocator.allocate("jupyter")
+            if port is None:
+                jupyter_ports = self.port_allocator.port_range("jupyter")
+                self.print_error(f"No free port left in the Jupyter range "
+                                 f"{jupyter_ports[0]}-{jupyter_ports[-1]}" if jupyter_ports
+                                 else "No Jupyter port range configured")
+                return False
+        else:
+            # Check if server is already running
+            if self.is_server_running(port):
+                self.print_success(f"Jupyter Lab server is already running on port {port}")
+                self.print_info(f"Access at: http://localhost:{port}")
+                self.active_port = port
+                return True
+            if not self.port_allocator.reserve(port, "jupyter"):
+                self.print_error(f"Port {port} is reserved or in use by another process")
+                return False
             
         print(f"\n{Fore.BLUE}🚀 Starting Jupyter Lab Server on port {port}...{Style.RESET_ALL}")
         
-        # Check if server is already running
-        if self.is_server_running(port):
-            self.print_success(f"Jupyter Lab server is already running on port {port}")
-            self.print_info(f"Access at: http://localhost:{port}")
-            return True
-        
         # Set working directory to Projects folder
         projects_dir = self.ai_env_path / "Projects" / "01_Basic_LLM_Example"
         if not projects_dir.exists():
@@ -112,112 +210,154 @@ class JupyterLabManager:
         
         # Start server in AI2025 environment
         try:
-            # Prepare command to run in AI2025 environment
-            if os.name == 'nt':  # Windows
+            # Run the environment's interpreter directly, so the tracked PID is the server itself
+            env_prefix = self.conda_path / "envs" / "AI2025"
+            python = self.resolve_ai2025_python()
+            if python:
+                cmd = [
+                    python, "-m", "jupyterlab", "--no-browser", f"--port={port}",
+                    "--allow-root", "--ip=0.0.0.0"
+                ]
+                env = activation_environment(env_prefix)
+            elif os.name == 'nt':  # Windows
                 conda_path = self.conda_path / "Scripts" / "conda.exe"
                 if not conda_path.exists():
                     self.print_error(f"Conda not found at: {conda_path}")
+                    self.port_allocator.release(port)
                     return False
                     
+                self.print_warning("AI2025 interpreter with jupyterlab not found, falling back to conda run")
                 cmd = [
                     str(conda_path), "run", "-n", "AI2025",
                     "jupyter", "lab", "--no-browser", f"--port={port}",
                     "--allow-root", "--ip=0.0.0.0"
                 ]
+                env = dict(os.environ)
             else:  # Linux/Mac
+                self.print_warning("AI2025 interpreter with jupyterlab not found, falling back to conda run")
                 cmd = [
                     "conda", "run", "-n", "AI2025",
                     "jupyter", "lab", "--no-browser", f"--port={port}",
                     "--allow-root", "--ip=0.0.0.0"
                 ]
+                env = dict(os.environ)
+            
+            # Optional pool of pre-started kernels (the server imports ai_kernel_pool from src)
+            pool_config = load_kernel_pool_config(self.ai_env_path)
+            if pool_config['enabled']:
+                cmd += kernel_pool_arguments(pool_config, self.ai_env_path / STATS_FILE_NAME)
+                src_dir = str(Path(__file__).resolve().parent)
+                env['PYTHONPATH'] = os.pathsep.join(filter(None, [src_dir, env.get('PYTHONPATH')]))
+                self.print_info(f"Kernel pool: {pool_config['size']} pre-started kernel(s) "
+                                f"with {', '.join(pool_config['preload_imports']) or 'no preloaded imports'}")
             
             self.print_info(f"Starting Jupyter Lab with command: {' '.join(cmd[:3])}...")
             
-            # Start process in background (non-blocking)
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=str(projects_dir),  # Start in projects directory
-                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == 'nt' else 0,
-                stdin=subprocess.DEVNULL  # Prevent stdin interference
-            )
+            process_id = f"jupyter_lab_server_{port}"
+            name = f"Jupyter Lab Server (Port {port})"
+            url = f"http://localhost:{port}"
+            log_path = self.get_log_path(port)
+            from ai_process_manager import BackgroundProcessManager
+            process_manager = BackgroundProcessManager(self.ai_env_path)
             
-            # Track the process immediately
-            try:
-                from ai_process_manager import BackgroundProcessManager
-                process_manager = BackgroundProcessManager(self.ai_env_path)
-                process_manager.track_process(
-                    process_id=f"jupyter_lab_server_{port}",
-                    name=f"Jupyter Lab Server (Port {port})",
-                    pid=process.pid,
-                    command=' '.join(cmd),
-                    url=f"http://localhost:{port}"
-                )
-                self.print_info(f"Tracking Jupyter Lab server (PID: {process.pid})")
-            except Exception as e:
-                self.print_warning(f"Could not track Jupyter process: {e}")
+            # Prefer the supervisor, which restarts a crashed server and rotates its log
+            launched_at = time.time()
+            process = None
+            pid = process_manager.launch_supervised(process_id, name, cmd, cwd=projects_dir, url=url,
+                                                    process_type='web_service', env=env)
+            if pid is not None:
+                def exited():
+                    return process_manager.get_supervised_status(process_id) != "running"
+            else:
+                # Server output goes to a log file; an unread pipe would stall the server once full
+                log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(log_path, 'wb') as log_file:
+                    process = subprocess.Popen(
+                        cmd,
+                        stdout=log_file,
+                        stderr=subprocess.STDOUT,
+                        env=env,
+                        cwd=str(projects_dir),  # Start in projects directory
+                        creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == 'nt' else 0,
+                        stdin=subprocess.DEVNULL  # Prevent stdin interference
+                    )
+                pid = process.pid
+                process_manager.track_process(process_id=process_id, name=name, pid=pid,
+                                              command=' '.join(cmd), url=url)
+                
+                def exited():
+                    return process.poll() is not None
+            # The reservation now lasts as long as the server (or its supervised service) runs
+            process_manager.assign_port(process_id, port)
+            self.print_info(f"Tracking Jupyter Lab server (PID: {pid})")
             
-            # Wait for server to start with retry mechanism
+            # Wait for the server's runtime file, then for /api/status to answer
             self.print_info("Waiting for server to start...")
-            max_wait_time = 15  # Maximum 15 seconds
-            check_interval = 1  # Check every 1 second
-            checks_performed = 0
+            info, elapsed = self.wait_for_server(port, launched_at, abort=exited)
             
-            for attempt in range(max_wait_time):
-                time.sleep(check_interval)
-                checks_performed += 1
+            if info:
+                self.server_info[port] = info
+                self.active_port = port
+                self.print_success(f"Jupyter Lab server ready on port {port} in {elapsed:.2f}s")
+                self.print_info(f"Working directory: {projects_dir}")
+                self.print_info(f"Access at: {self.get_server_url(port)}")
                 
-                if self.is_server_running(port):
-                    self.print_success(f"Jupyter Lab server started successfully on port {port} (after {checks_performed} seconds)")
-                    self.print_info(f"Working directory: {projects_dir}")
-                    self.print_info(f"Access at: http://localhost:{port}")
-                    return True
-                
-                # Show progress dots
-                if attempt % 3 == 0:
-                    print(f"{Fore.YELLOW}.{Style.RESET_ALL}", end="", flush=True)
-            
-            print()  # New line after dots
+                # Record the measured time to ready with the tracked process
+                try:
+                    if process_id in process_manager.tracked_processes:
+                        process_manager.tracked_processes[process_id].update(
+                            time_to_ready=round(elapsed, 3),
+                            server_pid=info.get('pid')
+                        )
+                        process_manager.save_tracked_processes()
+                except Exception as e:
+                    self.print_warning(f"Could not record startup time: {e}")
+                return True
             
-            # Final check - server might be starting but not ready yet
-            self.print_warning(f"Server not accessible on port {port} after {max_wait_time} seconds")
+            if exited():
+                if process is not None:
+                    self.print_warning(f"Jupyter Lab exited during startup (exit code: {process.returncode})")
+                    process_manager.untrack_process(process_id)
+                    self.port_allocator.release(port)
+                else:
+                    # Do not leave the supervisor retrying a server that cannot start
+                    self.print_warning("Jupyter Lab exited during startup")
+                    process_manager.stop_supervised(process_id)
+            else:
+                self.print_warning(f"Server not ready on port {port} after {self.startup_timeout} seconds")
+                self.print_info("The server might still be initializing - try checking status in a moment")
             
-            # Try to get error output from the process
+            # Show the end of the server log
             try:
-                stdout, stderr = process.communicate(timeout=2)
-                if stderr:
-                    error_msg = stderr.decode().strip()
-                    if error_msg:
-                        self.print_error(f"Error details: {error_msg}")
-                if stdout:
-                    output_msg = stdout.decode().strip()
-                    if output_msg:
-                        self.print_info(f"Output: {output_msg}")
-            except subprocess.TimeoutExpired:
-                self.print_info("Server process is still running, but port not accessible")
-                self.print_info("The server might still be initializing - try checking status in a moment")
-            except Exception as comm_error:
-                self.print_warning(f"Could not get process output: {comm_error}")
+                with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+                    output_msg = "".join(f.readlines()[-15:]).strip()
+                if output_msg:
+                    self.print_error(f"Error details:\n{output_msg}")
+                self.print_info(f"Full log: {log_path}")
+            except OSError as log_error:
+                self.print_warning(f"Could not read server log: {log_error}")
             
             return False
                 
         except FileNotFoundError as e:
             self.print_error(f"Command not found: {e}")
             self.print_info("Make sure conda and AI2025 environment are properly installed")
+            self.port_allocator.release(port)
             return False
         except Exception as e:
             self.print_error(f"Error starting Jupyter Lab server: {e}")
+            self.port_allocator.release(port)
             return False
 
     def start_client_only(self, port=None):
         """Start Jupyter Lab client only (open browser)
         
         Args:
-            port (int, optional): Port number to connect to. Defaults to 8888.
+            port (int, optional): Port number to connect to. Defaults to the
+                server started last, or 8888.
         """
         if port is None:
-            port = self.default_port
+            port = self.active_port or self.default_port
             
         print(f"\n{Fore.BLUE}🌐 Opening Jupyter Lab Client...{Style.RESET_ALL}")
         
@@ -229,7 +369,7 @@ class JupyterLabManager:
         
         # Open browser to Jupyter Lab
         try:
-            url = f"http://localhost:{port}"
+            url = self.get_server_url(port)
             webbrowser.open(url)
             self.print_success("Jupyter Lab client opened in browser")
             self.print_info(f"URL: {url}")
@@ -243,15 +383,13 @@ class JupyterLabManager:
         """Start both Jupyter Lab server and client
         
         Args:
-            port (int, optional): Port number to use. Defaults to 8888.
+            port (int, optional): Port number to use. Defaults to the next free
+                port of the Jupyter range.
         """
-        if port is None:
-            port = self.default_port
-            
         print(f"\n{Fore.MAGENTA}⚡ Starting Jupyter Lab Server + Client...{Style.RESET_ALL}")
         
         # Check if server is already running
-        if self.is_server_running(port):
+        if port is not None and self.is_server_running(port):
             self.print_info(f"Server already running on port {port}, opening client...")
             return self.start_client_only(port)
         
@@ -259,28 +397,8 @@ class JupyterLabManager:
         server_started = self.start_server_only(port)
         
         if server_started:
-            # Wait for server to fully start with timeout
-            self.print_info("Waiting for server to fully initialize...")
-            max_wait = 10  # Maximum 10 seconds
-            wait_time = 0
-            
-            while wait_time < max_wait:
-                time.sleep(1)
-                wait_time += 1
-                if self.is_server_running(port):
-                    self.print_success("Server is ready!")
-                    break
-                print(f"{Fore.YELLOW}.{Style.RESET_ALL}", end="", flush=True)
-            
-            print()  # New line after dots
-            
-            # Check if server is actually running
-            if self.is_server_running(port):
-                # Then start client
-                return self.start_client_only(port)
-            else:
-                self.print_error("Server failed to start properly")
-                return False
+            # start_server_only returns once /api/status answered
+            return self.start_client_only(self.active_port)
         else:
             self.print_error("Failed to start server")
             return False
@@ -290,20 +408,20 @@ class JupyterLabManager:
         print(f"\n{Fore.YELLOW}🔧 Choose Custom Port for Jupyter Lab{Style.RESET_ALL}")
         
         try:
-            port_input = input(f"\n{Fore.CYAN}Enter port number (default 8888): {Style.RESET_ALL}").strip()
+            port_input = input(f"\n{Fore.CYAN}Enter port number (default: next free port): {Style.RESET_ALL}").strip()
             if not port_input:
-                port = 8888
+                port = None
             else:
                 port = int(port_input)
             
-            if port < 1024 or port > 65535:
-                self.print_error("Port must be between 1024 and 65535")
-                return
-            
-            # Check if port is in use
-            if self.is_port_in_use(port):
-                self.print_warning(f"Port {port} is already in use")
-                return
+                if port < 1024 or port > 65535:
+                    self.print_error("Port must be between 1024 and 65535")
+                    return
+                
+                # Check if port is in use
+                if self.is_port_in_use(port):
+                    self.print_warning(f"Port {port} is already in use")
+                    return
             
             # Start server on custom port
             server_started = self.start_server_only(port)
@@ -312,7 +430,7 @@ class JupyterLabManager:
                 # Ask if user wants to open browser
                 open_browser = input(f"\n{Fore.CYAN}Open in browser? (y/n): {Style.RESET_ALL}").lower()
                 if open_browser == 'y':
-                    self.start_client_only(port)
+                    self.start_client_only(self.active_port)
             
         except ValueError:
             self.print_error("Invalid port number")
@@ -323,27 +441,15 @@ class JupyterLabManager:
         """Check Jupyter Lab server status"""
         print(f"\n{Fore.CYAN}📊 Checking Jupyter Lab Server Status...{Style.RESET_ALL}")
         
-        # Check if server is running on default port
-        if self.is_server_running(self.default_port):
-            self.print_success(f"Jupyter Lab server is running on port {self.default_port}")
-            self.print_info(f"Access at: http://localhost:{self.default_port}")
-        else:
-            self.print_info(f"Jupyter Lab server is not running on port {self.default_port}")
-        
-        # Check for servers on other common ports
-        common_ports = [8889, 8890, 8891, 8892]
-        running_ports = []
-        
-        for port in common_ports:
-            if self.is_server_running(port):
-                running_ports.append(port)
+        # Check every port of the Jupyter range
+        running_ports = [port for port in self.port_allocator.port_range("jupyter")
+                         if self.is_server_running(port)]
         
         if running_ports:
-            self.print_info(f"Found Jupyter servers on ports: {', '.join(map(str, running_ports))}")
+            self.print_success(f"Found Jupyter servers on ports: {', '.join(map(str, running_ports))}")
             for port in running_ports:
                 self.print_info(f"  - http://localhost:{port}")
-        
-        if not self.is_server_running(self.default_port) and not running_ports:
+        else:
             self.print_info("No Jupyter Lab servers found running")
 
     def stop_server(self):
@@ -352,18 +458,21 @@ class JupyterLabManager:
         
         stopped_any = False
         
-        # Try to stop servers on common ports
-        common_ports = [8888, 8889, 8890, 8891, 8892]
-        
-        for port in common_ports:
+        # Try to stop servers on every port of the Jupyter range
+        for port in self.port_allocator.port_range("jupyter"):
             if self.is_server_running(port):
+                jupyter_pids, other_pids = self.find_jupyter_pids(port)
+                if not jupyter_pids:
+                    self.print_info(f"Port {port} is used by another application "
+                                    f"(PID {', '.join(map(str, other_pids)) or 'unknown'}), leaving it alone")
+                    continue
                 self.print_info(f"Found server running on port {port}, stopping...")
                 if self._stop_server_on_port(port):
                     stopped_any = True
                     
-                    # Wait a moment and verify it stopped
-                    time.sleep(2)
-                    if not self.is_server_running(port):
+                    # Verify it stopped
+                    stopped, elapsed = wait_until(lambda: not self.is_server_running(port), timeout=5)
+                    if stopped:
                         self.print_success(f"Successfully stopped server on port {port}")
                     else:
                         self.print_warning(f"Server on port {port} may still be running")
@@ -373,6 +482,75 @@ class JupyterLabManager:
         else:
             self.print_success("Server shutdown process completed")
 
+    def resolve_ai2025_python(self):
+        """AI2025 interpreter that can run Jupyter Lab, from the state cache
+
+        The interpreter is probed once; later launches reuse the cached result
+        until the environment or PATH changes.
+
+        Returns:
+            str or None: Interpreter path, or None if it is missing or lacks jupyterlab
+        """
+        env_prefix = self.conda_path / "envs" / "AI2025"
+        python = next((path for path in (env_prefix / "python.exe", env_prefix / "bin" / "python")
+                       if path.exists()), None)
+        if python is None:
+            return None
+        cache = EnvironmentStateCache(self.ai_env_path / CACHE_FILE_NAME, env_prefix)
+        state = cache.resolve(str(python), packages=JUPYTER_PROBE_PACKAGES)
+        if not state or not state['packages'].get('jupyterlab'):
+            return None
+        return state['executable']
+
+    def get_log_path(self, port=None):
+        """Log file of the server on a port (the supervisor's log of the service)"""
+        return self.ai_env_path / "logs" / f"jupyter_lab_server_{port or self.default_port}.log"
+
+    def show_kernel_pool_stats(self):
+        """Show hit rate and time-to-first-cell of the kernel pool"""
+        print(f"\n{Fore.CYAN}📈 Kernel Pool Statistics{Style.RESET_ALL}")
+        if not load_kernel_pool_config(self.ai_env_path)['enabled']:
+            self.print_info("Kernel pool is disabled (jupyter_kernel_pool in config/install_config.json)")
+        print_pool_stats(read_pool_stats(self.ai_env_path / STATS_FILE_NAME))
+
+    def wait_for_server(self, port, launched_at=None, timeout=None, abort=None):
+        """Wait until a Jupyter server on port is ready to serve requests
+
+        The server writes jpserver-<pid>.json to the runtime directory once
+        it is listening; after that a GET /api/status confirms it answers.
+        Checks back off from 20 ms up to 80 ms between attempts.
+
+        Args:
+            port (int): Server port
+            launched_at (float, optional): time.time() of the launch; older runtime files are ignored
+            timeout (float, optional): Seconds to wait (default: startup_timeout)
+            abort (callable, optional): Returns True to give up (e.g. the process exited)
+
+        Returns:
+            tuple: (runtime info dict with url and token, or None; elapsed seconds)
+        """
+        runtime_dir = jupyter_runtime_dir()
+        # Filesystem mtimes can be coarser than time.time()
+        newer_than = launched_at - 2 if launched_at else None
+
+        def ready():
+            info = find_server_info(port, newer_than, runtime_dir)
+            if info and check_server_status(port, info):
+                return info
+            return None
+
+        return wait_until(ready, timeout=timeout or self.startup_timeout,
+                          initial_delay=0.02, max_delay=0.08, abort=abort)
+
+    def get_server_url(self, port=None):
+        """Browser URL of a server, including its token when known"""
+        if port is None:
+            port = self.default_port
+        info = self.server_info.get(port) or find_server_info(port)
+        if info and info.get('token'):
+            return f"http://localhost:{port}/lab?token={info['token']}"
+        return f"http://localhost:{port}"
+
     def is_server_running(self, port=None):
         """Check if Jupyter Lab is running on specified port
         
@@ -414,20 +592,29 @@ class JupyterLabManager:
             bool: True if stopped successfully, False otherwise
         """
         try:
+            if self._stop_supervised_server(port):
+                return True
+            
             # Try graceful shutdown first if requests is available
             if REQUESTS_AVAILABLE:
                 try:
                     import requests
+                    headers = {'Content-Type': 'application/json'}
+                    info = self.server_info.get(port) or find_server_info(port)
+                    if info and info.get('token'):
+                        headers['Authorization'] = f"token {info['token']}"
                     response = requests.post(
                         f"http://localhost:{port}/api/shutdown", 
                         timeout=5,
-                        headers={'Content-Type': 'application/json'}
+                        headers=headers
                     )
                     self.print_info(f"Sent shutdown request to port {port}")
-                    time.sleep(2)  # Give it time to shutdown
                     
-                    # Check if it actually stopped
-                    if not self.is_server_running(port):
+                    # Wait until the port is released
+                    stopped, elapsed = wait_until(lambda: not self.is_server_running(port), timeout=5)
+                    if stopped:
+                        self.server_info.pop(port, None)
+                        self.port_allocator.release(port)
                         # Untrack the process
                         try:
                             from ai_process_manager import BackgroundProcessManager
@@ -452,6 +639,59 @@ class JupyterLabManager:
             # Try process termination as last resort
             return self._kill_processes_on_port(port)
 
+    def _stop_supervised_server(self, port):
+        """Stop the server on a port through the supervisor if it runs under it
+        
+        Killing a supervised server directly would only make the supervisor
+        restart it.
+        
+        Returns:
+            bool: True if the supervisor stopped it
+        """
+        from ai_process_manager import BackgroundProcessManager
+        process_manager = BackgroundProcessManager(self.ai_env_path)
+        process_id = f"jupyter_lab_server_{port}"
+        process_info = process_manager.tracked_processes.get(process_id)
+        if not (process_info and process_info.get('supervised')):
+            return False
+        if not process_manager.stop_supervised(process_id):
+            return False
+        self.server_info.pop(port, None)
+        self.print_success(f"Stopped supervised Jupyter Lab server on port {port}")
+        return True
+
+    def find_jupyter_pids(self, port, process_info=None):
+        """Processes on a port that are known to be a Jupyter server
+
+        Known are the tracked server if it is still the same process, the
+        owner of a "jupyter" reservation in the port registry, and listeners
+        that are the server of a jpserver-*.json for the port or whose
+        command line mentions jupyter.
+
+        Args:
+            port (int): Server port
+            process_info (dict, optional): Tracked process of the server
+
+        Returns:
+            tuple: (Jupyter PIDs, PIDs of other listeners that must be left alone)
+        """
+        pids = set()
+        if process_info and is_same_process(process_info):
+            pids.add(process_info['pid'])
+        entry = self.port_allocator.reservations().get(str(port))
+        if entry and entry.get('service') == "jupyter" and not entry.get('process_id'):
+            pids.add(entry['pid'])
+        info = self.server_info.get(port) or find_server_info(port)
+        server_pid = info.get('pid') if info else None
+
+        others = []
+        for pid in find_listening_pids(port):
+            if pid in pids or pid == server_pid or is_jupyter_process(pid):
+                pids.add(pid)
+            else:
+                others.append(pid)
+        return sorted(pids), others
+
     def _kill_processes_on_port(self, port):
         """Kill processes running on specific port
         
@@ -462,55 +702,35 @@ class JupyterLabManager:
             bool: True if processes were killed, False otherwise
         """
         try:
-            if os.name == 'nt':  # Windows
-                # Find processes using the port
-                result = subprocess.run(
-                    ['netstat', '-ano'], 
-                    capture_output=True, 
-                    text=True,
-                    stdin=subprocess.DEVNULL  # Prevent stdin interference
-                )
-                lines = result.stdout.split('\n')
-                killed_any = False
-                for line in lines:
-                    if f':{port}' in line and 'LISTENING' in line:
-                        parts = line.split()
-                        if len(parts) >= 5:
-                            pid = parts[-1]
-                            try:
-                                subprocess.run(
-                                    ['taskkill', '/F', '/PID', pid], 
-                                    check=True,
-                                    capture_output=True,  # Capture output to prevent interference
-                                    stdin=subprocess.DEVNULL  # Prevent stdin interference
-                                )
-                                self.print_success(f"Killed process {pid} on port {port}")
-                                
-                                # Untrack the process
-                                try:
-                                    from ai_process_manager import BackgroundProcessManager
-                                    process_manager = BackgroundProcessManager(self.ai_env_path)
-                                    process_manager.untrack_process(f"jupyter_lab_server_{port}")
-                                    self.print_info(f"Untracked Jupyter Lab server (Port {port})")
-                                except Exception as e:
-                                    self.print_warning(f"Could not untrack Jupyter process: {e}")
-                                
-                                killed_any = True
-                            except subprocess.CalledProcessError:
-                                # Process might already be dead, that's okay
-                                pass
-                            except Exception:
-                                pass
-                return killed_any
-            else:  # Linux/Mac
-                subprocess.run(
-                    ['pkill', '-f', f'jupyter.*{port}'], 
-                    check=False,
-                    capture_output=True,  # Capture output to prevent interference
-                    stdin=subprocess.DEVNULL  # Prevent stdin interference
-                )
-                self.print_success(f"Killed Jupyter processes on port {port}")
+            if self._stop_supervised_server(port):
                 return True
+            
+            from ai_process_manager import BackgroundProcessManager
+            process_manager = BackgroundProcessManager(self.ai_env_path)
+            process_id = f"jupyter_lab_server_{port}"
+            process_info = process_manager.tracked_processes.get(process_id)
+            
+            # Only Jupyter processes; anything else on the port keeps running
+            pids, others = self.find_jupyter_pids(port, process_info)
+            if others:
+                self.print_warning(f"Leaving non-Jupyter process(es) on port {port} running: "
+                                   f"{', '.join(map(str, others))}")
+            if not pids:
+                self.print_info(f"No Jupyter server process found on port {port}")
+                return False
+            result = terminate_process_trees(pids)
+            if result['remaining']:
+                self.print_warning(f"Processes still running on port {port}: "
+                                   f"{', '.join(map(str, result['remaining']))}")
+                return False
+                
+            if process_info:
+                process_manager.untrack_process(process_id)
+            self.server_info.pop(port, None)
+            self.port_allocator.release(port)
+            self.print_success(f"Stopped {len(result['pids'])} process(es) on port {port} "
+                               f"in {result['elapsed']:.2f}s")
+            return True
         except Exception as e:
             self.print_warning(f"Could not kill processes on port {port}: {e}")
             return False
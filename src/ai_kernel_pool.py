@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+AI Kernel Pool
+Pre-started Jupyter kernels handed out to new notebooks on demand
+
+Version: 3.0.23
+Author: AI Environment Team
+Date: 2026-10-18
+
+The PooledKernelManager class runs inside the Jupyter server of the AI2025
+environment; JupyterLabManager enables it through kernel_pool_arguments()
+when "jupyter_kernel_pool" is enabled in install_config.json.
+
+Usage:
+    python ai_kernel_pool.py --ai-env-path D:/AI_Environment
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import time
+from pathlib import Path
+
+try:
+    from colorama import Fore, Style
+except ImportError:
+    class Fore:
+        GREEN = RED = YELLOW = CYAN = ""
+    class Style:
+        RESET_ALL = ""
+
+try:
+    from jupyter_server.services.kernels.kernelmanager import AsyncMappingKernelManager
+    from traitlets import Float, Integer, List, Unicode
+    JUPYTER_SERVER_AVAILABLE = True
+except ImportError:
+    JUPYTER_SERVER_AVAILABLE = False
+
+STATS_FILE_NAME = "kernel_pool_stats.json"
+# Handouts kept in the stats file for the time-to-first-cell figures
+STATS_HISTORY = 100
+
+DEFAULT_CONFIG = {
+    'enabled': False,
+    'size': 2,
+    'kernel_name': "python3",
+    'preload_imports': ["numpy", "pandas", "torch", "transformers"],
+    'ready_timeout_seconds': 120
+}
+
+def load_kernel_pool_config(ai_env_path):
+    """Kernel pool settings from config/install_config.json merged over the defaults"""
+    config = dict(DEFAULT_CONFIG)
+    try:
+        with open(Path(ai_env_path) / "config" / "install_config.json", 'r', encoding='utf-8') as f:
+            config.update(json.load(f).get('jupyter_kernel_pool', {}))
+    except (OSError, ValueError, AttributeError):
+        pass
+    return config
+
+def kernel_pool_arguments(config, stats_file):
+    """Jupyter server command line options that switch on the pool
+
+    The server must be able to import this module (src on PYTHONPATH).
+    """
+    arguments = [
+        "--ServerApp.kernel_manager_class=ai_kernel_pool.PooledKernelManager",
+        f"--PooledKernelManager.pool_size={int(config['size'])}",
+        f"--PooledKernelManager.pool_kernel_name={config['kernel_name']}",
+        f"--PooledKernelManager.ready_timeout={float(config['ready_timeout_seconds'])}",
+        f"--PooledKernelManager.stats_file={stats_file}"
+    ]
+    arguments.extend(f"--PooledKernelManager.preload_imports={name}" for name in config['preload_imports'])
+    return arguments
+
+def read_pool_stats(stats_file):
+    """Stats written by a running pool (None if there are none)"""
+    try:
+        with open(stats_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def print_pool_stats(stats):
+    """Print hit rate and time-to-first-cell of the kernel pool"""
+    if not stats:
+        print(f"{Fore.YELLOW}[INFO] No kernel pool statistics yet{Style.RESET_ALL}")
+        return
+    requests = stats['hits'] + stats['misses']
+    hit_rate = stats['hits'] / requests if requests else 0.0
+    print(f"{Fore.CYAN}Kernel pool: {stats['idle']}/{stats['pool_size']} idle kernel(s) "
+          f"of {stats['kernel_name']}{Style.RESET_ALL}")
+    print(f"  Requests: {requests} ({stats['hits']} from the pool, {stats['misses']} cold starts, "
+          f"hit rate {hit_rate:.0%})")
+    for hit, label in ((True, "pooled"), (False, "cold")):
+        times = sorted(entry['seconds'] for entry in stats['handouts'] if entry['hit'] is hit)
+        if times:
+            print(f"  Time to first cell ({label}): median {times[len(times) // 2]:.2f}s, "
+                  f"max {times[-1]:.2f}s over {len(times)} kernel(s)")
+    if stats.get('last_error'):
+        print(f"{Fore.YELLOW}  Last refill error: {stats['last_error']}{Style.RESET_ALL}")
+
+async def _resolve(value):
+    """Await value if the jupyter_client version made it a coroutine"""
+    return await value if inspect.isawaitable(value) else value
+
+if JUPYTER_SERVER_AVAILABLE:
+    class PooledKernelManager(AsyncMappingKernelManager):
+        """Kernel manager that keeps idle kernels ready for new sessions
+
+        Pool kernels are started with the preloaded imports already run
+        (``IPKernelApp.exec_lines``) and only join the pool once they answer
+        a kernel_info request. A new session of the pool's kernel spec takes
+        one of them; its working directory and session environment are set
+        before it is handed out, and a refill starts in the background.
+        Idle pool kernels are hidden from the kernel list.
+        """
+
+        pool_size = Integer(2, config=True, help="Number of idle kernels to keep ready")
+        pool_kernel_name = Unicode("python3", config=True, help="Kernel spec served from the pool")
+        preload_imports = List(Unicode(), config=True, help="Modules imported before a kernel joins the pool")
+        ready_timeout = Float(120.0, config=True, help="Seconds a kernel may take to become ready")
+        stats_file = Unicode("", config=True, help="JSON file receiving hit rate and timing statistics")
+
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self._pool = []
+            self._starting = 0
+            self._refill_task = None
+            self.stats = {
+                'kernel_name': self.pool_kernel_name,
+                'pool_size': self.pool_size,
+                'idle': 0,
+                'hits': 0,
+                'misses': 0,
+                'handouts': [],
+                'last_error': None
+            }
+            try:
+                from tornado.ioloop import IOLoop
+                IOLoop.current().add_callback(self._schedule_refill)
+            except Exception as e:
+                self.log.warning("Kernel pool could not schedule its first fill: %s", e)
+
+        def _preload_arguments(self):
+            return [f"--IPKernelApp.exec_lines=import {name}" for name in self.preload_imports]
+
+        def _write_stats(self):
+            if not self.stats_file:
+                return
+            self.stats['idle'] = len(self._pool)
+            try:
+                temp_path = f"{self.stats_file}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.stats, f, indent=2)
+                os.replace(temp_path, self.stats_file)
+            except OSError as e:
+                self.log.warning("Kernel pool could not write %s: %s", self.stats_file, e)
+
+        def _record_handout(self, hit, seconds):
+            self.stats['hits' if hit else 'misses'] += 1
+            self.stats['handouts'] = (self.stats['handouts']
+                                      + [{'time': time.time(), 'hit': hit, 'seconds': round(seconds, 3)}])[-STATS_HISTORY:]
+            self._write_stats()
+            self.log.info("Kernel pool %s: time to first cell %.2fs", "hit" if hit else "miss", seconds)
+
+        async def _run_code(self, kernel_id, code=None):
+            """Wait until a kernel answers, then optionally run code in it and wait for the reply"""
+            client = self.get_kernel(kernel_id).client()
+            client.start_channels()
+            try:
+                await _resolve(client.wait_for_ready(timeout=self.ready_timeout))
+                if code:
+                    msg_id = client.execute(code, silent=True, store_history=False)
+                    while True:
+                        reply = await _resolve(client.get_shell_msg(timeout=self.ready_timeout))
+                        if reply['parent_header'].get('msg_id') == msg_id:
+                            break
+            finally:
+                client.stop_channels()
+
+        def _schedule_refill(self):
+            if self._refill_task is None or self._refill_task.done():
+                self._refill_task = asyncio.ensure_future(self._refill())
+
+        async def _refill(self):
+            """Start kernels until the pool is full again"""
+            while len(self._pool) + self._starting < self.pool_size:
+                self._starting += 1
+                kernel_id = None
+                try:
+                    kernel_id = await super().start_kernel(kernel_name=self.pool_kernel_name,
+                                                           extra_arguments=self._preload_arguments())
+                    await self._run_code(kernel_id)
+                    self._pool.append(kernel_id)
+                    self._write_stats()
+                except Exception as e:
+                    self.stats['last_error'] = f"{type(e).__name__}: {e}"
+                    self.log.warning("Kernel pool refill failed: %s", e)
+                    if kernel_id is not None and kernel_id in self:
+                        await _resolve(self.shutdown_kernel(kernel_id, now=True))
+                    self._write_stats()
+                    return
+                finally:
+                    self._starting -= 1
+
+        async def start_kernel(self, *, kernel_id=None, path=None, **kwargs):
+            """Hand out a pooled kernel for new sessions of the pool's kernel spec"""
+            kernel_name = kwargs.get('kernel_name') or self.default_kernel_name
+            if kernel_id is not None or kernel_name != self.pool_kernel_name:
+                return await super().start_kernel(kernel_id=kernel_id, path=path, **kwargs)
+
+            started = time.perf_counter()
+            while self._pool:
+                pooled_id = self._pool.pop(0)
+                if pooled_id not in self:
+                    continue
+                cwd = self.cwd_for_path(path) if path is not None else self.root_dir
+                session_env = {key: value for key, value in (kwargs.get('env') or {}).items()
+                               if key.startswith("JPY_")}
+                try:
+                    await self._run_code(pooled_id, (
+                        "import os as _os\n"
+                        f"_os.chdir({cwd!r})\n"
+                        f"_os.environ.update({session_env!r})\n"
+                        "del _os"))
+                except Exception as e:
+                    self.log.warning("Pooled kernel %s was not usable: %s", pooled_id, e)
+                    await _resolve(self.shutdown_kernel(pooled_id, now=True))
+                    continue
+                self._schedule_refill()
+                self._record_handout(True, time.perf_counter() - started)
+                return pooled_id
+
+            kwargs['extra_arguments'] = list(kwargs.get('extra_arguments') or []) + self._preload_arguments()
+            new_id = await super().start_kernel(path=path, **kwargs)
+            self._schedule_refill()
+
+            async def measure():
+                try:
+                    await self._run_code(new_id)
+                    self._record_handout(False, time.perf_counter() - started)
+                except Exception as e:
+                    self.log.warning("Kernel %s did not become ready: %s", new_id, e)
+
+            asyncio.ensure_future(measure())
+            return new_id
+
+        def list_kernels(self):
+            """Running kernels, without the idle ones waiting in the pool"""
+            idle = set(self._pool)
+            return [kernel for kernel in super().list_kernels() if kernel['id'] not in idle]
+
+def main():
+    """Command line entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Show Jupyter kernel pool statistics')
+    parser.add_argument('--ai-env-path', default='D:/AI_Environment', help='AI Environment root')
+    args = parser.parse_args()
+
+    print_pool_stats(read_pool_stats(Path(args.ai_env_path) / STATS_FILE_NAME))
+
+if __name__ == "__main__":
+    main()
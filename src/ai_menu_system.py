@@ -25,12 +25,18 @@ class MenuSystem:
         self.script_version = script_version
         self.script_date = script_date
         
-    def print_header(self):
-        """Print application header"""
+    def print_header(self, status_line=None):
+        """Print application header
+        
+        Args:
+            status_line (str, optional): Progress of background work, shown under the title
+        """
         print(f"\n{Fore.CYAN}{'='*64}{Style.RESET_ALL}")
         print(f"{Fore.CYAN}                AI Environment Manager{Style.RESET_ALL}")
         print(f"{Fore.CYAN}               Version {self.script_version} ({self.script_date}){Style.RESET_ALL}")
         print(f"{Fore.CYAN}               Portable AI Development{Style.RESET_ALL}")
+        if status_line:
+            print(f" {status_line}")
         print(f"{Fore.CYAN}{'='*64}{Style.RESET_ALL}")
         
     def print_interactive_menu(self):
@@ -46,17 +52,9 @@ class MenuSystem:
         print(f" 8. {Fore.GREEN}✅ Run Environment Validation{Style.RESET_ALL}")
         print(f" 9. {Fore.GREEN}🚀 Launch Applications{Style.RESET_ALL}")
         
-        # Show background processes count
-        try:
-            from ai_process_manager import ProcessManager
-            process_manager = ProcessManager()
-            active_count = len(process_manager.get_active_processes())
-            if active_count > 0:
-                print(f"10. {Fore.YELLOW}🔄 Background Processes{Style.RESET_ALL} ({active_count})")
-            else:
-                print(f"10. {Fore.YELLOW}🔄 Background Processes{Style.RESET_ALL} (none)")
-        except:
-            print(f"10. {Fore.YELLOW}🔄 Background Processes{Style.RESET_ALL}")
+        # The process count lives in the Background Processes menu; looking it up
+        # here would load psutil before the first menu could be drawn
+        print(f"10. {Fore.YELLOW}🔄 Background Processes{Style.RESET_ALL}")
             
         print(f"11. {Fore.CYAN}🔧 Advanced Options{Style.RESET_ALL}")
         print(f"12. {Fore.WHITE}💻 Open AI2025 Terminal{Style.RESET_ALL} (Enhanced terminal with return function)")
@@ -127,11 +125,11 @@ class MenuSystem:
         """Print application launcher menu with fixed colors"""
         print(f"\n{Fore.GREEN}🚀 Application Launcher:{Style.RESET_ALL}")
         print(f" 1. {Fore.WHITE}💻 VS Code{Style.RESET_ALL} (Full IDE)")
-        print(f" 2. {Fore.YELLOW}📓 Jupyter Lab{Style.RESET_ALL} (Port 8888)")
+        print(f" 2. {Fore.YELLOW}📓 Jupyter Lab{Style.RESET_ALL} (Port 8888+)")
         print(f" 3. {Fore.GREEN}🐍 Python REPL{Style.RESET_ALL} (Interactive)")
         print(f" 4. {Fore.CYAN}📦 Conda Prompt{Style.RESET_ALL} (Package Management)")
-        print(f" 5. {Fore.RED}🌐 Streamlit Demo{Style.RESET_ALL} (Port 8501)")
-        print(f" 6. {Fore.MAGENTA}📊 TensorBoard{Style.RESET_ALL} (Port 6006)")
+        print(f" 5. {Fore.RED}🌐 Streamlit Demo{Style.RESET_ALL} (Port 8501+)")
+        print(f" 6. {Fore.MAGENTA}📊 TensorBoard{Style.RESET_ALL} (Port 6006+)")
         print(f" 7. {Fore.WHITE}🔬 MLflow UI{Style.RESET_ALL} (Port 5000)")
         print(f" 8. {Fore.YELLOW}📁 File Explorer{Style.RESET_ALL} (AI Environment)")
         print(f" 0. {Fore.YELLOW}⬅️  Back to Main Menu{Style.RESET_ALL}")
@@ -158,8 +156,10 @@ class MenuSystem:
         """Get user menu choice with validation"""
         while True:
             try:
-                print(f"\n{Fore.WHITE}Enter your choice (0-{max_option}): {Style.RESET_ALL}", end="")
-                choice = input().strip()
+                from ai_activation_pipeline import real_stdout
+                with real_stdout():
+                    print(f"\n{Fore.WHITE}Enter your choice (0-{max_option}): {Style.RESET_ALL}", end="")
+                    choice = input().strip()
                 
                 if choice == "":
                     continue
@@ -209,10 +209,12 @@ class MenuSystem:
         """Get user confirmation for important actions"""
         print(f"\n{Fore.YELLOW}⚠️  Confirm Action:{Style.RESET_ALL}")
         print(f"   {action_description}")
-        print(f"\n{Fore.WHITE}Are you sure? (y/N): {Style.RESET_ALL}", end="")
         
         try:
-            response = input().strip().lower()
+            from ai_activation_pipeline import real_stdout
+            with real_stdout():
+                print(f"\n{Fore.WHITE}Are you sure? (y/N): {Style.RESET_ALL}", end="")
+                response = input().strip().lower()
             return response in ['y', 'yes']
         except KeyboardInterrupt:
             print(f"\n{Fore.YELLOW}⚠️  Action cancelled by user.{Style.RESET_ALL}")
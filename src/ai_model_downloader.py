@@ -8,8 +8,8 @@ Date: 2025-08-13
 Time: 03:00
 """
 
-import subprocess
-import requests
+import json
+import time
 from pathlib import Path
 
 try:
@@ -20,16 +20,30 @@ except ImportError:
     class Style:
         RESET_ALL = ""
 
+from ai_download_admission import DownloadAdmission
+from ai_download_queue import format_duration, pull_models
+from ai_model_registry import format_size, get_registry
+
 class ModelDownloader:
     """Handles AI model downloading"""
     
-    def __init__(self, ollama_path):
+    def __init__(self, ollama_path, registry=None, config_path=None, admission=None):
         """Initialize Model Downloader
         
         Args:
             ollama_path (Path): Path to Ollama executable
+            registry (ModelRegistry, optional): Shared model registry
+            config_path (Path, optional): install_config.json with ollama_models
+                and model_downloads settings
+            admission (DownloadAdmission, optional): Disk space admission control
         """
         self.ollama_path = Path(ollama_path)
+        self.registry = registry or get_registry()
+        self.config_path = Path(config_path) if config_path else None
+        self.concurrency = 2
+        self.max_retries = 3
+        self.configured_models = []
+        self.load_config()
         
         # Popular models for quick download
         self.popular_models = {
@@ -70,6 +84,10 @@ class ModelDownloader:
                 "description": "Alibaba's multilingual model"
             }
         }
+        
+        self.admission = admission or DownloadAdmission(
+            fallback_sizes={m['name']: m['size'] for m in self.popular_models.values()}
+        )
 
     def print_success(self, message):
         """Print success message"""
@@ -87,16 +105,33 @@ class ModelDownloader:
         """Print warning message"""
         print(f"{Fore.YELLOW}⚠️  {message}{Style.RESET_ALL}")
 
+    def load_config(self):
+        """Load configured models and download settings"""
+        if not self.config_path or not self.config_path.exists():
+            return
+        try:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            self.print_warning(f"Could not read {self.config_path.name}: {e}")
+            return
+        
+        downloads = config.get('model_downloads', {})
+        self.concurrency = downloads.get('concurrency', self.concurrency)
+        self.max_retries = downloads.get('max_retries', self.max_retries)
+        self.configured_models = list(config.get('ollama_models', []))
+
     def show_download_menu(self):
         """Show download options menu"""
         print(f"\n{Fore.GREEN}📥 Download AI Model:{Style.RESET_ALL}")
         print(f" 1. {Fore.CYAN}📋 Popular Models (Quick Download){Style.RESET_ALL}")
         print(f" 2. {Fore.YELLOW}🔗 Custom Model (Enter URL/Name){Style.RESET_ALL}")
         print(f" 3. {Fore.BLUE}🌐 Browse Ollama Library{Style.RESET_ALL}")
+        print(f" 4. {Fore.GREEN}📦 Download All Configured Models (parallel){Style.RESET_ALL}")
         print(f" 0. {Fore.WHITE}⬅️  Back{Style.RESET_ALL}")
         
         try:
-            choice = input(f"\n{Fore.YELLOW}Enter your choice (0-3): {Style.RESET_ALL}")
+            choice = input(f"\n{Fore.YELLOW}Enter your choice (0-4): {Style.RESET_ALL}")
             choice = int(choice)
             
             if choice == 0:
@@ -107,6 +142,8 @@ class ModelDownloader:
                 self.download_custom_model()
             elif choice == 3:
                 self.browse_ollama_library()
+            elif choice == 4:
+                self.download_configured_models()
             else:
                 self.print_error("Invalid choice")
         except ValueError:
@@ -184,50 +221,127 @@ class ModelDownloader:
         self.print_info("This may take several minutes depending on model size")
         self.print_warning("Do not close this window during download")
         
-        try:
-            # Check if Ollama is available
-            if not self.ollama_path.exists():
-                self.print_error(f"Ollama not found at: {self.ollama_path}")
+        _, deferred = self.admit_models([model_name])
+        if deferred:
+            confirm = input(f"{Fore.YELLOW}Download anyway? (y/N): {Style.RESET_ALL}")
+            if confirm.lower() != 'y':
+                self.print_info("Download cancelled")
                 return False
+        
+        try:
+            result = self.download_models([model_name], concurrency=1)[0]
+        except Exception as e:
+            self.print_error(f"Download failed: {e}")
+            return False
+        
+        if result['success']:
+            self.print_success(f"Successfully downloaded {display_name}")
+            self.print_info(f"Model '{model_name}' is now available")
+            self.show_usage_example(model_name)
+            return True
+        else:
+            self.print_error(f"Failed to download {display_name}: {result['error']}")
+            self.print_info("Make sure the Ollama server is running (Ollama menu)")
+            return False
+
+    def admit_models(self, model_names):
+        """Check which models fit on disk before pulling them
+        
+        Sizes come from the model manifests, minus blobs that are already in
+        the local store; the configured disk reserve must remain free.
+        
+        Args:
+            model_names (list): Models to check
             
-            # Start download
-            process = subprocess.Popen(
-                [str(self.ollama_path), "pull", model_name],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                universal_newlines=True
-            )
-            
-            # Show progress
-            print(f"{Fore.YELLOW}Progress:{Style.RESET_ALL}")
-            for line in process.stdout:
-                if line.strip():
-                    # Clean up the progress line
-                    if "pulling" in line.lower() or "%" in line:
-                        print(f"  {line.strip()}")
-                    elif "success" in line.lower():
-                        print(f"  {Fore.GREEN}{line.strip()}{Style.RESET_ALL}")
-            
-            # Wait for completion
-            return_code = process.wait()
-            
-            if return_code == 0:
-                self.print_success(f"Successfully downloaded {display_name}")
-                self.print_info(f"Model '{model_name}' is now available")
-                self.show_usage_example(model_name)
-                return True
+        Returns:
+            tuple: (names of admitted models, plans of deferred models)
+        """
+        try:
+            decision = self.admission.admit(model_names)
+        except Exception as e:
+            self.print_warning(f"Could not check disk space: {e}")
+            return list(model_names), []
+        
+        for plan in decision['admitted']:
+            eta = self.admission.estimate_download_time(plan['download_bytes'])
+            eta_text = f", ETA {format_duration(eta)}" if eta is not None else ""
+            self.print_info(f"{plan['model']}: {format_size(plan['download_bytes'])} to download "
+                            f"({format_size(plan['present_bytes'])} already present{eta_text})")
+        
+        available = decision['free_bytes'] - decision['reserve_bytes'] - decision['required_bytes']
+        for plan in decision['deferred']:
+            if plan['source'] is None:
+                self.print_warning(f"{plan['model']}: download size unknown (registry not reachable)")
             else:
-                self.print_error(f"Failed to download {display_name}")
-                return False
-                
-        except FileNotFoundError:
-            self.print_error("Ollama executable not found")
-            self.print_info("Make sure Ollama is properly installed")
+                self.print_warning(f"{plan['model']}: needs {format_size(plan['download_bytes'])} but only "
+                                   f"{format_size(max(0, available))} is free above the "
+                                   f"{self.admission.min_free_gb} GB reserve")
+        
+        return [plan['model'] for plan in decision['admitted']], decision['deferred']
+
+    def download_models(self, model_names, concurrency=None):
+        """Download several models in parallel through /api/pull
+        
+        Args:
+            model_names (list): Models to download
+            concurrency (int, optional): Models pulled at once
+            
+        Returns:
+            list: One result dict per model (model, success, bytes, received,
+                  elapsed, attempts, error)
+        """
+        print(f"{Fore.YELLOW}Progress:{Style.RESET_ALL}")
+        start = time.perf_counter()
+        results = pull_models(
+            model_names,
+            concurrency=concurrency or self.concurrency,
+            max_retries=self.max_retries,
+            registry=self.registry
+        )
+        
+        # Parallel pulls share the link, so throughput is measured over the whole batch
+        self.admission.record_pull(sum(r['received'] for r in results), time.perf_counter() - start)
+        return results
+
+    def download_configured_models(self):
+        """Download every model listed in install_config.json that is not installed yet"""
+        if not self.configured_models:
+            self.print_warning("No models configured in install_config.json (ollama_models)")
             return False
+        
+        try:
+            installed = self.registry.get_installed_names(refresh=True)
         except Exception as e:
-            self.print_error(f"Download failed: {e}")
+            self.print_error(f"Ollama server not reachable: {e}")
             return False
+        
+        missing = [m for m in self.configured_models if m not in installed]
+        if not missing:
+            self.print_success("All configured models are already installed")
+            return True
+        
+        missing, deferred = self.admit_models(missing)
+        if deferred:
+            self.print_warning(f"Skipping {len(deferred)} model(s) until more disk space is free")
+        if not missing:
+            return False
+        
+        print(f"\n{Fore.BLUE}📦 Downloading {len(missing)} models, {self.concurrency} at a time:{Style.RESET_ALL}")
+        for model_name in missing:
+            print(f"  • {model_name}")
+        self.print_warning("Do not close this window during download")
+        
+        start = time.perf_counter()
+        results = self.download_models(missing)
+        elapsed = time.perf_counter() - start
+        
+        for result in results:
+            if result['success']:
+                self.print_success(f"{result['model']} ({format_size(result['bytes'])})")
+            else:
+                self.print_error(f"{result['model']}: {result['error']}")
+        self.print_info(f"Finished in {format_duration(elapsed)}")
+        return all(r['success'] for r in results)
 
     def show_usage_example(self, model_name):
         """Show usage example for downloaded model
@@ -246,26 +360,28 @@ class ModelDownloader:
         print("Change the model parameter in your Python scripts to use the new model.")
 
     def check_available_space(self):
-        """Check available disk space (Windows specific)"""
+        """Check available disk space in the Ollama model store (GB)"""
         try:
-            import shutil
-            total, used, free = shutil.disk_usage(str(self.ollama_path.parent))
-            free_gb = free // (1024**3)
-            return free_gb
-        except:
+            return self.admission.free_bytes() // (1024**3)
+        except OSError:
             return None
 
-    def estimate_download_time(self, size_gb, speed_mbps=10):
+    def estimate_download_time(self, size_gb, speed_mbps=None):
         """Estimate download time
         
         Args:
             size_gb (float): Size in GB
-            speed_mbps (float): Internet speed in Mbps
+            speed_mbps (float, optional): Internet speed in Mbps; defaults to the
+                throughput measured on earlier pulls (10 Mbps if none yet)
             
         Returns:
             str: Estimated time string
         """
-        size_mb = size_gb * 1024
+        if speed_mbps is None:
+            throughput = self.admission.measured_throughput()
+            speed_mbps = throughput * 8 / 1000**2 if throughput else 10
+        
+        size_mb = size_gb * 1000
         time_seconds = (size_mb * 8) / speed_mbps
         
         if time_seconds < 60:
@@ -274,4 +390,3 @@ class ModelDownloader:
             return f"{int(time_seconds / 60)} minutes"
         else:
             return f"{int(time_seconds / 3600)} hours"
-
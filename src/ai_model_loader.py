@@ -6,8 +6,6 @@ Time: 05:30
 Handles loading and managing AI models with help system
 """
 
-import subprocess
-import time
 from pathlib import Path
 
 try:
@@ -18,18 +16,25 @@ except ImportError:
     class Style:
         RESET_ALL = ""
 
+from ai_model_registry import get_registry
+from ai_model_warmup import get_warmup
+
 class ModelLoader:
     """Handles AI model loading and help system"""
     
-    def __init__(self, ollama_path, help_path):
+    def __init__(self, ollama_path, help_path, registry=None, warmup=None):
         """Initialize Model Loader
         
         Args:
             ollama_path (Path): Path to Ollama executable
             help_path (Path): Path to help directory containing model documentation
+            registry (ModelRegistry, optional): Shared model registry
+            warmup (ModelWarmup, optional): Shared model warm-up engine
         """
         self.ollama_path = Path(ollama_path)
         self.help_path = Path(help_path)
+        self.registry = registry or get_registry()
+        self.warmup = warmup or get_warmup(self.registry)
         
         # Model help file mapping
         self.help_files = {
@@ -56,60 +61,26 @@ class ModelLoader:
         """Print warning message"""
         print(f"{Fore.YELLOW}⚠️  {message}{Style.RESET_ALL}")
 
-    def get_installed_models(self):
-        """Get list of installed models"""
+    def get_installed_models(self, refresh=False):
+        """Get list of installed models
+        
+        Args:
+            refresh (bool): Bypass the cached registry snapshot
+        """
         try:
-            result = subprocess.run(
-                [str(self.ollama_path), "list"],
-                capture_output=True,
-                text=True,
-                check=True,
-                encoding='utf-8',
-                errors='replace'
-            )
-            
-            models = []
-            lines = result.stdout.strip().split('\n')[1:]  # Skip header
-            for line in lines:
-                if line.strip():
-                    parts = line.split()
-                    if len(parts) >= 3:
-                        models.append({
-                            'name': parts[0],
-                            'id': parts[1],
-                            'size': parts[2],
-                            'modified': ' '.join(parts[3:]) if len(parts) > 3 else 'Unknown'
-                        })
-            return models
+            return self.registry.get_installed_models(refresh)
         except Exception as e:
             self.print_error(f"Failed to get installed models: {e}")
             return []
 
-    def get_loaded_models(self):
-        """Get list of currently loaded models"""
+    def get_loaded_models(self, refresh=False):
+        """Get list of currently loaded models
+        
+        Args:
+            refresh (bool): Bypass the cached registry snapshot
+        """
         try:
-            result = subprocess.run(
-                [str(self.ollama_path), "ps"],
-                capture_output=True,
-                text=True,
-                check=True,
-                encoding='utf-8',
-                errors='replace'
-            )
-            
-            models = []
-            lines = result.stdout.strip().split('\n')[1:]  # Skip header
-            for line in lines:
-                if line.strip():
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        models.append({
-                            'name': parts[0],
-                            'id': parts[1],
-                            'size': parts[2] if len(parts) > 2 else 'Unknown',
-                            'processor': parts[3] if len(parts) > 3 else 'Unknown'
-                        })
-            return models
+            return self.registry.get_loaded_models(refresh)
         except Exception as e:
             self.print_error(f"Failed to get loaded models: {e}")
             return []
@@ -164,44 +135,20 @@ class ModelLoader:
         print(f"\n{Fore.BLUE}🚀 Loading {model_name}...{Style.RESET_ALL}")
         self.print_info("This may take 30 seconds to 5 minutes depending on model size")
         
-        try:
-            # Start loading process with proper encoding
-            process = subprocess.Popen(
-                [str(self.ollama_path), "run", model_name, "Hello"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                stdin=subprocess.PIPE,
-                text=True,
-                encoding='utf-8',
-                errors='replace'
-            )
-            
-            # Send a simple prompt to load the model with extended timeout
-            try:
-                stdout, stderr = process.communicate(input="\n", timeout=300)  # 5 minutes for large models
-                
-                # Check if model is now loaded
-                time.sleep(3)  # Give more time for large models
-                loaded = self.get_loaded_models()
-                if model_name in [m['name'] for m in loaded]:
-                    self.print_success(f"Successfully loaded {model_name}")
-                    self.show_usage_instructions(model_name)
-                    return True
-                else:
-                    self.print_error(f"Failed to load {model_name}")
-                    if stderr:
-                        self.print_error(f"Error: {stderr}")
-                    return False
-                    
-            except subprocess.TimeoutExpired:
-                process.kill()
-                self.print_error("Loading timed out (5 minutes) - model may be too large")
-                self.print_info("Try using a smaller model like phi:2.7b or mistral:7b")
-                return False
-                
-        except Exception as e:
-            self.print_error(f"Error loading model: {e}")
-            return False
+        # Preload through the API (empty prompt) and confirm via /api/ps
+        result = self.warmup.warm(model_name)
+        if result['loaded']:
+            self.print_success(f"Successfully loaded {model_name} in {result['load_time']:.1f}s "
+                               f"(kept loaded for {self.warmup.keep_alive})")
+            self.show_usage_instructions(model_name)
+            return True
+        
+        self.print_error(f"Failed to load {model_name}")
+        if result['error']:
+            self.print_error(f"Error: {result['error']}")
+        if result['load_time'] is None or result['load_time'] >= self.warmup.load_timeout:
+            self.print_info("Try using a smaller model like phi:2.7b or mistral:7b")
+        return False
 
     def show_usage_instructions(self, model_name):
         """Show usage instructions for loaded model
@@ -306,16 +253,18 @@ class ModelLoader:
         except Exception as e:
             self.print_error(f"Error reading help file: {e}")
 
-    def select_model_for_activation(self, default_model="phi:2.7b"):
+    def select_model_for_activation(self, default_model="phi:2.7b", installed=None):
         """Select model for Full Activation
         
         Args:
             default_model (str): Default model to suggest
+            installed (list, optional): Model records to offer (default: ask the server)
             
         Returns:
             str: Selected model name or None if cancelled
         """
-        installed = self.get_installed_models()
+        if installed is None:
+            installed = self.get_installed_models()
         if not installed:
             self.print_warning("No models installed")
             self.print_info("Proceeding without model loading")
@@ -9,7 +9,6 @@ Time: 03:00
 """
 
 import os
-import subprocess
 import json
 from pathlib import Path
 
@@ -21,8 +20,11 @@ except ImportError:
     class Style:
         RESET_ALL = ""
 
+from ai_download_admission import DownloadAdmission
 from ai_model_downloader import ModelDownloader
 from ai_model_loader import ModelLoader
+from ai_model_registry import get_registry
+from ai_model_warmup import get_warmup
 
 class AIModelManager:
     """Comprehensive AI model management system"""
@@ -38,13 +40,6 @@ class AIModelManager:
         self.ollama_path = ollama_path or self.ai_env_path / "Ollama" / "ollama.exe"
         self.models_help_path = self.ai_env_path / "models"
         
-        # Initialize components
-        self.downloader = ModelDownloader(self.ollama_path)
-        self.loader = ModelLoader(self.ollama_path, self.models_help_path)
-        
-        # Ensure models help directory exists
-        self.models_help_path.mkdir(exist_ok=True)
-        
         # Popular models configuration
         self.popular_models = {
             "phi:2.7b": {
@@ -72,6 +67,23 @@ class AIModelManager:
                 "recommended": False
             }
         }
+        
+        # Initialize components (all menus share one registry snapshot)
+        self.registry = get_registry()
+        self.warmup = get_warmup(self.registry, self.ai_env_path / "config" / "install_config.json")
+        self.downloader = ModelDownloader(
+            self.ollama_path,
+            self.registry,
+            self.ai_env_path / "config" / "install_config.json",
+            DownloadAdmission.from_config(
+                self.ai_env_path,
+                {model_id: info['size'] for model_id, info in self.popular_models.items()}
+            )
+        )
+        self.loader = ModelLoader(self.ollama_path, self.models_help_path, self.registry, self.warmup)
+        
+        # Ensure models help directory exists
+        self.models_help_path.mkdir(exist_ok=True)
 
     def print_success(self, message):
         """Print success message"""
@@ -100,58 +112,29 @@ class AIModelManager:
         print(f" 4. {Fore.YELLOW}📊 Model Status{Style.RESET_ALL}")
         print(f" 5. {Fore.RED}🗑️  Delete Model{Style.RESET_ALL}")
         print(f" 6. {Fore.MAGENTA}📚 Model Help{Style.RESET_ALL}")
+        print(f" 7. {Fore.GREEN}📌 Pin Models (keep loaded){Style.RESET_ALL}")
         print(f" 0. {Fore.WHITE}⬅️  Back to Main Menu{Style.RESET_ALL}")
 
-    def get_installed_models(self):
-        """Get list of installed models"""
+    def get_installed_models(self, refresh=False):
+        """Get list of installed models
+        
+        Args:
+            refresh (bool): Bypass the cached registry snapshot
+        """
         try:
-            result = subprocess.run(
-                [str(self.ollama_path), "list"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            
-            models = []
-            lines = result.stdout.strip().split('\n')[1:]  # Skip header
-            for line in lines:
-                if line.strip():
-                    parts = line.split()
-                    if len(parts) >= 3:
-                        models.append({
-                            'name': parts[0],
-                            'id': parts[1],
-                            'size': parts[2],
-                            'modified': ' '.join(parts[3:]) if len(parts) > 3 else 'Unknown'
-                        })
-            return models
+            return self.registry.get_installed_models(refresh)
         except Exception as e:
             self.print_error(f"Failed to get installed models: {e}")
             return []
 
-    def get_loaded_models(self):
-        """Get list of currently loaded models"""
+    def get_loaded_models(self, refresh=False):
+        """Get list of currently loaded models
+        
+        Args:
+            refresh (bool): Bypass the cached registry snapshot
+        """
         try:
-            result = subprocess.run(
-                [str(self.ollama_path), "ps"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            
-            models = []
-            lines = result.stdout.strip().split('\n')[1:]  # Skip header
-            for line in lines:
-                if line.strip():
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        models.append({
-                            'name': parts[0],
-                            'id': parts[1],
-                            'size': parts[2] if len(parts) > 2 else 'Unknown',
-                            'processor': parts[3] if len(parts) > 3 else 'Unknown'
-                        })
-            return models
+            return self.registry.get_loaded_models(refresh)
         except Exception as e:
             self.print_error(f"Failed to get loaded models: {e}")
             return []
@@ -174,14 +157,15 @@ class AIModelManager:
             self.print_info("Use option 1 to download models")
             return
         
+        loaded_names = [m['name'] for m in self.get_loaded_models()]
         print(f"\n{Fore.GREEN}Installed Models:{Style.RESET_ALL}")
         for i, model in enumerate(installed, 1):
-            status = "✅" if model['name'] in [m['name'] for m in self.get_loaded_models()] else "⭕"
+            status = "✅" if model['name'] in loaded_names else "⭕"
             print(f" {i}. {status} {model['name']} ({model['size']}) - {model['modified']}")
         
         print(f"\n{Fore.YELLOW}Popular Models Available for Download:{Style.RESET_ALL}")
+        installed_names = [m['name'] for m in installed]
         for model_id, info in self.popular_models.items():
-            installed_names = [m['name'] for m in installed]
             if model_id not in installed_names:
                 rec = "⭐" if info['recommended'] else "  "
                 print(f" {rec} {info['name']} ({info['size']}) - {info['description']}")
@@ -194,13 +178,15 @@ class AIModelManager:
         if loaded:
             print(f"\n{Fore.GREEN}Currently Loaded Models:{Style.RESET_ALL}")
             for model in loaded:
-                print(f" ✅ {model['name']} (ID: {model['id']}) - {model['processor']}")
+                pin = " 📌 pinned" if model['name'] in self.warmup.pinned_models else ""
+                print(f" ✅ {model['name']} (ID: {model['id']}) - {model['processor']}{pin}")
         else:
             self.print_info("No models currently loaded")
         
         installed = self.get_installed_models()
         if installed:
-            unloaded = [m for m in installed if m['name'] not in [l['name'] for l in loaded]]
+            loaded_names = [l['name'] for l in loaded]
+            unloaded = [m for m in installed if m['name'] not in loaded_names]
             if unloaded:
                 print(f"\n{Fore.YELLOW}Available but Not Loaded:{Style.RESET_ALL}")
                 for model in unloaded:
@@ -233,12 +219,9 @@ class AIModelManager:
                 
                 if confirm.lower() == 'y':
                     try:
-                        subprocess.run(
-                            [str(self.ollama_path), "rm", model['name']],
-                            check=True
-                        )
+                        self.registry.delete_model(model['name'])
                         self.print_success(f"Deleted model: {model['name']}")
-                    except subprocess.CalledProcessError as e:
+                    except Exception as e:
                         self.print_error(f"Failed to delete model: {e}")
                 else:
                     self.print_info("Deletion cancelled")
@@ -247,6 +230,51 @@ class AIModelManager:
         except ValueError:
             self.print_error("Invalid input")
 
+    def handle_pin_models(self):
+        """Handle pinning models resident in memory"""
+        installed = self.get_installed_models()
+        if not installed:
+            self.print_warning("No models installed")
+            return
+        
+        print(f"\n{Fore.GREEN}📌 Pin Models:{Style.RESET_ALL}")
+        print(f"Pinned models are re-warmed every {self.warmup.refresh_interval}s "
+              f"(keep_alive {self.warmup.keep_alive})")
+        if self.warmup.config_warning:
+            self.print_warning(f"model_warmup: {self.warmup.config_warning}")
+        for i, model in enumerate(installed, 1):
+            status = "📌 pinned" if model['name'] in self.warmup.pinned_models else ""
+            print(f" {i}. {model['name']} ({model['size']}) {status}")
+        
+        try:
+            choice = input(f"\n{Fore.YELLOW}Models to pin (e.g. 1,3), 'u' to unpin all, or 0 to cancel: {Style.RESET_ALL}").strip()
+            
+            if choice in ("", "0"):
+                self.print_info("Pinning cancelled")
+                return
+            
+            if choice.lower() == 'u':
+                self.warmup.unpin()
+                self.print_success("All models unpinned (they unload when keep_alive expires)")
+                return
+            
+            selected = []
+            for part in choice.split(","):
+                index = int(part)
+                if not 1 <= index <= len(installed):
+                    self.print_error(f"Invalid choice: {index}")
+                    return
+                selected.append(installed[index - 1]['name'])
+            
+            for result in self.warmup.pin(selected):
+                if result['loaded']:
+                    self.print_success(f"Pinned {result['model']} (loaded in {result['load_time']:.1f}s)")
+                else:
+                    self.print_error(f"Failed to pin {result['model']}: {result['error']}")
+                    self.warmup.unpin([result['model']])
+        except ValueError:
+            self.print_error("Invalid input")
+
     def handle_model_help(self):
         """Handle model help display"""
         self.loader.show_model_help_menu()
@@ -257,7 +285,7 @@ class AIModelManager:
             self.show_menu()
             
             try:
-                choice = input(f"\n{Fore.YELLOW}Enter your choice (0-6): {Style.RESET_ALL}")
+                choice = input(f"\n{Fore.YELLOW}Enter your choice (0-7): {Style.RESET_ALL}")
                 choice = int(choice)
                 
                 if choice == 0:
@@ -274,6 +302,8 @@ class AIModelManager:
                     self.handle_delete_model()
                 elif choice == 6:
                     self.handle_model_help()
+                elif choice == 7:
+                    self.handle_pin_models()
                 else:
                     self.print_error("Invalid choice. Please try again.")
                     
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+AI Model Registry
+Cached snapshot of installed and loaded Ollama models from the HTTP API
+
+Version: 3.0.23
+Author: AI Environment Team
+Date: 2026-10-18
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+
+from ai_ollama_client import DEFAULT_HOST, DEFAULT_PORT, get_client
+
+def format_size(size_bytes):
+    """Format a byte count the way the ollama CLI does (decimal units)
+
+    Args:
+        size_bytes (int): Size in bytes
+
+    Returns:
+        str: Human readable size, e.g. "1.6 GB"
+    """
+    if size_bytes is None:
+        return "Unknown"
+    size = float(size_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1000:
+            return f"{int(size)} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1000
+    return f"{size:.1f} TB"
+
+def format_age(timestamp):
+    """Format an RFC 3339 timestamp as a relative age, e.g. "3 days ago"
+
+    Args:
+        timestamp (str): Timestamp from the Ollama API
+
+    Returns:
+        str: Relative age or "Unknown"
+    """
+    moment = _parse_timestamp(timestamp)
+    if moment is None:
+        return "Unknown"
+
+    seconds = max(0, int((datetime.now(timezone.utc) - moment).total_seconds()))
+    for unit, length in (("day", 86400), ("hour", 3600), ("minute", 60)):
+        if seconds >= length:
+            count = seconds // length
+            return f"{count} {unit}{'s' if count != 1 else ''} ago"
+    return "Just now"
+
+def _parse_timestamp(timestamp):
+    """Parse an RFC 3339 timestamp (nanosecond precision allowed)"""
+    if not timestamp:
+        return None
+    try:
+        text = timestamp.replace("Z", "+00:00")
+        # Python accepts at most 6 fractional digits
+        if "." in text:
+            head, tail = text.split(".", 1)
+            digits = len(tail) - len(tail.lstrip("0123456789"))
+            text = f"{head}.{tail[:min(digits, 6)]}{tail[digits:]}"
+        moment = datetime.fromisoformat(text)
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment
+    except ValueError:
+        return None
+
+def format_processor(size_bytes, size_vram):
+    """Describe CPU/GPU placement the way `ollama ps` does"""
+    if not size_bytes:
+        return "Unknown"
+    if not size_vram:
+        return "100% CPU"
+    if size_vram >= size_bytes:
+        return "100% GPU"
+    cpu_percent = round((size_bytes - size_vram) / size_bytes * 100)
+    return f"{cpu_percent}%/{100 - cpu_percent}% CPU/GPU"
+
+class ModelRegistry:
+    """Cached view of /api/tags and /api/ps
+
+    Every menu screen reads from the same snapshot; the server is only
+    queried again once the snapshot is older than ``ttl`` seconds or after
+    invalidate() (called when a model is pulled or deleted).
+
+    Installed model records contain: name, id, digest, size, size_bytes,
+    modified, modified_at, family, parameter_size, quantization.
+    Loaded model records contain: name, id, digest, size, size_bytes,
+    size_vram, processor, expires_at.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, ttl=5.0):
+        """Initialize Model Registry
+
+        Args:
+            host (str): Ollama server host
+            port (int): Ollama server port
+            ttl (float): Seconds a snapshot stays valid
+        """
+        self.host = host
+        self.port = port
+        self.ttl = ttl
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """Shared pooled Ollama client"""
+        return get_client(self.host, self.port)
+
+    def invalidate(self):
+        """Drop the cached snapshot so the next read queries the server"""
+        with self._lock:
+            self._cache.clear()
+
+    def _get(self, key, path, parser, refresh):
+        """Return a cached API result, fetching it when stale"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and not refresh and now - cached[0] < self.ttl:
+                return list(cached[1])
+
+        data = self.client.get_json(path, timeout=10)
+        records = [parser(model) for model in data.get("models") or []]
+
+        with self._lock:
+            self._cache[key] = (time.monotonic(), records)
+        return list(records)
+
+    def get_installed_models(self, refresh=False):
+        """Get installed models (from /api/tags)
+
+        Args:
+            refresh (bool): Ignore the cached snapshot
+
+        Returns:
+            list: Installed model records
+        """
+        return self._get("installed", "/api/tags", self._parse_installed, refresh)
+
+    def get_loaded_models(self, refresh=False):
+        """Get models currently loaded in memory (from /api/ps)
+
+        Args:
+            refresh (bool): Ignore the cached snapshot
+
+        Returns:
+            list: Loaded model records
+        """
+        return self._get("loaded", "/api/ps", self._parse_loaded, refresh)
+
+    def get_installed_names(self, refresh=False):
+        """Get the set of installed model names"""
+        return {model['name'] for model in self.get_installed_models(refresh)}
+
+    def get_loaded_names(self, refresh=False):
+        """Get the set of loaded model names"""
+        return {model['name'] for model in self.get_loaded_models(refresh)}
+
+    def delete_model(self, model_name):
+        """Delete an installed model and invalidate the snapshot
+
+        Args:
+            model_name (str): Name of the model to delete
+        """
+        try:
+            response = self.client.session.delete(
+                f"{self.client.base_url}/api/delete",
+                json={"model": model_name, "name": model_name},
+                timeout=(5, 60)
+            )
+            response.raise_for_status()
+        finally:
+            self.invalidate()
+
+    @staticmethod
+    def _parse_installed(model):
+        """Convert an /api/tags entry into an installed model record"""
+        details = model.get("details") or {}
+        digest = model.get("digest", "")
+        size_bytes = model.get("size")
+        return {
+            'name': model.get("name") or model.get("model", ""),
+            'id': digest.split(":")[-1][:12] if digest else "Unknown",
+            'digest': digest,
+            'size': format_size(size_bytes),
+            'size_bytes': size_bytes,
+            'modified': format_age(model.get("modified_at")),
+            'modified_at': model.get("modified_at"),
+            'family': details.get("family"),
+            'parameter_size': details.get("parameter_size"),
+            'quantization': details.get("quantization_level")
+        }
+
+    @staticmethod
+    def _parse_loaded(model):
+        """Convert an /api/ps entry into a loaded model record"""
+        digest = model.get("digest", "")
+        size_bytes = model.get("size")
+        size_vram = model.get("size_vram", 0)
+        return {
+            'name': model.get("name") or model.get("model", ""),
+            'id': digest.split(":")[-1][:12] if digest else "Unknown",
+            'digest': digest,
+            'size': format_size(size_bytes),
+            'size_bytes': size_bytes,
+            'size_vram': size_vram,
+            'processor': format_processor(size_bytes, size_vram),
+            'expires_at': model.get("expires_at")
+        }
+
+_shared_registries = {}
+_shared_lock = threading.Lock()
+
+def get_registry(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Get the shared registry for a server so all menus use one snapshot"""
+    key = (host, port)
+    with _shared_lock:
+        registry = _shared_registries.get(key)
+        if registry is None:
+            registry = ModelRegistry(host, port)
+            _shared_registries[key] = registry
+        return registry
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+AI Model Warmup
+Preloads Ollama models through the HTTP API and keeps pinned models resident
+
+Version: 3.0.23
+Author: AI Environment Team
+Date: 2026-10-18
+"""
+
+import json
+import re
+import threading
+import time
+from pathlib import Path
+
+from ai_model_registry import get_registry
+from ai_readiness import wait_until
+
+DEFAULT_KEEP_ALIVE = "30m"
+DEFAULT_REFRESH_INTERVAL = 600
+DEFAULT_LOAD_TIMEOUT = 300
+# Refreshes of resident models answer at once; a long one must not hold up stop()
+REFRESH_TIMEOUT = 30
+
+DURATION_UNITS = {'h': 3600, 'm': 60, 's': 1, 'ms': 0.001}
+
+def keep_alive_seconds(keep_alive):
+    """Seconds a keep_alive value keeps a model loaded
+
+    Accepts what Ollama accepts: seconds as a number, or a duration such as
+    "30m", "1h30m" or "45s".
+
+    Returns:
+        float or None: Seconds, or None if the model stays loaded forever
+                       (negative values) or the value cannot be parsed
+    """
+    if isinstance(keep_alive, (int, float)):
+        return None if keep_alive < 0 else float(keep_alive)
+    text = str(keep_alive).strip()
+    if text.startswith("-"):
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", text)
+    if not parts or "".join(number + unit for number, unit in parts) != text:
+        return None
+    return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+class ModelWarmup:
+    """Warm-up engine for Ollama models
+
+    A model is loaded by sending /api/generate an empty prompt with an
+    explicit keep_alive; Ollama loads the weights and answers without
+    generating anything. Residency is then confirmed through /api/ps.
+
+    Pinned models are re-warmed by a background thread every
+    ``refresh_interval`` seconds so they never reach their keep_alive
+    expiry while the AI Environment is running.
+    """
+
+    def __init__(self, registry=None, keep_alive=DEFAULT_KEEP_ALIVE,
+                 refresh_interval=DEFAULT_REFRESH_INTERVAL, load_timeout=DEFAULT_LOAD_TIMEOUT):
+        """Initialize Model Warmup
+
+        Args:
+            registry (ModelRegistry, optional): Shared model registry
+            keep_alive (str|int): How long Ollama keeps a warmed model loaded
+                ("30m", "1h", seconds, or -1 for forever)
+            refresh_interval (float): Seconds between keep-alive refreshes of pinned models
+            load_timeout (float): Maximum seconds to wait for a model to load
+        """
+        self.registry = registry or get_registry()
+        self.keep_alive = keep_alive
+        self.refresh_interval = refresh_interval
+        self.load_timeout = load_timeout
+        self.pinned_models = []
+        self.configured_pins = []
+        self.last_refresh = {}
+        # Set when the configured refresh interval had to be shortened
+        self.config_warning = None
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def apply_config(self, config):
+        """Apply the "model_warmup" section of install_config.json
+
+        Args:
+            config (dict): Parsed "model_warmup" section
+        """
+        self.keep_alive = config.get('keep_alive', self.keep_alive)
+        self.refresh_interval = config.get('refresh_interval_seconds', self.refresh_interval)
+        self.load_timeout = config.get('load_timeout_seconds', self.load_timeout)
+
+        # Refreshing no more often than keep_alive lets pinned models expire in between
+        self.config_warning = None
+        expiry = keep_alive_seconds(self.keep_alive)
+        if expiry is not None and self.refresh_interval >= expiry:
+            self.config_warning = (f"refresh_interval_seconds ({self.refresh_interval}) is not shorter than "
+                                   f"keep_alive ({self.keep_alive}); refreshing every {expiry / 2:g}s instead")
+            self.refresh_interval = expiry / 2
+
+    def load_config(self, config_path):
+        """Load warm-up settings from install_config.json
+
+        Args:
+            config_path (Path): Path to install_config.json
+
+        Returns:
+            list: Models configured to be pinned
+        """
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f).get('model_warmup', {})
+        except (OSError, ValueError):
+            return []
+
+        self.apply_config(config)
+        self.configured_pins = list(config.get('pinned_models', []))
+        return list(self.configured_pins)
+
+    def preload(self, model_name, keep_alive=None, timeout=None):
+        """Load a model into memory without generating any tokens
+
+        Args:
+            model_name (str): Model to load
+            keep_alive (str|int, optional): Override the default keep_alive
+            timeout (float, optional): Override the default load timeout
+
+        Returns:
+            float: Seconds the load request took
+        """
+        payload = {
+            "model": model_name,
+            "prompt": "",
+            "stream": False,
+            "keep_alive": self.keep_alive if keep_alive is None else keep_alive
+        }
+        start = time.perf_counter()
+        self.registry.client.post_json(
+            "/api/generate",
+            payload,
+            timeout=self.load_timeout if timeout is None else timeout
+        )
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.last_refresh[model_name] = time.time()
+        return elapsed
+
+    def wait_resident(self, model_name, timeout=10):
+        """Wait until /api/ps reports the model as loaded
+
+        Args:
+            model_name (str): Model to check
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            bool: True if the model is resident
+        """
+        resident, _ = wait_until(
+            lambda: model_name in self.registry.get_loaded_names(refresh=True),
+            timeout=timeout
+        )
+        return bool(resident)
+
+    def warm(self, model_name, keep_alive=None):
+        """Preload a model and confirm it is resident
+
+        Args:
+            model_name (str): Model to warm up
+            keep_alive (str|int, optional): Override the default keep_alive
+
+        Returns:
+            dict: model, loaded, load_time and error
+        """
+        result = {'model': model_name, 'loaded': False, 'load_time': None, 'error': None}
+        try:
+            result['load_time'] = self.preload(model_name, keep_alive)
+            result['loaded'] = self.wait_resident(model_name)
+            if not result['loaded']:
+                result['error'] = "model did not appear in /api/ps"
+        except Exception as e:
+            result['error'] = str(e) or type(e).__name__
+        return result
+
+    def pin(self, model_names):
+        """Keep models resident by warming them now and refreshing them periodically
+
+        Args:
+            model_names (list): Models to pin
+
+        Returns:
+            list: Warm-up results for the newly pinned models
+        """
+        results = []
+        for model_name in model_names:
+            with self._lock:
+                if model_name in self.pinned_models:
+                    continue
+                self.pinned_models.append(model_name)
+            results.append(self.warm(model_name))
+
+        if self.pinned_models:
+            self._start_refresher()
+        return results
+
+    def unpin(self, model_names=None):
+        """Stop refreshing models (all pinned models if none are given)
+
+        Unpinned models stay loaded until their keep_alive expires.
+
+        Args:
+            model_names (list, optional): Models to unpin
+        """
+        with self._lock:
+            if model_names is None:
+                self.pinned_models = []
+            else:
+                self.pinned_models = [m for m in self.pinned_models if m not in model_names]
+            idle = not self.pinned_models
+
+        if idle:
+            self.stop()
+
+    def stop(self):
+        """Stop the keep-alive refresh thread
+
+        A refresh request in flight is not interrupted; the thread (a daemon)
+        exits once it returns, after at most REFRESH_TIMEOUT seconds.
+        """
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    def _start_refresher(self):
+        """Start the keep-alive refresh thread if it is not running"""
+        if self._thread and self._thread.is_alive():
+            return
+        # Each thread gets its own event, so one still finishing a refresh after
+        # stop() cannot be revived alongside its replacement
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._refresh_loop, args=(self._stop_event,),
+                                        name="model-keepalive", daemon=True)
+        self._thread.start()
+
+    def _refresh_loop(self, stop_event):
+        """Re-warm pinned models until stopped"""
+        while not stop_event.wait(self.refresh_interval):
+            with self._lock:
+                models = list(self.pinned_models)
+            for model_name in models:
+                if stop_event.is_set():
+                    return
+                try:
+                    self.preload(model_name, timeout=min(self.load_timeout, REFRESH_TIMEOUT))
+                except Exception:
+                    # Server may be restarting or still loading; retry on the next cycle
+                    pass
+
+_shared_warmup = None
+_shared_lock = threading.Lock()
+
+def get_warmup(registry=None, config_path=None):
+    """Get the shared warm-up engine so pins survive between menus
+
+    Args:
+        registry (ModelRegistry, optional): Shared model registry
+        config_path (Path, optional): install_config.json to read settings from
+
+    Returns:
+        ModelWarmup: Shared warm-up engine
+    """
+    global _shared_warmup
+    with _shared_lock:
+        if _shared_warmup is None:
+            _shared_warmup = ModelWarmup(registry)
+        if config_path is not None:
+            _shared_warmup.load_config(Path(config_path))
+        return _shared_warmup
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+AI Ollama Batch Runner
+Asynchronous batch inference over the Ollama /api/generate endpoint
+
+Version: 3.0.23
+Author: AI Environment Team
+Date: 2026-10-18
+
+Usage:
+    python ai_ollama_batch.py --input prompts.txt --model phi:2.7b --concurrency 4
+    python ai_ollama_batch.py --input prompts.txt --output results.jsonl
+"""
+
+import asyncio
+import json
+import math
+import sys
+import time
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    from colorama import Fore, Style
+except ImportError:
+    class Fore:
+        GREEN = RED = YELLOW = CYAN = ""
+    class Style:
+        RESET_ALL = ""
+
+from ai_ollama_client import DEFAULT_HOST, DEFAULT_PORT, DEFAULT_MODEL
+
+async def _generate_one(client, semaphore, index, prompt, model, options, timeout):
+    """Run one prompt once a concurrency slot is free
+
+    Latency is measured from the moment the request is sent, so time spent
+    waiting for a free slot is not counted.
+    """
+    payload = {"model": model, "prompt": prompt, "stream": False}
+    if options:
+        payload["options"] = options
+
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            response = await client.post("/api/generate", json=payload, timeout=timeout)
+            response.raise_for_status()
+            data = response.json()
+            if data.get("error"):
+                raise RuntimeError(data["error"])
+            return {
+                'index': index,
+                'prompt': prompt,
+                'response': data.get("response", ""),
+                'latency': time.perf_counter() - start,
+                'eval_count': data.get("eval_count"),
+                'error': None
+            }
+        except Exception as e:
+            return {
+                'index': index,
+                'prompt': prompt,
+                'response': None,
+                'latency': time.perf_counter() - start,
+                'eval_count': None,
+                'error': str(e) or type(e).__name__
+            }
+
+async def generate_batch_async(prompts, model=DEFAULT_MODEL, concurrency=4, host=DEFAULT_HOST,
+                               port=DEFAULT_PORT, options=None, timeout=300, on_result=None):
+    """Generate responses for many prompts with N requests in flight
+
+    Set OLLAMA_NUM_PARALLEL on the server to at least ``concurrency`` so
+    the in-flight requests are actually processed in parallel.
+
+    Args:
+        prompts (iterable): Prompt strings
+        model (str): Model name
+        concurrency (int): Maximum number of requests in flight
+        host (str): Ollama host
+        port (int): Ollama port
+        options (dict, optional): Ollama generation options
+        timeout (float): Per-request timeout in seconds
+        on_result (callable, optional): Called with each result as it completes
+
+    Returns:
+        list: One result dict per prompt, in input order, with keys
+              index, prompt, response, latency, eval_count, error
+    """
+    if not HTTPX_AVAILABLE:
+        raise ImportError("httpx package is required for batch inference")
+
+    prompts = list(prompts)
+    concurrency = max(1, int(concurrency))
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=f"http://{host}:{port}", limits=limits) as client:
+        tasks = [
+            asyncio.ensure_future(_generate_one(client, semaphore, i, prompt, model, options, timeout))
+            for i, prompt in enumerate(prompts)
+        ]
+        if on_result:
+            for finished in asyncio.as_completed(tasks):
+                on_result(await finished)
+        results = await asyncio.gather(*tasks)
+
+    return list(results)
+
+def generate_batch(prompts, model=DEFAULT_MODEL, concurrency=4, **kwargs):
+    """Synchronous wrapper around generate_batch_async for scripts"""
+    return asyncio.run(generate_batch_async(prompts, model=model, concurrency=concurrency, **kwargs))
+
+def _percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+def summarize_results(results, wall_time):
+    """Summarize batch results
+
+    Args:
+        results (list): Results from generate_batch
+        wall_time (float): Total wall-clock seconds of the batch
+
+    Returns:
+        dict: Counts, latency percentiles and throughput
+    """
+    latencies = sorted(r['latency'] for r in results if r['error'] is None)
+    failed = sum(1 for r in results if r['error'] is not None)
+    return {
+        'total': len(results),
+        'succeeded': len(latencies),
+        'failed': failed,
+        'wall_time': wall_time,
+        'summed_latency': sum(r['latency'] for r in results),
+        'p50': _percentile(latencies, 50),
+        'p90': _percentile(latencies, 90),
+        'p99': _percentile(latencies, 99),
+        'max': latencies[-1] if latencies else 0.0,
+        'requests_per_second': (len(results) / wall_time) if wall_time > 0 else 0.0
+    }
+
+def print_summary(summary):
+    """Print batch summary"""
+    print(f"\n{Fore.CYAN}{'='*50}{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}Batch Summary{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}{'='*50}{Style.RESET_ALL}")
+    print(f"Prompts: {summary['total']}")
+    print(f"{Fore.GREEN}Succeeded: {summary['succeeded']}{Style.RESET_ALL}")
+    if summary['failed']:
+        print(f"{Fore.RED}Failed: {summary['failed']}{Style.RESET_ALL}")
+    print(f"Wall time: {summary['wall_time']:.2f}s (sum of request latencies: {summary['summed_latency']:.2f}s)")
+    print(f"Latency p50/p90/p99/max: {summary['p50']:.2f}s / {summary['p90']:.2f}s / "
+          f"{summary['p99']:.2f}s / {summary['max']:.2f}s")
+    print(f"Throughput: {summary['requests_per_second']:.2f} requests/s")
+
+def main():
+    """Command line entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Batch inference over the local Ollama server')
+    parser.add_argument('--input', default='-',
+                       help='File with one prompt per line (default: stdin)')
+    parser.add_argument('--output', help='Write results as JSON lines to this file')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help='Model name')
+    parser.add_argument('--concurrency', type=int, default=4,
+                       help='Number of requests kept in flight')
+    parser.add_argument('--timeout', type=float, default=300, help='Per-request timeout in seconds')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Ollama host')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Ollama port')
+    args = parser.parse_args()
+
+    if args.input == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    prompts = [line for line in lines if line.strip()]
+
+    if not prompts:
+        print(f"{Fore.YELLOW}[WARNING] No prompts to process{Style.RESET_ALL}")
+        sys.exit(1)
+
+    print(f"{Fore.YELLOW}[INFO] Running {len(prompts)} prompts on {args.model} "
+          f"with {args.concurrency} in flight...{Style.RESET_ALL}")
+
+    done = [0]
+
+    def report(result):
+        done[0] += 1
+        if result['error']:
+            print(f"{Fore.RED}[{done[0]}/{len(prompts)}] #{result['index']} failed "
+                  f"after {result['latency']:.2f}s: {result['error']}{Style.RESET_ALL}")
+        else:
+            print(f"[{done[0]}/{len(prompts)}] #{result['index']} {result['latency']:.2f}s")
+
+    start = time.perf_counter()
+    results = generate_batch(
+        prompts,
+        model=args.model,
+        concurrency=args.concurrency,
+        host=args.host,
+        port=args.port,
+        timeout=args.timeout,
+        on_result=report
+    )
+    summary = summarize_results(results, time.perf_counter() - start)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            for result in results:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        print(f"{Fore.GREEN}[OK] Results written to {args.output}{Style.RESET_ALL}")
+
+    print_summary(summary)
+    sys.exit(0 if summary['failed'] == 0 else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+AI Ollama Client
+Pooled keep-alive HTTP client for the local Ollama server with streaming support
+
+Version: 3.0.23
+Author: AI Environment Team
+Date: 2026-10-18
+"""
+
+import json
+import threading
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 11434
+DEFAULT_MODEL = "phi:2.7b"
+
+class OllamaError(Exception):
+    """Error reported by the Ollama server inside a response body"""
+
+class OllamaClient:
+    """Keep-alive client for the Ollama HTTP API
+
+    A single requests.Session is reused for every call, so repeated prompts
+    share pooled TCP connections instead of opening a new one per request.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=60, pool_size=10):
+        """Initialize Ollama client
+
+        Args:
+            host (str): Ollama server host
+            port (int): Ollama server port
+            timeout (float): Read timeout in seconds (per chunk when streaming)
+            pool_size (int): Maximum number of pooled keep-alive connections
+        """
+        if not REQUESTS_AVAILABLE:
+            raise ImportError("requests package is required for OllamaClient")
+
+        self.host = host
+        self.port = port
+        self.base_url = f"http://{host}:{port}"
+        self.timeout = timeout
+        self.connect_timeout = 5
+        self.last_stats = {}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+    def _timeout(self, timeout):
+        """Build a (connect, read) timeout tuple; a tuple passed in is used as is"""
+        if isinstance(timeout, tuple):
+            return timeout
+        return (self.connect_timeout, self.timeout if timeout is None else timeout)
+
+    def get_json(self, path, timeout=None):
+        """GET an API endpoint and return the decoded JSON body"""
+        response = self.session.get(f"{self.base_url}{path}", timeout=self._timeout(timeout))
+        response.raise_for_status()
+        return response.json()
+
+    def post_json(self, path, payload, timeout=None):
+        """POST a JSON payload and return the decoded JSON body"""
+        response = self.session.post(f"{self.base_url}{path}", json=payload, timeout=self._timeout(timeout))
+        response.raise_for_status()
+        result = response.json()
+        if isinstance(result, dict) and result.get("error"):
+            raise OllamaError(result["error"])
+        return result
+
+    def stream_json(self, path, payload, timeout=None):
+        """POST a JSON payload and yield each NDJSON chunk as it arrives
+
+        Args:
+            path (str): API path, e.g. "/api/generate"
+            payload (dict): Request body
+            timeout (float, optional): Maximum wait between two chunks
+
+        Yields:
+            dict: Decoded chunk
+        """
+        with self.session.post(
+            f"{self.base_url}{path}",
+            json=payload,
+            stream=True,
+            timeout=self._timeout(timeout)
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise OllamaError(chunk["error"])
+                yield chunk
+
+    def generate(self, prompt, model=DEFAULT_MODEL, options=None, timeout=None, **fields):
+        """Generate a complete response (blocks until generation is done)
+
+        Returns:
+            str: Generated text
+        """
+        payload = {"model": model, "prompt": prompt, "stream": False}
+        if options:
+            payload["options"] = options
+        payload.update(fields)
+
+        result = self.post_json("/api/generate", payload, timeout=timeout)
+        self.last_stats = {k: v for k, v in result.items() if k not in ("response", "context")}
+        return result.get("response", "")
+
+    def generate_stream(self, prompt, model=DEFAULT_MODEL, options=None, timeout=None, **fields):
+        """Generate a response token by token
+
+        The first token is yielded as soon as the server sends it, so the
+        caller can show output long before the full generation finishes.
+        Timing statistics of the final chunk are kept in ``last_stats``.
+
+        Yields:
+            str: Next piece of generated text
+        """
+        payload = {"model": model, "prompt": prompt, "stream": True}
+        if options:
+            payload["options"] = options
+        payload.update(fields)
+
+        self.last_stats = {}
+        for chunk in self.stream_json("/api/generate", payload, timeout=timeout):
+            token = chunk.get("response", "")
+            if token:
+                yield token
+            if chunk.get("done"):
+                self.last_stats = {k: v for k, v in chunk.items() if k not in ("response", "context")}
+
+    def version(self, timeout=2):
+        """Get Ollama server version string"""
+        return self.get_json("/api/version", timeout=timeout).get("version", "unknown")
+
+_shared_clients = {}
+_shared_lock = threading.Lock()
+
+def get_client(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Get the shared pooled client for a server
+
+    All AI Environment modules talking to the same server reuse one
+    client, and therefore one connection pool.
+    """
+    key = (host, port)
+    with _shared_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            client = OllamaClient(host, port)
+            _shared_clients[key] = client
+        return client
+
+def query_ollama(prompt, model=DEFAULT_MODEL, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=60):
+    """Query Ollama API (compatible with the original one-shot helper)
+
+    Returns:
+        str: Response text, or an "Error: ..." message
+    """
+    try:
+        return get_client(host, port).generate(prompt, model=model, timeout=timeout)
+    except Exception as e:
+        return f"Error: {e}"
+
+def main():
+    """Stream a single prompt from the command line"""
+    import argparse
+    import sys
+    import time
+
+    parser = argparse.ArgumentParser(description='Stream a prompt through the local Ollama server')
+    parser.add_argument('prompt', help='Prompt text')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help='Model name')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Ollama host')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Ollama port')
+    args = parser.parse_args()
+
+    client = get_client(args.host, args.port)
+    start = time.perf_counter()
+    first_token = None
+    try:
+        for token in client.generate_stream(args.prompt, model=args.model):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            print(token, end="", flush=True)
+        print()
+    except Exception as e:
+        print(f"\nError: {e}")
+        sys.exit(1)
+
+    total = time.perf_counter() - start
+    if first_token is not None:
+        print(f"\n[time to first token: {first_token:.2f}s, total: {total:.2f}s]")
+
+if __name__ == "__main__":
+    main()
@@ -29,6 +29,9 @@ except ImportError:
     class Style:
         RESET_ALL = ""
 
+from ai_ollama_client import DEFAULT_HOST, DEFAULT_PORT, REQUESTS_AVAILABLE, get_client
+from ai_readiness import wait_until
+
 class OllamaManager:
     """Manages Ollama server lifecycle and operations"""
     
@@ -36,6 +39,13 @@ class OllamaManager:
         self.ai_env_path = Path(ai_env_path)
         self.ollama_exe = self.ai_env_path / "Ollama" / "ollama.exe"
         self.process = None
+        self.host = DEFAULT_HOST
+        self.port = DEFAULT_PORT
+        self.startup_timeout = 15
+        self.last_startup_time = None
+        self.process_cache_ttl = 2.0
+        self._process_cache = None
+        self._process_cache_time = 0.0
         
     def print_info(self, message):
         """Print info message"""
@@ -60,23 +70,136 @@ class OllamaManager:
             return False
         return True
         
-    def get_ollama_processes(self):
-        """Get all running Ollama processes"""
+    def get_ollama_processes(self, use_cache=True, full_scan=False):
+        """Get all running Ollama processes
+        
+        The PID recorded in background_processes.json is checked first;
+        the full process table is only scanned when that misses, or always
+        with full_scan. The result is cached for process_cache_ttl seconds.
+        
+        Args:
+            use_cache (bool): Allow returning the cached result
+            full_scan (bool): Also find untracked Ollama processes (implies
+                              use_cache=False)
+        """
         if not PSUTIL_AVAILABLE:
             return []
             
+        now = time.monotonic()
+        if (use_cache and not full_scan and self._process_cache is not None
+                and now - self._process_cache_time < self.process_cache_ttl):
+            # is_running() also compares create_time, so reused PIDs drop out
+            return [proc for proc in self._process_cache if proc.is_running()]
+            
+        ollama_processes = self._get_tracked_ollama_processes()
+        if full_scan:
+            tracked_pids = {proc.pid for proc in ollama_processes}
+            ollama_processes += [proc for proc in self._scan_ollama_processes()
+                                 if proc.pid not in tracked_pids]
+        elif not ollama_processes:
+            ollama_processes = self._scan_ollama_processes()
+            
+        self._process_cache = ollama_processes
+        self._process_cache_time = time.monotonic()
+        return list(ollama_processes)
+        
+    def invalidate_process_cache(self):
+        """Forget the cached process lookup"""
+        self._process_cache = None
+        
+    def _get_tracked_ollama_processes(self):
+        """Look up Ollama through the PIDs recorded by the process tracker
+        
+        A tracked PID only counts if its create_time still matches the
+        recorded one (or, for older entries without it, if the process is
+        still named ollama). Runner child processes are included.
+        """
+        try:
+            from ai_process_manager import BackgroundProcessManager
+            tracked = BackgroundProcessManager(self.ai_env_path).tracked_processes
+        except Exception:
+            return []
+            
+        found = {}
+        for process_id, process_info in tracked.items():
+            if not process_id.startswith("ollama"):
+                continue
+            try:
+                proc = psutil.Process(process_info['pid'])
+                create_time = process_info.get('create_time')
+                if create_time is not None:
+                    if abs(proc.create_time() - create_time) > 0.01:
+                        continue
+                elif 'ollama' not in proc.name().lower():
+                    continue
+                    
+                found[proc.pid] = proc
+                for child in proc.children(recursive=True):
+                    try:
+                        if 'ollama' in child.name().lower():
+                            found[child.pid] = child
+                    except (psutil.NoSuchProcess, psutil.AccessDenied):
+                        continue
+            except (KeyError, TypeError, psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return list(found.values())
+        
+    def _scan_ollama_processes(self):
+        """Scan the process table by name (slow path)"""
         ollama_processes = []
         try:
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+            for proc in psutil.process_iter(['name']):
                 if proc.info['name'] and 'ollama' in proc.info['name'].lower():
                     ollama_processes.append(proc)
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             pass
         return ollama_processes
         
-    def is_ollama_running(self):
+    def get_api_version(self):
+        """Get server version from GET /api/version
+        
+        Returns:
+            str: Version string, or None if the API is not answering
+        """
+        if not REQUESTS_AVAILABLE:
+            # Without an HTTP client fall back to process detection
+            return "unknown" if self.is_ollama_running(use_cache=False) else None
+        try:
+            # Short connect timeout too: a probe must not wait out the client's 5s default
+            return get_client(self.host, self.port).version(timeout=(0.5, 0.5))
+        except Exception:
+            return None
+            
+    def is_api_ready(self):
+        """Check if the Ollama HTTP API is accepting requests"""
+        return self.get_api_version() is not None
+        
+    def wait_for_api(self, timeout=None, abort=None):
+        """Wait until the Ollama API answers, with exponential backoff
+        
+        Args:
+            timeout (float, optional): Deadline in seconds. Defaults to startup_timeout.
+            abort (callable, optional): Returns True to stop waiting early
+            
+        Returns:
+            tuple: (version string or None, elapsed seconds)
+        """
+        if timeout is None:
+            timeout = self.startup_timeout
+        return wait_until(self.get_api_version, timeout=timeout, abort=abort)
+        
+    def wait_for_api_down(self, timeout=5):
+        """Wait until the Ollama API stops answering
+        
+        Returns:
+            bool: True if the API went down before the deadline
+        """
+        down, _ = wait_until(lambda: not self.is_api_ready(), timeout=timeout)
+        return bool(down)
+        
+    def is_ollama_running(self, use_cache=True):
         """Check if Ollama server is running"""
-        processes = self.get_ollama_processes()
+        processes = self.get_ollama_processes(use_cache)
         return len(processes) > 0
         
     def get_ollama_status(self):
@@ -117,46 +240,65 @@ class OllamaManager:
             if not self.check_ollama_exists():
                 return False
                 
-            if self.is_ollama_running():
+            if self.is_api_ready() or self.is_ollama_running():
                 self.print_warning("Ollama server is already running")
                 return True
                 
             self.print_info("Starting Ollama server in background...")
             
-            # Start Ollama server as background process
-            self.process = subprocess.Popen(
-                [str(self.ollama_exe), 'serve'],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
+            from ai_process_manager import BackgroundProcessManager
+            process_manager = BackgroundProcessManager(self.ai_env_path)
+            command = [str(self.ollama_exe), 'serve']
+            url = f"http://{self.host}:{self.port}"
+            
+            # Prefer the supervisor, which restarts the server if it crashes
+            self.process = None
+            pid = process_manager.launch_supervised("ollama_server", "Ollama Server", command,
+                                                    url=url, restart="on-failure")
+            if pid is None:
+                # Start Ollama server as background process
+                self.process = subprocess.Popen(
+                    command,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+                )
+                pid = self.process.pid
+                
+            def exited():
+                if self.process is not None:
+                    return self.process.poll() is not None
+                return process_manager.get_supervised_status("ollama_server") not in ("running", "backoff")
             
-            # Wait for server to start
+            # Wait until the API answers, not just until a process exists
             self.print_info("Waiting for server to initialize...")
-            for i in range(10):  # Wait up to 10 seconds
-                time.sleep(1)
-                if self.is_ollama_running():
-                    status = self.get_ollama_status()
-                    pid = status['processes'][0]['pid']
-                    self.print_success(f"Ollama server started successfully (PID: {pid})")
-                    
-                    # Track the process
+            version, elapsed = self.wait_for_api(abort=exited)
+            
+            self.invalidate_process_cache()
+            if version:
+                self.last_startup_time = elapsed
+                self.print_success(f"Ollama server ready in {elapsed:.2f}s (PID: {pid}, version {version})")
+                
+                # Track the process (supervised ones are tracked already)
+                if self.process is not None:
                     try:
-                        from ai_process_manager import BackgroundProcessManager
-                        process_manager = BackgroundProcessManager(self.ai_env_path)
                         process_manager.track_process(
                             process_id="ollama_server",
                             name="Ollama Server",
                             pid=pid,
                             command=f"{self.ollama_exe} serve",
-                            url="http://127.0.0.1:11434"
+                            url=url
                         )
                     except Exception as e:
                         self.print_warning(f"Could not track Ollama process: {e}")
-                    
-                    return True
-                    
-            self.print_error("Ollama server failed to start within timeout")
+                
+                return True
+                
+            if exited():
+                exit_code = self.process.returncode if self.process is not None else "see logs/ollama_server.log"
+                self.print_error(f"Ollama server exited during startup (exit code: {exit_code})")
+            else:
+                self.print_error(f"Ollama server did not answer within {self.startup_timeout} seconds")
             return False
             
         except Exception as e:
@@ -166,13 +308,24 @@ class OllamaManager:
     def stop_ollama_server(self):
         """Stop Ollama server"""
         try:
-            processes = self.get_ollama_processes()
+            # A supervised server would be restarted if it were only killed
+            from ai_process_manager import BackgroundProcessManager
+            supervised = BackgroundProcessManager(self.ai_env_path).stop_supervised("ollama_server")
+            if supervised:
+                self.invalidate_process_cache()
+                
+            # Every Ollama process, not just the tracked one, or the verify step below fails
+            processes = self.get_ollama_processes(full_scan=True)
             
             if not processes:
+                if supervised:
+                    self.print_success("Ollama server stopped")
+                    return True
                 self.print_warning("Ollama server is not running")
                 return True
                 
             self.print_info(f"Stopping {len(processes)} Ollama process(es)...")
+            start = time.perf_counter()
             
             # Try graceful shutdown first
             for proc in processes:
@@ -181,11 +334,10 @@ class OllamaManager:
                 except (psutil.NoSuchProcess, psutil.AccessDenied):
                     continue
                     
-            # Wait for graceful shutdown
-            time.sleep(3)
+            # Wait for the processes to actually exit (up to 3 seconds)
+            gone, remaining_processes = psutil.wait_procs(processes, timeout=3)
             
             # Force kill if still running
-            remaining_processes = self.get_ollama_processes()
             if remaining_processes:
                 self.print_warning("Force killing remaining Ollama processes...")
                 for proc in remaining_processes:
@@ -194,11 +346,11 @@ class OllamaManager:
                     except (psutil.NoSuchProcess, psutil.AccessDenied):
                         continue
                         
-                time.sleep(1)
+                psutil.wait_procs(remaining_processes, timeout=2)
                 
             # Verify shutdown
-            if not self.is_ollama_running():
-                self.print_success("Ollama server stopped successfully")
+            if not self.is_ollama_running(use_cache=False):
+                self.print_success(f"Ollama server stopped in {time.perf_counter() - start:.2f}s")
                 return True
             else:
                 self.print_error("Failed to stop all Ollama processes")
@@ -215,7 +367,10 @@ class OllamaManager:
         if not self.stop_ollama_server():
             return False
             
-        time.sleep(2)  # Brief pause between stop and start
+        # Make sure the old server released the API port before starting again
+        if not self.wait_for_api_down():
+            self.print_error("Ollama API is still answering after stop")
+            return False
         
         return self.start_ollama_server()
         
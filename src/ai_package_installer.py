@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+AI Package Installer
+Installs many requirements with a single pip invocation and times each phase
+
+Version: 3.0.23
+Author: AI Environment Team
+Date: 2026-10-18
+
+Usage:
+    python ai_package_installer.py torch "langchain>=0.1.0" --wheelhouse D:/AI_Environment/wheelhouse
+    python ai_package_installer.py -r requirements.txt --wheelhouse ./wheelhouse --offline
+"""
+
+import re
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+try:
+    from colorama import Fore, Style
+except ImportError:
+    class Fore:
+        GREEN = RED = YELLOW = CYAN = ""
+    class Style:
+        RESET_ALL = ""
+
+# pip output prefixes that mark the phase pip is in
+PHASE_MARKERS = (
+    ("Installing collected packages", "install"),
+    ("Attempting uninstall", "install"),
+    ("Downloading", "download"),
+    ("Using cached", "download"),
+    ("Collecting", "resolve"),
+    ("Looking in", "resolve"),
+    ("Processing", "resolve"),
+    ("Requirement already satisfied", "resolve"),
+    ("INFO: pip is looking at multiple versions", "resolve"),
+    ("Building wheel", "build"),
+    ("Building wheels", "build"),
+)
+
+# Lines of pip's "--progress-bar raw" mode (pip 24.1+): bytes done and total
+PROGRESS_PATTERN = re.compile(r"^Progress (\d+) of (\d+)$")
+RAW_PROGRESS_PIP = (24, 1)
+
+# Markers of a resolution failure that a per-package retry can work around
+# (conflicting pins, or one requirement that has no matching distribution)
+CONFLICT_MARKERS = ("ResolutionImpossible", "conflicting dependencies", "Cannot install",
+                    "No matching distribution")
+
+class PackageInstaller:
+    """Installs requirements in one pip run with streamed output
+
+    Resolution, downloads and installation happen once for the whole set
+    instead of once per package. When the combined set cannot be resolved
+    (conflicts, or a requirement that is not available), each requirement
+    is installed on its own so the rest still get installed.
+
+    Phase timings are derived from pip's output: time is attributed to the
+    phase of the most recent marker line (resolve, download, build, install).
+    Download progress is streamed on one updating line where pip supports
+    machine-readable progress (24.1+); older pip runs without a progress bar,
+    which it cannot draw into a pipe anyway.
+    """
+
+    def __init__(self, python=None, wheelhouse=None, offline=False, timeout=3600):
+        """Initialize Package Installer
+
+        Args:
+            python (str, optional): Interpreter whose pip is used (default: current one)
+            wheelhouse (Path, optional): Directory of wheels passed as --find-links
+            offline (bool): Install only from the wheelhouse (--no-index)
+            timeout (float): Maximum seconds for one pip run
+        """
+        self.python = python or sys.executable
+        self.wheelhouse = Path(wheelhouse) if wheelhouse else None
+        self.offline = offline
+        self.timeout = timeout
+        self.last_phases = {}
+        self._pip_version = None
+
+    def pip_version(self):
+        """Version of the interpreter's pip as a tuple ((0,) if unknown)"""
+        if self._pip_version is None:
+            try:
+                output = subprocess.run([self.python, "-m", "pip", "--version"], capture_output=True,
+                                        text=True, timeout=30).stdout
+                match = re.match(r"pip (\d+)\.(\d+)", output)
+                self._pip_version = tuple(map(int, match.groups())) if match else (0,)
+            except (OSError, subprocess.TimeoutExpired):
+                self._pip_version = (0,)
+        return self._pip_version
+
+    def build_command(self, requirements):
+        """Build the pip command line"""
+        progress = "raw" if self.pip_version() >= RAW_PROGRESS_PIP else "off"
+        command = [self.python, "-m", "pip", "install", "--progress-bar", progress]
+        if self.wheelhouse:
+            command += ["--find-links", str(self.wheelhouse)]
+            if self.offline:
+                command.append("--no-index")
+        return command + list(requirements)
+
+    @staticmethod
+    def classify(line):
+        """Return the phase a pip output line belongs to (or None)"""
+        text = line.strip()
+        for marker, phase in PHASE_MARKERS:
+            if text.startswith(marker):
+                return phase
+        return None
+
+    def run_pip(self, requirements, echo=True):
+        """Run one pip install and stream its output
+
+        Args:
+            requirements (list): Requirement strings
+            echo (bool): Print pip output as it arrives
+
+        Returns:
+            dict: success, returncode, phases (seconds per phase), elapsed,
+                  conflict (resolver failure detected), output (last lines)
+        """
+        phases = {}
+        tail = []
+        conflict = False
+        start = time.perf_counter()
+        phase, phase_start = "startup", start
+
+        process = subprocess.Popen(
+            self.build_command(requirements),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1
+        )
+        # The deadline has to hold while output is streamed, not only after EOF
+        timed_out = threading.Event()
+
+        def kill():
+            # pip's build subprocesses hold the pipe open too, so stop the whole tree
+            from ai_port_manager import terminate_process_trees
+            timed_out.set()
+            terminate_process_trees([process.pid], timeout=2)
+            process.kill()
+
+        timer = threading.Timer(self.timeout, kill)
+        timer.start()
+        progress_shown = False
+        try:
+            for line in process.stdout:
+                progress = PROGRESS_PATTERN.match(line.strip())
+                if progress:
+                    if echo:
+                        done, total = (int(value) / 1e6 for value in progress.groups())
+                        percent = f" ({done / total:.0%})" if total else ""
+                        print(f"\r    {done:.1f} of {total:.1f} MB{percent}   ", end="", flush=True)
+                        progress_shown = True
+                    continue
+                if progress_shown:
+                    print()
+                    progress_shown = False
+                now = time.perf_counter()
+                new_phase = self.classify(line)
+                if new_phase and new_phase != phase:
+                    phases[phase] = phases.get(phase, 0.0) + now - phase_start
+                    phase, phase_start = new_phase, now
+                if any(marker in line for marker in CONFLICT_MARKERS):
+                    conflict = True
+                tail = (tail + [line.rstrip()])[-20:]
+                if echo and line.strip():
+                    print(f"    {line.rstrip()}")
+            if progress_shown:
+                print()
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+        if timed_out.is_set():
+            tail.append(f"pip timed out after {self.timeout}s")
+
+        end = time.perf_counter()
+        phases[phase] = phases.get(phase, 0.0) + end - phase_start
+        self.last_phases = phases
+        return {
+            'success': returncode == 0,
+            'returncode': returncode,
+            'phases': phases,
+            'elapsed': end - start,
+            'conflict': conflict,
+            'output': tail
+        }
+
+    def install(self, requirements, echo=True):
+        """Install all requirements, splitting the set only on resolver conflicts
+
+        Returns:
+            dict: success, installed, failed, phases (summed), elapsed, runs
+        """
+        requirements = list(requirements)
+        summary = {'success': True, 'installed': [], 'failed': [], 'phases': {}, 'elapsed': 0.0, 'runs': 0}
+        if not requirements:
+            return summary
+
+        def account(result):
+            summary['runs'] += 1
+            summary['elapsed'] += result['elapsed']
+            for name, seconds in result['phases'].items():
+                summary['phases'][name] = summary['phases'].get(name, 0.0) + seconds
+
+        result = self.run_pip(requirements, echo)
+        account(result)
+        if result['success']:
+            summary['installed'] = requirements
+            return summary
+
+        if not result['conflict'] or len(requirements) == 1:
+            summary['success'] = False
+            summary['failed'] = requirements
+            return summary
+
+        # The set cannot be resolved together: give every requirement its own run
+        print(f"{Fore.YELLOW}[WARNING] Requirements cannot be resolved together; "
+              f"installing them one by one{Style.RESET_ALL}")
+        for requirement in requirements:
+            result = self.run_pip([requirement], echo)
+            account(result)
+            (summary['installed'] if result['success'] else summary['failed']).append(requirement)
+        summary['success'] = not summary['failed']
+        return summary
+
+def print_phase_summary(summary):
+    """Print per-phase timings of an install"""
+    print(f"{Fore.CYAN}[INFO] pip runs: {summary['runs']}, total {summary['elapsed']:.1f}s{Style.RESET_ALL}")
+    for name in ("startup", "resolve", "download", "build", "install"):
+        if name in summary['phases']:
+            print(f"    {name:<9} {summary['phases'][name]:7.1f}s")
+
+def main():
+    """Command line entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Install requirements with one pip run')
+    parser.add_argument('requirements', nargs='*', help='Requirement strings')
+    parser.add_argument('-r', '--requirement-file', help='Read requirements from a file')
+    parser.add_argument('--wheelhouse', help='Directory of pre-downloaded wheels')
+    parser.add_argument('--offline', action='store_true', help='Install only from the wheelhouse')
+    parser.add_argument('--python', help='Interpreter to install into (default: this one)')
+    args = parser.parse_args()
+
+    requirements = list(args.requirements)
+    if args.requirement_file:
+        with open(args.requirement_file, 'r', encoding='utf-8') as f:
+            requirements += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    installer = PackageInstaller(args.python, args.wheelhouse, args.offline)
+    summary = installer.install(requirements)
+    print_phase_summary(summary)
+    for requirement in summary['failed']:
+        print(f"{Fore.RED}[ERROR] Failed: {requirement}{Style.RESET_ALL}")
+    sys.exit(0 if summary['success'] else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+AI Package Probe
+Checks presence and versions of many packages in a single interpreter
+
+Version: 3.0.23
+Author: AI Environment Team
+Date: 2026-10-18
+
+Run inside the target interpreter; only the standard library is used so
+the probe works in any environment. Packages are located with
+importlib.util.find_spec and versions are read from importlib.metadata,
+so no package code is executed unless --deep is given.
+
+Usage:
+    python ai_package_probe.py "torch" "langchain>=0.1.0" --deep
+"""
+
+import json
+import re
+import sys
+import time
+import importlib
+import importlib.util
+
+try:
+    import importlib.metadata as importlib_metadata
+except ImportError:  # Python < 3.8
+    importlib_metadata = None
+
+# Distributions whose import name cannot be derived from the distribution name
+IMPORT_NAMES = {
+    "beautifulsoup4": "bs4",
+    "scikit-learn": "sklearn",
+    "python-dotenv": "dotenv",
+    "faiss-cpu": "faiss",
+    "faiss-gpu": "faiss",
+    "pyautogen": "autogen",
+    "sentence-transformers": "sentence_transformers",
+    "opencv-python": "cv2",
+    "pillow": "PIL",
+    "pyyaml": "yaml",
+    "pywin32": "win32api",
+    "python-dateutil": "dateutil",
+}
+
+REQUIREMENT_PATTERN = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*(.*?)\s*(?:;.*)?$")
+
+def normalize_name(name):
+    """Normalize a distribution name (PEP 503)"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+def parse_requirement(requirement):
+    """Split a requirement such as "langchain>=0.1.0" into (name, specifier)"""
+    match = REQUIREMENT_PATTERN.match(requirement)
+    if not match:
+        return requirement.strip(), ""
+    return match.group(1), match.group(2).replace(" ", "")
+
+def import_name_for(distribution):
+    """Work out the top-level module a distribution provides
+
+    Known exceptions come first, then the distribution's own top_level.txt,
+    then the distribution name with dashes turned into underscores.
+    """
+    normalized = normalize_name(distribution)
+    if normalized in IMPORT_NAMES:
+        return IMPORT_NAMES[normalized]
+
+    if importlib_metadata is not None:
+        try:
+            top_level = importlib_metadata.distribution(distribution).read_text("top_level.txt")
+            names = [line.strip() for line in (top_level or "").splitlines()
+                     if line.strip() and not line.startswith("_")]
+            if names:
+                return names[0]
+        except importlib_metadata.PackageNotFoundError:
+            pass
+
+    return normalized.replace("-", "_")
+
+def _version_tuple(version):
+    """Numeric release tuple of a version string ("2.1.0rc1" -> (2, 1, 0))"""
+    parts = []
+    for piece in version.split("+")[0].split("."):
+        digits = re.match(r"\d+", piece)
+        if not digits:
+            break
+        parts.append(int(digits.group()))
+        if digits.group() != piece:
+            break
+    return tuple(parts)
+
+def _compare(installed, operator, wanted):
+    """Compare release tuples for one specifier clause"""
+    wildcard = wanted.endswith(".*")
+    a, b = _version_tuple(installed), _version_tuple(wanted[:-2] if wildcard else wanted)
+    if wildcard and operator in ("==", "!="):
+        return (a[:len(b)] == b) == (operator == "==")
+
+    length = max(len(a), len(b))
+    a, b = a + (0,) * (length - len(a)), b + (0,) * (length - len(b))
+    if operator == "~=":
+        prefix = len(_version_tuple(wanted)) - 1
+        return a >= b and a[:prefix] == b[:prefix]
+    return {
+        "==": a == b,
+        "!=": a != b,
+        ">=": a >= b,
+        "<=": a <= b,
+        ">": a > b,
+        "<": a < b
+    }.get(operator, True)
+
+def satisfies(version, specifier):
+    """Check a version against a specifier such as ">=0.1.0,<2"
+
+    Uses the packaging library when present and a release-number
+    comparison otherwise.
+    """
+    if not specifier:
+        return True
+    try:
+        from packaging.specifiers import SpecifierSet
+        return SpecifierSet(specifier).contains(version, prereleases=True)
+    except ImportError:
+        pass
+    except Exception:
+        return False
+
+    for clause in specifier.split(","):
+        match = re.match(r"(~=|==|!=|>=|<=|>|<)(.+)", clause)
+        if match and not _compare(version, match.group(1), match.group(2)):
+            return False
+    return True
+
+def probe_package(requirement, deep=False):
+    """Check one requirement
+
+    Returns:
+        dict: requirement, distribution, import_name, version, specifier,
+              status ("ok", "missing", "version_mismatch", "not_importable",
+              "import_error"), detail, import_time
+    """
+    distribution, specifier = parse_requirement(requirement)
+    import_name = import_name_for(distribution)
+    result = {
+        'requirement': requirement,
+        'distribution': distribution,
+        'import_name': import_name,
+        'version': None,
+        'specifier': specifier,
+        'status': "ok",
+        'detail': None,
+        'import_time': None
+    }
+
+    if importlib_metadata is not None:
+        try:
+            result['version'] = importlib_metadata.version(distribution)
+        except importlib_metadata.PackageNotFoundError:
+            pass
+
+    try:
+        spec = importlib.util.find_spec(import_name)
+    except (ImportError, ValueError) as e:
+        spec = None
+        result['detail'] = str(e)
+
+    if spec is None:
+        result['status'] = "missing" if result['version'] is None else "not_importable"
+        return result
+
+    if result['version'] and not satisfies(result['version'], specifier):
+        result['status'] = "version_mismatch"
+        result['detail'] = f"{result['version']} does not satisfy {specifier}"
+        return result
+
+    if deep:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(import_name)
+        except Exception as e:
+            result['status'] = "import_error"
+            result['detail'] = f"{type(e).__name__}: {e}"
+        result['import_time'] = round(time.perf_counter() - start, 4)
+
+    return result
+
+def probe_packages(requirements, deep=False):
+    """Check many requirements in this interpreter
+
+    Returns:
+        dict: python, python_version, deep, elapsed and results (one per requirement)
+    """
+    start = time.perf_counter()
+    results = [probe_package(requirement, deep) for requirement in requirements]
+    return {
+        'python': sys.executable,
+        'python_version': sys.version.split()[0],
+        'deep': deep,
+        'elapsed': round(time.perf_counter() - start, 4),
+        'results': results
+    }
+
+def run_probe(requirements, python=None, deep=False, timeout=None):
+    """Run the probe in one child process of the given interpreter
+
+    Args:
+        requirements (list): Requirement strings from install_config.json
+        python (str, optional): Interpreter to probe (default: this one)
+        deep (bool): Also import every package (slow; executes package code)
+        timeout (float, optional): Timeout for the child (default 60s, 600s deep)
+
+    Returns:
+        dict: Report from probe_packages
+    """
+    import subprocess
+
+    command = [python or sys.executable, __file__, "--stdin"]
+    if deep:
+        command.append("--deep")
+    completed = subprocess.run(
+        command,
+        input=json.dumps(list(requirements)),
+        capture_output=True,
+        text=True,
+        timeout=timeout or (600 if deep else 60)
+    )
+    # The report is the last line; deep imports may print to stdout first
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        raise RuntimeError(completed.stderr.strip() or f"probe exited with code {completed.returncode}")
+    return json.loads(lines[-1])
+
+def main():
+    """Command line entry point; prints the JSON report"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Probe installed Python packages')
+    parser.add_argument('requirements', nargs='*', help='Requirements, e.g. "langchain>=0.1.0"')
+    parser.add_argument('--stdin', action='store_true', help='Read a JSON list of requirements from stdin')
+    parser.add_argument('--deep', action='store_true', help='Also import every package')
+    args = parser.parse_args()
+
+    requirements = list(args.requirements)
+    if args.stdin:
+        requirements.extend(json.loads(sys.stdin.read() or "[]"))
+
+    report = probe_packages(requirements, args.deep)
+    sys.stdout.write("\n" + json.dumps(report) + "\n")
+
+if __name__ == "__main__":
+    main()
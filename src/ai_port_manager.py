@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+AI Port Manager
+Allocates ports for local services and stops the processes listening on them
+
+Version: 3.0.23
+Author: AI Environment Team
+Date: 2026-10-18
+
+Usage:
+    python ai_port_manager.py --ai-env-path D:/AI_Environment
+    python ai_port_manager.py --port 8888
+    python ai_port_manager.py --port 8501 --stop
+"""
+
+import atexit
+import json
+import os
+import socket
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlparse
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+try:
+    from colorama import Fore, Style
+except ImportError:
+    class Fore:
+        GREEN = RED = YELLOW = CYAN = ""
+    class Style:
+        RESET_ALL = ""
+
+from ai_process_store import FileLock, is_same_process, read_create_time
+from ai_readiness import wait_until
+
+REGISTRY_FILE_NAME = "port_registry.json"
+
+# service -> [first, last] port, overridable in install_config.json
+DEFAULT_PORT_RANGES = {
+    'jupyter': [8888, 8899],
+    'streamlit': [8501, 8510],
+    'tensorboard': [6006, 6015]
+}
+
+def port_from_url(url):
+    """Port of a URL such as http://localhost:8501 (None if it has none)"""
+    try:
+        return urlparse(url).port if url else None
+    except ValueError:
+        return None
+
+def _process_connections(proc):
+    """inet connections of one process (psutil renamed connections() in 6.0)"""
+    method = getattr(proc, 'net_connections', None) or proc.connections
+    return method(kind='inet')
+
+def find_listening_pids(port):
+    """PIDs of processes with a socket in LISTEN state on exactly this port
+
+    Uses the system-wide connection table; where that needs privileges
+    (macOS), falls back to asking each process for its own sockets.
+
+    Returns:
+        list: Sorted PIDs (empty if nothing listens or psutil is missing)
+    """
+    if not PSUTIL_AVAILABLE:
+        return []
+    pids = set()
+    try:
+        for connection in psutil.net_connections(kind='inet'):
+            if (connection.status == psutil.CONN_LISTEN and connection.laddr
+                    and connection.laddr.port == port and connection.pid):
+                pids.add(connection.pid)
+    except psutil.AccessDenied:
+        for proc in psutil.process_iter():
+            try:
+                if any(connection.status == psutil.CONN_LISTEN and connection.laddr
+                       and connection.laddr.port == port for connection in _process_connections(proc)):
+                    pids.add(proc.pid)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+    return sorted(pids)
+
+def _has_exited(proc):
+    """True once a process is gone or only a zombie waiting to be reaped"""
+    try:
+        return proc.status() == psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return True
+    except psutil.AccessDenied:
+        return not proc.is_running()
+
+def _wait_exited(processes, timeout):
+    """Wait for processes to exit; returns the ones still running"""
+    wait_until(lambda: all(_has_exited(proc) for proc in processes), timeout=timeout, max_delay=0.1)
+    return [proc for proc in processes if not _has_exited(proc)]
+
+def terminate_process_trees(pids, timeout=5.0):
+    """Terminate processes and all their children, killing whatever outlives the timeout
+
+    Args:
+        pids (iterable): Root PIDs
+        timeout (float): Seconds to wait for a graceful exit before killing
+
+    Returns:
+        dict: pids (every process signalled), remaining (PIDs still alive
+              afterwards), elapsed (seconds)
+    """
+    start = time.perf_counter()
+    if not PSUTIL_AVAILABLE:
+        return {'pids': [], 'remaining': list(pids), 'elapsed': 0.0}
+
+    processes = {}
+    for pid in pids:
+        try:
+            parent = psutil.Process(pid)
+            for proc in parent.children(recursive=True) + [parent]:
+                processes[proc.pid] = proc
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+
+    for proc in processes.values():
+        try:
+            proc.terminate()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    # Orphaned children stay zombies until init reaps them; they count as stopped
+    alive = _wait_exited(list(processes.values()), timeout)
+    for proc in alive:
+        try:
+            proc.kill()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    alive = _wait_exited(alive, 2)
+
+    return {
+        'pids': sorted(processes),
+        'remaining': sorted(proc.pid for proc in alive),
+        'elapsed': time.perf_counter() - start
+    }
+
+def stop_port(port, extra_pids=(), timeout=5.0):
+    """Stop everything listening on a port, plus any known root processes
+
+    Args:
+        port (int): Port whose listeners are stopped
+        extra_pids (iterable): Further root PIDs, e.g. a tracked launcher
+            whose child holds the port
+        timeout (float): Seconds to wait for a graceful exit before killing
+
+    Returns:
+        dict: As terminate_process_trees, plus port and listeners (the PIDs found on the port)
+    """
+    start = time.perf_counter()
+    listeners = find_listening_pids(port)
+    result = terminate_process_trees(sorted(set(listeners) | set(extra_pids)), timeout)
+    result.update(port=port, listeners=listeners, elapsed=time.perf_counter() - start)
+    return result
+
+def load_port_ranges(ai_env_path):
+    """Port ranges from config/install_config.json merged over the defaults"""
+    ranges = {service: list(bounds) for service, bounds in DEFAULT_PORT_RANGES.items()}
+    try:
+        with open(Path(ai_env_path) / "config" / "install_config.json", 'r', encoding='utf-8') as f:
+            ranges.update(json.load(f).get('port_allocation', {}))
+    except (OSError, ValueError, AttributeError):
+        pass
+    return ranges
+
+def find_free_ports(ports):
+    """Bind-test a batch of ports in one pass
+
+    Every candidate is bound on all interfaces at the same time and the
+    sockets are closed together afterwards, so the result is one
+    consistent snapshot. Elsewhere SO_REUSEADDR is set like the servers
+    themselves do, so a port with only TIME_WAIT connections left counts
+    as free while one that a process listens on does not; on Windows,
+    where that option would let the bind succeed anyway, exclusive use
+    is requested instead.
+
+    Returns:
+        list: The ports that could be bound, in the given order
+    """
+    sockets = []
+    free = []
+    try:
+        for port in ports:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sockets.append(sock)
+            try:
+                if hasattr(socket, 'SO_EXCLUSIVEADDRUSE'):
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+                else:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                sock.bind(("", port))
+                free.append(port)
+            except OSError:
+                continue
+    finally:
+        for sock in sockets:
+            sock.close()
+    return free
+
+def _is_live(entry):
+    """True while the process owning a reservation runs (zombies count as gone)"""
+    if not is_same_process(entry):
+        return False
+    if not PSUTIL_AVAILABLE:
+        return True
+    try:
+        return psutil.Process(entry['pid']).status() != psutil.STATUS_ZOMBIE
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return True
+
+class PortAllocator:
+    """Hands out ports from per-service ranges through a shared registry
+
+    The registry (port_registry.json) maps each reserved port to its
+    service and owning process. It is only read and written while holding
+    a file lock, so launchers in different processes never get the same
+    port. A reservation first belongs to the launching process; assign()
+    hands it to the started service, or for a supervised service to the
+    supervisor together with the service id. Reservations whose owner has
+    exited, or whose supervised service is no longer running or waiting
+    to restart, are dropped at the next allocation, and ports this process
+    reserved but never assigned are released when it exits.
+    """
+
+    def __init__(self, ai_env_path, ranges=None):
+        """Initialize Port Allocator
+
+        Args:
+            ai_env_path (Path): AI Environment root (holds the registry)
+            ranges (dict, optional): service -> [first, last] port (default: from install_config.json)
+        """
+        self.ai_env_path = Path(ai_env_path)
+        self.registry_path = self.ai_env_path / REGISTRY_FILE_NAME
+        self.lock = FileLock(self.registry_path.with_suffix(".lock"))
+        self.ranges = ranges if ranges is not None else load_port_ranges(self.ai_env_path)
+        # Ports reserved by this process and not yet assigned to a service
+        self._unassigned = set()
+        self._exit_hook = False
+
+    def port_range(self, service):
+        """Candidate ports of a service (empty if it has no range)"""
+        bounds = self.ranges.get(service)
+        if not bounds:
+            return []
+        return list(range(int(bounds[0]), int(bounds[1]) + 1))
+
+    def _read(self):
+        try:
+            with open(self.registry_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, registry):
+        temp_path = self.registry_path.with_suffix(".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(registry, f, indent=2)
+        os.replace(temp_path, self.registry_path)
+
+    def _supervised_running(self):
+        """Ids of supervised services running or waiting to restart
+
+        Asks the supervisor over TCP, so it is called before taking the
+        registry lock; the registry is replaced atomically, so peeking at it
+        unlocked is safe.
+
+        Returns:
+            set or None: Service ids, or None if no entry is supervised or the
+                         supervisor does not answer
+        """
+        if not any(entry.get('process_id') for entry in self._read().values()):
+            return None
+        from ai_supervisor import SupervisorClient, SupervisorError
+        try:
+            return {service['id'] for service in SupervisorClient(self.ai_env_path).list()
+                    if service['status'] in ("running", "backoff")}
+        except (SupervisorError, ValueError):
+            return None
+
+    def _load_live(self, running=None):
+        """Registry without the reservations of exited processes (lock must be held)
+
+        Args:
+            running (set, optional): Live supervised service ids from
+                _supervised_running(); without them supervised entries are kept
+        """
+        registry = {port: entry for port, entry in self._read().items() if _is_live(entry)}
+        if running is not None:
+            registry = {port: entry for port, entry in registry.items()
+                        if not entry.get('process_id') or entry['process_id'] in running}
+        return registry
+
+    def _reserve(self, service, candidates):
+        """Reserve the first free candidate; None if all are reserved or bound"""
+        running = self._supervised_running()
+        with self.lock:
+            registry = self._load_live(running)
+            free = find_free_ports([port for port in candidates if str(port) not in registry])
+            port = free[0] if free else None
+            if port is not None:
+                registry[str(port)] = {
+                    'service': service,
+                    'pid': os.getpid(),
+                    'create_time': read_create_time(os.getpid()),
+                    'reserved_at': datetime.now().isoformat()
+                }
+                self._unassigned.add(port)
+            self._write(registry)
+        if port is not None and not self._exit_hook:
+            atexit.register(self._release_unassigned)
+            self._exit_hook = True
+        return port
+
+    def allocate(self, service):
+        """Reserve a free port from the service's range
+
+        Returns:
+            int or None: The port, or None if the whole range is taken
+        """
+        return self._reserve(service, self.port_range(service))
+
+    def reserve(self, port, service):
+        """Reserve one specific port
+
+        Returns:
+            bool: False if it is reserved by another live process or already bound
+        """
+        return self._reserve(service, [port]) is not None
+
+    def assign(self, port, pid, process_id=None):
+        """Hand a reservation to the process that now serves the port
+
+        Args:
+            port (int): Reserved port
+            pid (int): Owning process; the supervisor for supervised services
+            process_id (str, optional): Supervised service id; the reservation
+                then also ends once the supervisor stops running that service
+        """
+        with self.lock:
+            registry = self._read()
+            entry = registry.get(str(port))
+            if entry is None:
+                return
+            entry.update(pid=pid, create_time=read_create_time(pid))
+            if process_id:
+                entry['process_id'] = process_id
+            self._write(registry)
+        self._unassigned.discard(port)
+
+    def release(self, port):
+        """Drop a reservation"""
+        if port is None:
+            return
+        with self.lock:
+            registry = self._read()
+            if registry.pop(str(port), None) is not None:
+                self._write(registry)
+        self._unassigned.discard(port)
+
+    def _release_unassigned(self):
+        """Drop reservations this process made and never handed on
+
+        Another allocator instance may have assigned the port meanwhile, so
+        only entries still owned by this process are dropped.
+        """
+        if not self._unassigned:
+            return
+        try:
+            with self.lock:
+                registry = self._read()
+                mine = [str(port) for port in self._unassigned
+                        if registry.get(str(port), {}).get('pid') == os.getpid()]
+                for port in mine:
+                    del registry[port]
+                if mine:
+                    self._write(registry)
+        except (OSError, TimeoutError):
+            pass
+        self._unassigned.clear()
+
+    def reservations(self):
+        """Live reservations: port (str) -> service, pid, create_time, reserved_at"""
+        running = self._supervised_running()
+        with self.lock:
+            return self._load_live(running)
+
+def print_stop_result(result, name=None):
+    """Print what stop_port or terminate_process_trees did and how long it took"""
+    label = name or (f"port {result['port']}" if result.get('port') else "process")
+    if not result['pids']:
+        print(f"{Fore.YELLOW}[INFO] Nothing to stop for {label}{Style.RESET_ALL}")
+    elif result['remaining']:
+        print(f"{Fore.RED}[ERROR] {label}: {len(result['remaining'])} process(es) still running "
+              f"(PIDs {', '.join(map(str, result['remaining']))}){Style.RESET_ALL}")
+    else:
+        print(f"{Fore.GREEN}[OK] Stopped {label}: {len(result['pids'])} process(es) "
+              f"in {result['elapsed']:.2f}s{Style.RESET_ALL}")
+
+def main():
+    """Command line entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Show port reservations, or show or stop the processes on a port')
+    parser.add_argument('--ai-env-path', default='D:/AI_Environment', help='AI Environment root')
+    parser.add_argument('--port', type=int, help='Port number (omit to show reservations)')
+    parser.add_argument('--stop', action='store_true', help='Stop the listeners and their children')
+    parser.add_argument('--timeout', type=float, default=5.0, help='Seconds before force killing')
+    args = parser.parse_args()
+
+    if args.port is None:
+        allocator = PortAllocator(args.ai_env_path)
+        reservations = allocator.reservations()
+        start = time.perf_counter()
+        for service in allocator.ranges:
+            ports = allocator.port_range(service)
+            if not ports:
+                continue
+            free = find_free_ports([port for port in ports if str(port) not in reservations])
+            print(f"{Fore.CYAN}{service:<12}{Style.RESET_ALL} {ports[0]}-{ports[-1]}: {len(free)} free")
+        print(f"  Scanned in {(time.perf_counter() - start) * 1000:.1f} ms")
+        if not reservations:
+            print(f"{Fore.YELLOW}[INFO] No ports reserved{Style.RESET_ALL}")
+        for port, entry in sorted(reservations.items(), key=lambda item: int(item[0])):
+            print(f"  {port:<6} {entry.get('service', ''):<12} PID {entry.get('pid')}  since {entry.get('reserved_at', '')}")
+        return
+
+    if not PSUTIL_AVAILABLE:
+        print(f"{Fore.RED}[ERROR] psutil is required{Style.RESET_ALL}")
+        sys.exit(1)
+
+    if args.stop:
+        result = stop_port(args.port, timeout=args.timeout)
+        print_stop_result(result)
+        sys.exit(1 if result['remaining'] else 0)
+
+    pids = find_listening_pids(args.port)
+    if not pids:
+        print(f"{Fore.YELLOW}[INFO] Nothing is listening on port {args.port}{Style.RESET_ALL}")
+    for pid in pids:
+        try:
+            proc = psutil.Process(pid)
+            print(f"  PID {pid:<8} {proc.name():<20} {' '.join(proc.cmdline())[:80]}")
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            print(f"  PID {pid}")
+
+if __name__ == "__main__":
+    main()
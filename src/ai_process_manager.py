@@ -11,6 +11,7 @@ AI Environment - Background Process Manager
 Tracks and controls all background processes launched from the menu with enhanced VS Code integration
 """
 
+import os
 import subprocess
 import time
 import json
@@ -32,13 +33,25 @@ except ImportError:
     class Style:
         RESET_ALL = ""
 
+from ai_port_manager import PortAllocator, find_listening_pids, terminate_process_trees, port_from_url
+from ai_process_store import ProcessStore, TrackedProcessView, is_same_process
+from ai_readiness import wait_until
+from ai_supervisor import get_supervisor_client, SupervisorError
+
 class BackgroundProcessManager:
     """Manages all background processes launched from the AI Environment menu"""
     
     def __init__(self, ai_env_path):
         self.ai_env_path = Path(ai_env_path)
         self.processes_file = self.ai_env_path / "background_processes.json"
+        # Several managers write concurrently; only their own edits are committed
+        self.store = ProcessStore(self.processes_file)
+        self._view = TrackedProcessView(self.store)
         self.tracked_processes = {}
+        # Long-running services go through the supervisor when it is enabled
+        self.supervisor = get_supervisor_client(self.ai_env_path)
+        # Ports of web services come from the shared port registry
+        self.ports = PortAllocator(self.ai_env_path)
         self.load_tracked_processes()
         
     def print_info(self, message):
@@ -60,31 +73,32 @@ class BackgroundProcessManager:
     def load_tracked_processes(self):
         """Load tracked processes from file"""
         try:
-            if self.processes_file.exists():
-                with open(self.processes_file, 'r') as f:
-                    data = json.load(f)
-                    self.tracked_processes = data
-                    # Clean up dead processes
-                    self.cleanup_dead_processes()
+            self.tracked_processes = self._view.load()
+            # Clean up dead processes
+            self.cleanup_dead_processes()
         except Exception as e:
             self.print_warning(f"Could not load process tracking file: {e}")
             self.tracked_processes = {}
+        return self.tracked_processes
             
     def save_tracked_processes(self):
         """Save tracked processes to file"""
         try:
-            with open(self.processes_file, 'w') as f:
-                json.dump(self.tracked_processes, f, indent=2)
+            self._view.commit(self.tracked_processes)
         except Exception as e:
             self.print_warning(f"Could not save process tracking file: {e}")
             
     def cleanup_dead_processes(self):
         """Remove dead processes from tracking"""
+        supervised = self.sync_supervised() is not None
         dead_processes = []
         for process_id, process_info in self.tracked_processes.items():
+            # The supervisor knows best whether its services are alive
+            if supervised and process_info.get('supervised'):
+                continue
             try:
-                pid = process_info['pid']
-                if not psutil.pid_exists(pid):
+                # (pid, create_time) identity: a reused PID counts as dead
+                if not is_same_process(process_info):
                     dead_processes.append(process_id)
             except:
                 dead_processes.append(process_id)
@@ -111,6 +125,13 @@ class BackgroundProcessManager:
             if url:
                 process_info['url'] = url
                 
+            # Record create_time so a reused PID is not mistaken for this process
+            if PSUTIL_AVAILABLE:
+                try:
+                    process_info['create_time'] = psutil.Process(pid).create_time()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+                
             self.tracked_processes[process_id] = process_info
             self.save_tracked_processes()
             self.print_success(f"Tracking process: {name} (PID: {pid})")
@@ -134,6 +155,143 @@ class BackgroundProcessManager:
             self.print_warning(f"Could not untrack process {process_id}: {e}")
             return False
             
+    def sync_supervised(self):
+        """Refresh supervised entries from the supervisor's live state
+
+        Entries whose service is gone or finished are dropped; entries of
+        restarted services get the new PID.
+
+        Returns:
+            dict or None: service id -> live state, or None if no supervisor answered
+        """
+        if self.supervisor is None or not self.supervisor.state_path.exists():
+            return None
+        try:
+            services = {service['id']: service for service in self.supervisor.list()}
+        except SupervisorError:
+            return None
+
+        changed = False
+        for process_id, process_info in list(self.tracked_processes.items()):
+            if not process_info.get('supervised'):
+                continue
+            service = services.get(process_id)
+            if service is None or service['status'] in ("stopped", "exited", "failed"):
+                del self.tracked_processes[process_id]
+                changed = True
+            elif (service['pid'], service['status']) != (process_info.get('pid'), process_info.get('status')):
+                process_info.update(pid=service['pid'], create_time=service['create_time'],
+                                    status=service['status'], restarts=service['restarts'])
+                changed = True
+        if changed:
+            self.save_tracked_processes()
+        return services
+
+    def launch_supervised(self, process_id, name, command, cwd=None, shell=False, url=None,
+                          process_type='service', restart=None, env=None):
+        """Start a process under the supervisor and track it
+
+        The process gets the caller's current environment (or env), not the
+        one the supervisor daemon started with, so PATH and conda changes
+        made by the menu since then apply to it.
+
+        Returns:
+            int or None: PID, or None if the supervisor is disabled or could not
+                         start it (the caller then starts the process itself)
+        """
+        if self.supervisor is None or not self.supervisor.ensure_running():
+            return None
+        try:
+            service = self.supervisor.start(process_id, command, name=name, cwd=str(cwd) if cwd else None,
+                                            shell=shell, url=url, type=process_type, restart=restart,
+                                            env=dict(os.environ) if env is None else env)
+        except SupervisorError as e:
+            self.print_warning(f"Supervisor could not start {name}: {e}")
+            return None
+        if service['pid'] is None:
+            self.print_warning(f"Supervisor could not start {name}: {service['error']}")
+            return None
+
+        process_info = {
+            'pid': service['pid'],
+            'name': name,
+            'command': command if isinstance(command, str) else ' '.join(command),
+            'started_at': datetime.now().isoformat(),
+            'type': process_type,
+            'status': service['status'],
+            'create_time': service['create_time'],
+            'supervised': True,
+            'log_path': service['log_path']
+        }
+        if url:
+            process_info['url'] = url
+        self.tracked_processes[process_id] = process_info
+        self.save_tracked_processes()
+        return service['pid']
+
+    def assign_port(self, process_id, port):
+        """Hand a port reservation to a launched process and record the port
+
+        A supervised process may be restarted with a new PID, so its
+        reservation belongs to the supervisor and lasts while the supervisor
+        keeps the service running or restarting.
+        """
+        process_info = self.tracked_processes.get(process_id)
+        if process_info is None:
+            return
+        owner, service_id = process_info['pid'], None
+        if process_info.get('supervised'):
+            try:
+                owner, service_id = self.supervisor.request("ping")['pid'], process_id
+            except (SupervisorError, KeyError):
+                pass
+        self.ports.assign(port, owner, process_id=service_id)
+        process_info['port'] = port
+        self.save_tracked_processes()
+
+    def get_supervised_status(self, process_id):
+        """Live status of a supervised process (None if the supervisor does not know it)"""
+        if self.supervisor is None:
+            return None
+        try:
+            return self.supervisor.status(process_id)['status']
+        except SupervisorError:
+            return None
+
+    def stop_supervised(self, process_id):
+        """Stop a supervised process so it is not restarted, untrack it and free its port
+
+        Returns:
+            bool: True if the supervisor stopped it
+        """
+        if self.supervisor is None:
+            return False
+        try:
+            self.supervisor.stop(process_id, remove=True)
+        except SupervisorError:
+            return False
+        process_info = self.tracked_processes.pop(process_id, None)
+        if process_info is not None:
+            self.ports.release(process_info.get('port'))
+            self.save_tracked_processes()
+        return True
+
+    def shutdown_supervisor(self):
+        """Stop all supervised processes and the supervisor itself"""
+        if self.supervisor is None or not self.supervisor.is_running():
+            return False
+        try:
+            self.supervisor.shutdown()
+        except SupervisorError:
+            return False
+        wait_until(lambda: not self.supervisor.is_running(), timeout=15)
+        supervised = [pid for pid, info in self.tracked_processes.items() if info.get('supervised')]
+        for process_id in supervised:
+            self.ports.release(self.tracked_processes.pop(process_id).get('port'))
+        if supervised:
+            self.save_tracked_processes()
+        return True
+
     def generate_process_id(self, app_name):
         """Generate unique process ID"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -203,30 +361,28 @@ class BackgroundProcessManager:
         content = '''"""
 Basic LLM Example - Test Ollama Connection
 Make sure Ollama is running: ollama serve
+Batch mode: python main.py --batch
 """
 
-import requests
-import json
+import sys
 
-def query_ollama(prompt, model="phi:2.7b", host="127.0.0.1", port=11434):
-    """Query Ollama API"""
-    url = f"http://{host}:{port}/api/generate"
-    
-    data = {
-        "model": model,
-        "prompt": prompt,
-        "stream": False
-    }
-    
-    try:
-        response = requests.post(url, json=data, timeout=60)
-        response.raise_for_status()
-        
-        result = response.json()
-        return result.get("response", "No response received")
-        
-    except requests.exceptions.RequestException as e:
-        return f"Error: {e}"
+# Use the AI Environment's pooled, streaming Ollama client
+sys.path.insert(0, r"__AI_ENV_SRC__")
+from ai_ollama_client import OllamaClient
+from ai_ollama_batch import generate_batch
+
+def batch_example(model="phi:2.7b"):
+    """Send several prompts at once with 4 requests in flight"""
+    prompts = [
+        "What is machine learning?",
+        "What is a neural network?",
+        "What is a large language model?",
+        "What is prompt engineering?"
+    ]
+    results = generate_batch(prompts, model=model, concurrency=4)
+    for result in results:  # Results keep the input order
+        print(f"\\n[{result['latency']:.1f}s] {result['prompt']}")
+        print(result['response'] if result['error'] is None else f"Error: {result['error']}")
 
 def main():
     print("Basic LLM Example")
@@ -238,13 +394,22 @@ def main():
     print(f"Question: {prompt}")
     print("Thinking...")
     
-    # Query Ollama
-    response = query_ollama(prompt)
-    print(f"AI Response: {response}")
+    # Stream tokens as soon as the server produces them
+    client = OllamaClient(timeout=60)
+    print("AI Response: ", end="", flush=True)
+    try:
+        for token in client.generate_stream(prompt, model="phi:2.7b"):
+            print(token, end="", flush=True)
+        print()
+    except Exception as e:
+        print(f"Error: {e}")
 
 if __name__ == "__main__":
-    main()
-'''
+    if "--batch" in sys.argv:
+        batch_example()
+    else:
+        main()
+'''.replace("__AI_ENV_SRC__", str(self.ai_env_path / "src"))
         
         try:
             with open(main_py_path, 'w', encoding='utf-8') as f:
@@ -330,27 +495,32 @@ if __name__ == "__main__":
             work_dir = self.ai_env_path / "Projects"
             work_dir.mkdir(exist_ok=True)
             
-            process = subprocess.Popen(
-                ['jupyter', 'lab', '--no-browser', '--port=8888'],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                cwd=str(work_dir),
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
-            
-            # Track the process
+            command = ['jupyter', 'lab', '--no-browser', '--port=8888']
             process_id = self.generate_process_id("jupyter")
-            self.tracked_processes[process_id] = {
-                'pid': process.pid,
-                'name': 'Jupyter Lab',
-                'command': 'jupyter lab --no-browser --port=8888',
-                'started_at': datetime.now().isoformat(),
-                'type': 'web_service',
-                'url': 'http://localhost:8888'
-            }
-            
-            self.save_tracked_processes()
-            self.print_success(f"Jupyter Lab launched successfully (PID: {process.pid})")
+            pid = self.launch_supervised(process_id, 'Jupyter Lab', command, cwd=work_dir,
+                                         url='http://localhost:8888', process_type='web_service')
+            if pid is None:
+                process = subprocess.Popen(
+                    command,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    cwd=str(work_dir),
+                    creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+                )
+                pid = process.pid
+                
+                # Track the process
+                self.tracked_processes[process_id] = {
+                    'pid': pid,
+                    'name': 'Jupyter Lab',
+                    'command': ' '.join(command),
+                    'started_at': datetime.now().isoformat(),
+                    'type': 'web_service',
+                    'url': 'http://localhost:8888'
+                }
+                self.save_tracked_processes()
+                
+            self.print_success(f"Jupyter Lab launched successfully (PID: {pid})")
             self.print_info("Access Jupyter Lab at: http://localhost:8888")
             return True
             
@@ -359,7 +529,12 @@ if __name__ == "__main__":
             return False
             
     def launch_streamlit_demo(self):
-        """Launch Streamlit demo app in background"""
+        """Launch Streamlit demo app in background on the next free Streamlit port
+
+        Returns:
+            int or bool: Port of the demo on success, False otherwise
+        """
+        port = None
         try:
             # Create a simple demo app if it doesn't exist
             demo_file = self.ai_env_path / "Projects" / "streamlit_demo.py"
@@ -387,73 +562,101 @@ st.dataframe(data.head())
                 with open(demo_file, 'w') as f:
                     f.write(demo_content)
                     
-            self.print_info("Launching Streamlit demo in background...")
+            port = self.ports.allocate("streamlit")
+            if port is None:
+                self.print_error("No free port left in the Streamlit range")
+                return False
+            url = f"http://localhost:{port}"
             
-            process = subprocess.Popen(
-                ['streamlit', 'run', str(demo_file), '--server.port=8501'],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
+            self.print_info(f"Launching Streamlit demo in background on port {port}...")
             
-            # Track the process
+            command = ['streamlit', 'run', str(demo_file), f'--server.port={port}']
             process_id = self.generate_process_id("streamlit")
-            self.tracked_processes[process_id] = {
-                'pid': process.pid,
-                'name': 'Streamlit Demo',
-                'command': f'streamlit run {demo_file} --server.port=8501',
-                'started_at': datetime.now().isoformat(),
-                'type': 'web_service',
-                'url': 'http://localhost:8501'
-            }
-            
-            self.save_tracked_processes()
-            self.print_success(f"Streamlit demo launched successfully (PID: {process.pid})")
-            self.print_info("Access Streamlit demo at: http://localhost:8501")
-            return True
+            pid = self.launch_supervised(process_id, 'Streamlit Demo', command,
+                                         url=url, process_type='web_service')
+            if pid is None:
+                process = subprocess.Popen(
+                    command,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+                )
+                pid = process.pid
+                
+                # Track the process
+                self.tracked_processes[process_id] = {
+                    'pid': pid,
+                    'name': 'Streamlit Demo',
+                    'command': ' '.join(command),
+                    'started_at': datetime.now().isoformat(),
+                    'type': 'web_service',
+                    'url': url
+                }
+                self.save_tracked_processes()
+            self.assign_port(process_id, port)
+                
+            self.print_success(f"Streamlit demo launched successfully (PID: {pid})")
+            self.print_info(f"Access Streamlit demo at: {url}")
+            return port
             
         except Exception as e:
             self.print_error(f"Failed to launch Streamlit demo: {e}")
+            self.ports.release(port)
             return False
             
-    def launch_custom_command(self, command, name, work_dir=None):
-        """Launch custom command in background"""
+    def launch_custom_command(self, command, name, work_dir=None, url=None, port=None):
+        """Launch custom command in background
+
+        Args:
+            port (int, optional): Port reserved for the command; the reservation
+                is handed to the launched process, or released if the launch fails
+        """
         try:
             self.print_info(f"Launching {name} in background...")
             
             if work_dir is None:
                 work_dir = self.ai_env_path
                 
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                cwd=str(work_dir),
-                shell=True,
-                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-            )
-            
-            # Track the process
             process_id = self.generate_process_id(name.lower().replace(' ', '_'))
-            self.tracked_processes[process_id] = {
-                'pid': process.pid,
-                'name': name,
-                'command': command,
-                'started_at': datetime.now().isoformat(),
-                'type': 'custom'
-            }
-            
-            self.save_tracked_processes()
-            self.print_success(f"{name} launched successfully (PID: {process.pid})")
+            pid = self.launch_supervised(process_id, name, command, cwd=work_dir, shell=True,
+                                         url=url, process_type='custom')
+            if pid is None:
+                process = subprocess.Popen(
+                    command,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    cwd=str(work_dir),
+                    shell=True,
+                    creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+                )
+                pid = process.pid
+                
+                # Track the process
+                self.tracked_processes[process_id] = {
+                    'pid': pid,
+                    'name': name,
+                    'command': command,
+                    'started_at': datetime.now().isoformat(),
+                    'type': 'custom'
+                }
+                if url:
+                    self.tracked_processes[process_id]['url'] = url
+                self.save_tracked_processes()
+            if port is not None:
+                self.assign_port(process_id, port)
+                
+            self.print_success(f"{name} launched successfully (PID: {pid})")
             return True
             
         except Exception as e:
             self.print_error(f"Failed to launch {name}: {e}")
+            self.ports.release(port)
             return False
             
     def list_background_processes(self):
         """List all tracked background processes"""
         self.cleanup_dead_processes()
+        services = self.sync_supervised() or {}
         
         if not self.tracked_processes:
             self.print_info("No background processes currently running")
@@ -463,6 +666,16 @@ st.dataframe(data.head())
         print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
         
         for process_id, process_info in self.tracked_processes.items():
+            service = services.get(process_id)
+            if service is not None and service['pid'] is None:
+                # Supervised process waiting for its next restart
+                print(f"\n{Fore.YELLOW}ID: {process_id}{Style.RESET_ALL}")
+                print(f"  Name: {process_info['name']}")
+                print(f"  Status: {service['status']} (exit code {service['last_exit_code']}, "
+                      f"restart {service['restarts'] + 1}/{service['max_restarts']} pending)")
+                print(f"  Log: {service['log_path']}")
+                continue
+                
             try:
                 pid = process_info['pid']
                 proc = psutil.Process(pid)
@@ -482,6 +695,10 @@ st.dataframe(data.head())
                 
                 if 'url' in process_info:
                     print(f"  URL: {process_info['url']}")
+                if service is not None:
+                    print(f"  Supervised: restart {service['restart']}, "
+                          f"{service['restarts']}/{service['max_restarts']} restarts")
+                    print(f"  Log: {service['log_path']}")
                     
             except psutil.NoSuchProcess:
                 print(f"\n{Fore.RED}ID: {process_id} (DEAD){Style.RESET_ALL}")
@@ -496,36 +713,45 @@ st.dataframe(data.head())
             
         process_info = self.tracked_processes[process_id]
         
+        # Stopping through the supervisor keeps it from restarting the process
+        if process_info.get('supervised'):
+            self.print_info(f"Stopping {process_info['name']} (PID: {process_info['pid']})...")
+            if self.stop_supervised(process_id):
+                self.print_success(f"{process_info['name']} stopped")
+                return True
+                
         try:
             pid = process_info['pid']
-            proc = psutil.Process(pid)
-            
+            if not is_same_process(process_info):
+                self.print_warning(f"Process {process_info['name']} was already dead")
+                self.ports.release(process_info.get('port'))
+                del self.tracked_processes[process_id]
+                self.save_tracked_processes()
+                return True
+                
             self.print_info(f"Stopping {process_info['name']} (PID: {pid})...")
             
-            # Try graceful termination first
-            proc.terminate()
-            
-            # Wait for graceful shutdown
-            try:
-                proc.wait(timeout=5)
-                self.print_success(f"{process_info['name']} stopped gracefully")
-            except psutil.TimeoutExpired:
-                # Force kill if graceful shutdown fails
-                self.print_warning("Graceful shutdown failed, force killing...")
-                proc.kill()
-                proc.wait(timeout=3)
-                self.print_success(f"{process_info['name']} force killed")
+            # Stop the whole tree (shell launches put the app below a shell);
+            # other processes on the service's port are not ours to stop
+            result = terminate_process_trees([pid])
+            if result['remaining']:
+                self.print_error(f"Failed to stop {process_info['name']}: PIDs "
+                                 f"{', '.join(map(str, result['remaining']))} still running")
+                return False
+            self.print_success(f"{process_info['name']} stopped in {result['elapsed']:.2f}s "
+                               f"({len(result['pids'])} process(es))")
+            port = process_info.get('port') or port_from_url(process_info.get('url'))
+            listeners = find_listening_pids(port) if port else []
+            if listeners:
+                self.print_warning(f"Port {port} is still used by PID {', '.join(map(str, listeners))}, "
+                                   f"which was not started as {process_info['name']}")
                 
-            # Remove from tracking
+            # Remove from tracking and free the port reservation
+            self.ports.release(process_info.get('port'))
             del self.tracked_processes[process_id]
             self.save_tracked_processes()
             return True
             
-        except psutil.NoSuchProcess:
-            self.print_warning(f"Process {process_info['name']} was already dead")
-            del self.tracked_processes[process_id]
-            self.save_tracked_processes()
-            return True
         except Exception as e:
             self.print_error(f"Failed to stop {process_info['name']}: {e}")
             return False
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+AI Process Store
+Lock-protected, append-only record of tracked background processes
+
+Version: 3.0.23
+Author: AI Environment Team
+Date: 2026-10-18
+
+Usage:
+    python ai_process_store.py --ai-env-path D:/AI_Environment
+    python ai_process_store.py --ai-env-path D:/AI_Environment --compact
+"""
+
+import copy
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+try:
+    from colorama import Fore, Style
+except ImportError:
+    class Fore:
+        GREEN = RED = YELLOW = CYAN = ""
+    class Style:
+        RESET_ALL = ""
+
+# Compact once the log grows past this many bytes
+DEFAULT_COMPACT_BYTES = 64 * 1024
+# create_time values of the same process may differ by float rounding
+CREATE_TIME_TOLERANCE = 0.01
+
+class FileLock:
+    """Exclusive lock on a lock file, shared by threads and processes
+
+    Threads of one process queue on a threading.Lock first; only its holder
+    opens the lock file and takes the OS lock (msvcrt on Windows, fcntl
+    elsewhere). Acquiring polls every 10 ms until the timeout, so a crashed
+    holder (whose lock the OS releases) never blocks for long.
+    """
+
+    def __init__(self, path, timeout=10.0):
+        """Initialize File Lock
+
+        Args:
+            path (Path): Lock file (created if missing)
+            timeout (float): Seconds to wait before raising TimeoutError
+        """
+        self.path = Path(path)
+        self.timeout = timeout
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    @staticmethod
+    def _try_lock(lock_file):
+        """Take the lock without waiting; False if someone else holds it"""
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self):
+        """Wait for the lock"""
+        deadline = time.perf_counter() + self.timeout
+        if not self._thread_lock.acquire(timeout=self.timeout):
+            raise TimeoutError(f"Could not lock {self.path} within {self.timeout}s")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            lock_file = open(self.path, 'a+')
+            while not self._try_lock(lock_file):
+                if time.perf_counter() >= deadline:
+                    lock_file.close()
+                    raise TimeoutError(f"Could not lock {self.path} within {self.timeout}s")
+                time.sleep(0.01)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        # Only the thread holding _thread_lock ever sees this handle
+        self._file = lock_file
+
+    def release(self):
+        """Give the lock back"""
+        lock_file, self._file = self._file, None
+        if lock_file is None:
+            return
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        finally:
+            lock_file.close()
+            self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+def read_create_time(pid):
+    """create_time of a running process (None if unknown)"""
+    if not PSUTIL_AVAILABLE or pid is None:
+        return None
+    try:
+        return psutil.Process(pid).create_time()
+    except (psutil.NoSuchProcess, psutil.AccessDenied, ValueError):
+        return None
+
+def is_same_process(process_info):
+    """True if the recorded (pid, create_time) still names a running process
+
+    Entries without a create_time (older files) only get a PID check.
+    """
+    pid = process_info.get('pid')
+    if pid is None:
+        return False
+    if not PSUTIL_AVAILABLE:
+        return True
+    try:
+        create_time = psutil.Process(pid).create_time()
+    except (psutil.NoSuchProcess, psutil.AccessDenied, ValueError):
+        return psutil.pid_exists(pid) if isinstance(pid, int) and pid > 0 else False
+    recorded = process_info.get('create_time')
+    return recorded is None or abs(create_time - recorded) <= CREATE_TIME_TOLERANCE
+
+class ProcessStore:
+    """Snapshot plus write-ahead log of tracked processes
+
+    The snapshot (background_processes.json) has the same layout the
+    tracker always used: process id -> process info. Every change is
+    appended as one JSON event ("put", "remove" or "clear") to the log
+    next to it while holding the lock, so concurrent writers never lose
+    each other's updates or leave a half-written file. Loading replays
+    the log over the snapshot; once the log grows past ``compact_bytes``,
+    the merged state is written as the new snapshot and the log is
+    emptied. Replaying is idempotent, so a crash between those two steps
+    loses nothing.
+    """
+
+    def __init__(self, snapshot_path, compact_bytes=DEFAULT_COMPACT_BYTES):
+        """Initialize Process Store
+
+        Args:
+            snapshot_path (Path): Snapshot file, e.g. background_processes.json
+            compact_bytes (int): Log size that triggers a compaction
+        """
+        self.snapshot_path = Path(snapshot_path)
+        self.log_path = self.snapshot_path.with_suffix(".wal.jsonl")
+        self.lock = FileLock(self.snapshot_path.with_suffix(".lock"))
+        self.compact_bytes = compact_bytes
+
+    def _read_snapshot(self):
+        """Snapshot contents (empty if missing or unreadable)"""
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _replay(self, processes):
+        """Apply the log to a state; a torn last line is ignored"""
+        try:
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    op = event.get('op')
+                    if op == "put":
+                        processes[event['id']] = event['info']
+                    elif op == "remove":
+                        processes.pop(event['id'], None)
+                    elif op == "clear":
+                        processes.clear()
+        except OSError:
+            pass
+        return processes
+
+    def _load_unlocked(self):
+        return self._replay(self._read_snapshot())
+
+    def load(self):
+        """Current state: process id -> process info"""
+        with self.lock:
+            return self._load_unlocked()
+
+    def commit(self, changes):
+        """Append a batch of changes in one locked write
+
+        Args:
+            changes (dict): process id -> new process info, or None to remove it.
+                            Infos without a create_time get one if the PID is alive.
+        """
+        if not changes:
+            return
+        lines = []
+        for process_id, info in changes.items():
+            if info is None:
+                lines.append({'op': "remove", 'id': process_id})
+                continue
+            if info.get('create_time') is None:
+                create_time = read_create_time(info.get('pid'))
+                if create_time is not None:
+                    info = dict(info, create_time=create_time)
+            lines.append({'op': "put", 'id': process_id, 'info': info})
+        self._append(lines)
+
+    def put(self, process_id, info):
+        """Add or replace one process"""
+        self.commit({process_id: info})
+
+    def remove(self, process_id):
+        """Forget one process"""
+        self.commit({process_id: None})
+
+    def clear(self):
+        """Forget every process"""
+        self._append([{'op': "clear"}])
+
+    def _append(self, events):
+        """Write events to the log under the lock, compacting if it got large"""
+        text = "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in events)
+        with self.lock:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(text)
+                f.flush()
+            try:
+                if self.log_path.stat().st_size >= self.compact_bytes:
+                    self._compact_unlocked()
+            except OSError:
+                pass
+
+    def _compact_unlocked(self):
+        processes = self._load_unlocked()
+        temp_path = self.snapshot_path.with_suffix(".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(processes, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        # Only now drop the log; replaying it over the new snapshot is harmless
+        open(self.log_path, 'w').close()
+        return processes
+
+    def compact(self):
+        """Fold the log into the snapshot
+
+        Returns:
+            dict: The compacted state
+        """
+        with self.lock:
+            return self._compact_unlocked()
+
+class TrackedProcessView:
+    """Remembers what a caller last saw, so only its own edits are committed
+
+    Callers edit a plain dict; diff() turns the edits since the last
+    load or commit into store changes, leaving entries other processes
+    added in the meantime alone.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._seen = {}
+
+    def load(self):
+        """Fresh copy of the stored state"""
+        processes = self.store.load()
+        self._seen = copy.deepcopy(processes)
+        return processes
+
+    def diff(self, processes):
+        """Changes from the last seen state to processes"""
+        changes = {process_id: info for process_id, info in processes.items()
+                   if self._seen.get(process_id) != info}
+        changes.update({process_id: None for process_id in self._seen if process_id not in processes})
+        return changes
+
+    def commit(self, processes):
+        """Write the caller's edits
+
+        Returns:
+            int: Number of changed entries
+        """
+        changes = self.diff(processes)
+        self.store.commit(changes)
+        self._seen = copy.deepcopy(processes)
+        return len(changes)
+
+def main():
+    """Command line entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Show or compact the tracked process store')
+    parser.add_argument('--ai-env-path', default='D:/AI_Environment', help='AI Environment root')
+    parser.add_argument('--compact', action='store_true', help='Fold the log into the snapshot')
+    args = parser.parse_args()
+
+    store = ProcessStore(Path(args.ai_env_path) / "background_processes.json")
+    start = time.perf_counter()
+    processes = store.compact() if args.compact else store.load()
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"{Fore.CYAN}{len(processes)} tracked process(es), "
+          f"{'compacted' if args.compact else 'loaded'} in {elapsed:.1f} ms{Style.RESET_ALL}")
+    for process_id, info in processes.items():
+        alive = is_same_process(info)
+        color = Fore.GREEN if alive else Fore.RED
+        print(f"  {color}{process_id:<32}{Style.RESET_ALL} PID {info.get('pid')} "
+              f"{'alive' if alive else 'gone or reused'}  {info.get('name', '')}")
+
+if __name__ == "__main__":
+    main()
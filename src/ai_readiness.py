@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+AI Readiness Probe
+Polling helpers with exponential backoff for waiting on real service state
+
+Version: 3.0.23
+Author: AI Environment Team
+Date: 2026-10-18
+"""
+
+import time
+
+def wait_until(check, timeout=10.0, initial_delay=0.02, max_delay=0.5, factor=2.0, abort=None):
+    """Poll a condition with exponential backoff until it holds or a deadline passes
+
+    The first check runs immediately; later checks are spaced 20 ms, 40 ms,
+    80 ms ... apart (capped at ``max_delay``), so fast services are detected
+    almost instantly while slow ones are not hammered.
+
+    Args:
+        check (callable): Returns a truthy value once the condition holds
+        timeout (float): Overall deadline in seconds
+        initial_delay (float): First sleep between checks in seconds
+        max_delay (float): Upper bound for the sleep between checks
+        factor (float): Backoff multiplier
+        abort (callable, optional): Returns True to give up early
+            (e.g. the process being waited on has exited)
+
+    Returns:
+        tuple: (result of check or None on timeout/abort, elapsed seconds)
+    """
+    start = time.perf_counter()
+    deadline = start + timeout
+    delay = initial_delay
+
+    while True:
+        try:
+            result = check()
+        except Exception:
+            result = None
+        if result:
+            return result, time.perf_counter() - start
+
+        if abort is not None and abort():
+            return None, time.perf_counter() - start
+
+        now = time.perf_counter()
+        if now >= deadline:
+            return None, now - start
+
+        time.sleep(min(delay, deadline - now))
+        delay = min(delay * factor, max_delay)
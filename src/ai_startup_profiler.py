@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+AI Startup Profiler
+Measures how long the activation menu takes to appear and which imports cost the most
+
+Version: 3.0.23
+Author: AI Environment Team
+Date: 2026-10-18
+
+Usage:
+    python activate_ai_env.py --profile-startup
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+try:
+    from colorama import Fore, Style
+except ImportError:
+    class Fore:
+        GREEN = RED = YELLOW = CYAN = ""
+    class Style:
+        RESET_ALL = ""
+
+PROBE_FLAG = "--startup-probe"
+TARGET_MS = 150
+PROBE_PREFIX = "STARTUP_PROBE "
+
+def parse_importtime(stderr):
+    """Parse ``-X importtime`` output
+
+    Returns:
+        list: dicts with module, self_us, cumulative_us, depth (0 = imported
+              directly by the script), in import order
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            entries.append({
+                'module': name.strip(),
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us),
+                'depth': (len(name) - len(name.lstrip()) - 1) // 2
+            })
+        except ValueError:
+            continue
+    return entries
+
+def process_age():
+    """Seconds since the current process was created (None if unknown)
+
+    On Linux this comes from /proc, since psutil derives create_time() from
+    a boot time with whole-second resolution; elsewhere psutil is precise.
+    """
+    try:
+        with open("/proc/uptime", 'r') as f:
+            uptime = float(f.read().split()[0])
+        with open("/proc/self/stat", 'r') as f:
+            # Fields after the parenthesised name; starttime is field 22
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        return uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+        return time.time() - psutil.Process().create_time()
+    except (ImportError, OSError):
+        return None
+
+def report_probe(script_start):
+    """Called by a script started with PROBE_FLAG once its menu is on screen
+
+    Measures from the creation of the process, so interpreter start-up and
+    site imports are included; without psutil only the time since the
+    script started can be measured.
+
+    Args:
+        script_start (float): time.perf_counter() taken when the script began
+    """
+    menu_time = time.perf_counter()
+    elapsed, since = menu_time - script_start, "script"
+    # Imports from here on are not part of the start-up being profiled
+    sys.__stderr__.write(f"{PROBE_PREFIX}\n")
+    sys.__stderr__.flush()
+    age = process_age()
+    if age is not None:
+        elapsed, since = age - (time.perf_counter() - menu_time), "process"
+    sys.__stdout__.write(f"\n{PROBE_PREFIX}{json.dumps({'menu_ms': elapsed * 1000, 'since': since})}\n")
+    sys.__stdout__.flush()
+
+def profile_startup(script_path, top=15):
+    """Run a script under ``-X importtime`` up to its first menu and print a breakdown
+
+    Args:
+        script_path (Path): Entry script supporting PROBE_FLAG
+        top (int): Number of imports to list
+
+    Returns:
+        bool: True if the first menu appeared within TARGET_MS
+    """
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", str(script_path), PROBE_FLAG],
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        encoding='utf-8',
+        errors='replace',
+        timeout=60
+    )
+    process_ms = (time.perf_counter() - start) * 1000
+
+    menu_ms = None
+    for line in completed.stdout.splitlines():
+        if line.startswith(PROBE_PREFIX):
+            probe = json.loads(line[len(PROBE_PREFIX):])
+            menu_ms, since = probe['menu_ms'], probe.get('since', "script")
+    if menu_ms is None:
+        print(f"{Fore.RED}[ERROR] Startup probe did not reach the menu (exit code {completed.returncode}){Style.RESET_ALL}")
+        print(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "")
+        return False
+
+    entries = parse_importtime(completed.stderr.split(PROBE_PREFIX, 1)[0])
+    top_level = [entry for entry in entries if entry['depth'] == 0]
+    import_ms = sum(entry['cumulative_us'] for entry in top_level) / 1000
+
+    print(f"{Fore.CYAN}Startup profile for {script_path}{Style.RESET_ALL}")
+    print(f"  Imports (all modules):     {import_ms:8.1f} ms across {len(entries)} modules")
+    print(f"  {since.capitalize() + ' start to menu:':<27}{menu_ms:8.1f} ms")
+    print(f"  Whole process (incl. exit):{process_ms:8.1f} ms")
+    print(f"\n  {'cumulative':>10} {'self':>8}  top-level import")
+    for entry in sorted(top_level, key=lambda e: e['cumulative_us'], reverse=True)[:top]:
+        print(f"  {entry['cumulative_us'] / 1000:8.1f}ms {entry['self_us'] / 1000:6.1f}ms  {entry['module']}")
+
+    within = menu_ms <= TARGET_MS
+    color = Fore.GREEN if within else Fore.YELLOW
+    print(f"\n{color}Time to first menu: {menu_ms:.1f} ms since {since} start (target {TARGET_MS} ms){Style.RESET_ALL}")
+    return within
@@ -0,0 +1,605 @@
+#!/usr/bin/env python3
+"""
+AI Supervisor
+Local daemon that owns background services, restarts them and keeps their logs
+
+Version: 3.0.23
+Author: AI Environment Team
+Date: 2026-10-18
+
+Usage:
+    python ai_supervisor.py --ai-env-path D:/AI_Environment --serve
+    python ai_supervisor.py --ai-env-path D:/AI_Environment --list
+    python ai_supervisor.py --ai-env-path D:/AI_Environment --logs ollama_server
+"""
+
+import json
+import logging
+import os
+import secrets
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+try:
+    from colorama import Fore, Style
+except ImportError:
+    class Fore:
+        GREEN = RED = YELLOW = CYAN = ""
+    class Style:
+        RESET_ALL = ""
+
+from ai_port_manager import terminate_process_trees
+from ai_readiness import wait_until
+
+STATE_FILE_NAME = "supervisor.json"
+LOG_DIR_NAME = "logs"
+RESTART_POLICIES = ("never", "on-failure", "always")
+
+# Defaults, overridable through the "process_supervisor" section of install_config.json
+DEFAULT_CONFIG = {
+    'enabled': True,
+    'restart_policy': "on-failure",
+    'max_restarts': 5,
+    'backoff_initial_seconds': 1.0,
+    'backoff_max_seconds': 60.0,
+    # A service that stayed up this long starts over with the initial backoff
+    'stable_seconds': 30.0,
+    'stop_timeout_seconds': 5.0,
+    'log_max_bytes': 5 * 1024 * 1024,
+    'log_backups': 3
+}
+POLL_INTERVAL = 0.25
+
+class SupervisorError(Exception):
+    """Raised when the supervisor cannot be reached or rejects a request"""
+
+def load_supervisor_config(ai_env_path):
+    """Supervisor settings from config/install_config.json merged over the defaults"""
+    config = dict(DEFAULT_CONFIG)
+    try:
+        with open(Path(ai_env_path) / "config" / "install_config.json", 'r', encoding='utf-8') as f:
+            config.update(json.load(f).get('process_supervisor', {}))
+    except (OSError, ValueError, AttributeError):
+        pass
+    return config
+
+def terminate_tree(pid, timeout=5.0):
+    """Terminate a process and its children, killing whatever outlives the timeout
+
+    Returns:
+        bool: True if nothing of the tree is left running
+    """
+    return not terminate_process_trees([pid], timeout)['remaining']
+
+class Supervisor:
+    """Owns service processes: starts them, restarts them by policy, logs their output
+
+    Each service is a dict record holding its spec (command, cwd, restart
+    policy ...) and its live state (pid, status, restarts, last exit code).
+    Output of every service goes through a pipe into its own rotating log
+    file under ``logs``. A monitor thread polls the children; when one exits
+    without being asked to, it is started again after an exponential
+    backoff, unless its policy or restart limit says otherwise.
+    """
+
+    def __init__(self, ai_env_path, config=None):
+        """Initialize Supervisor
+
+        Args:
+            ai_env_path (Path): AI Environment root (state file and logs live here)
+            config (dict, optional): Settings (default: load_supervisor_config)
+        """
+        self.ai_env_path = Path(ai_env_path)
+        self.config = config or load_supervisor_config(ai_env_path)
+        self.log_dir = self.ai_env_path / LOG_DIR_NAME
+        self.services = {}
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self.started_at = time.time()
+
+    def _logger(self, service_id):
+        """Rotating file logger of one service"""
+        logger = logging.getLogger(f"ai_supervisor.{service_id}")
+        if not logger.handlers:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(self.log_dir / f"{service_id}.log",
+                                          maxBytes=int(self.config['log_max_bytes']),
+                                          backupCount=int(self.config['log_backups']),
+                                          encoding='utf-8')
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+        return logger
+
+    def start_service(self, service_id, command, name=None, cwd=None, shell=False, env=None,
+                      url=None, service_type="service", restart=None, max_restarts=None):
+        """Start a service, or return its state if it is already running
+
+        Args:
+            service_id (str): Unique id, also the log file name
+            command (list or str): Command line; a string needs shell=True
+            env (dict, optional): Complete environment of the process (default:
+                the supervisor's own, fixed when it started)
+            restart (str, optional): "never", "on-failure" or "always"
+            max_restarts (int, optional): Restarts allowed before giving up
+
+        Returns:
+            dict: Public state of the service (see describe())
+        """
+        restart = restart or self.config['restart_policy']
+        if restart not in RESTART_POLICIES:
+            raise ValueError(f"Unknown restart policy: {restart}")
+
+        with self._lock:
+            service = self.services.get(service_id)
+            if service and service['proc'] is not None:
+                return self.describe(service)
+            service = {
+                'id': service_id,
+                'name': name or service_id,
+                'command': command,
+                'cwd': str(cwd) if cwd else None,
+                'shell': bool(shell),
+                'env': env,
+                'url': url,
+                'type': service_type,
+                'restart': restart,
+                'max_restarts': int(self.config['max_restarts'] if max_restarts is None else max_restarts),
+                'proc': None,
+                'pid': None,
+                'create_time': None,
+                'status': "starting",
+                'restarts': 0,
+                'last_exit_code': None,
+                'started_at': None,
+                'next_start': None,
+                'backoff': float(self.config['backoff_initial_seconds']),
+                'stopping': False,
+                'error': None
+            }
+            self.services[service_id] = service
+            self._spawn(service)
+            return self.describe(service)
+
+    def _spawn(self, service):
+        """Start the process of a service and the thread copying its output to the log"""
+        logger = self._logger(service['id'])
+        env = dict(service['env']) if service['env'] else None
+        try:
+            proc = subprocess.Popen(
+                service['command'],
+                cwd=service['cwd'],
+                shell=service['shell'],
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+            )
+        except OSError as e:
+            logger.info(f"[supervisor] could not start: {e}")
+            service.update(proc=None, pid=None, status="failed", error=str(e))
+            return
+
+        service.update(proc=proc, pid=proc.pid, status="running", error=None,
+                       started_at=time.time(), next_start=None)
+        if PSUTIL_AVAILABLE:
+            try:
+                service['create_time'] = psutil.Process(proc.pid).create_time()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                service['create_time'] = None
+        logger.info(f"[supervisor] started (PID {proc.pid}, restart {service['restarts']})")
+
+        def copy_output():
+            for raw in iter(proc.stdout.readline, b""):
+                logger.info(raw.decode('utf-8', 'replace').rstrip())
+            proc.stdout.close()
+
+        threading.Thread(target=copy_output, name=f"log-{service['id']}", daemon=True).start()
+
+    def _should_restart(self, service, exit_code):
+        """Whether the restart policy and limit allow another start"""
+        if service['restart'] == "never" or service['restarts'] >= service['max_restarts']:
+            return False
+        return service['restart'] == "always" or exit_code != 0
+
+    def _check(self, service, now):
+        """Handle an exited child and start services whose backoff has elapsed"""
+        proc = service['proc']
+        if proc is not None:
+            exit_code = proc.poll()
+            if exit_code is None:
+                return
+            logger = self._logger(service['id'])
+            service.update(proc=None, pid=None, last_exit_code=exit_code)
+            if service['stopping']:
+                service['status'] = "stopped"
+                logger.info(f"[supervisor] stopped (exit code {exit_code})")
+            elif self._should_restart(service, exit_code):
+                if now - service['started_at'] >= self.config['stable_seconds']:
+                    service['backoff'] = float(self.config['backoff_initial_seconds'])
+                service['status'] = "backoff"
+                service['next_start'] = now + service['backoff']
+                logger.info(f"[supervisor] exited with code {exit_code}, "
+                            f"restarting in {service['backoff']:.1f}s")
+                service['backoff'] = min(service['backoff'] * 2, float(self.config['backoff_max_seconds']))
+            else:
+                service['status'] = "exited" if exit_code == 0 else "failed"
+                logger.info(f"[supervisor] exited with code {exit_code}, not restarting "
+                            f"({service['restart']}, {service['restarts']}/{service['max_restarts']} restarts)")
+        elif service['status'] == "backoff" and not service['stopping'] and now >= service['next_start']:
+            service['restarts'] += 1
+            self._spawn(service)
+
+    def monitor(self):
+        """Poll the children until the supervisor shuts down"""
+        while not self._stopped.wait(POLL_INTERVAL):
+            with self._lock:
+                now = time.time()
+                for service in list(self.services.values()):
+                    self._check(service, now)
+
+    def stop_service(self, service_id, remove=False):
+        """Stop a service and keep it from being restarted
+
+        Args:
+            remove (bool): Forget the service afterwards instead of keeping it as "stopped"
+
+        Returns:
+            dict: Final public state of the service
+        """
+        with self._lock:
+            service = self.services.get(service_id)
+            if service is None:
+                raise KeyError(service_id)
+            service['stopping'] = True
+            proc = service['proc']
+
+        # Outside the lock: a slow shutdown must not block status queries
+        if proc is not None:
+            timeout = float(self.config['stop_timeout_seconds'])
+            if not terminate_tree(proc.pid, timeout):
+                proc.terminate()
+                try:
+                    proc.wait(timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+            proc.wait()
+
+        with self._lock:
+            self._check(service, time.time())
+            service['status'] = "stopped"
+            if remove:
+                self.services.pop(service_id, None)
+            return self.describe(service)
+
+    def restart_service(self, service_id):
+        """Stop a service and start it again with a fresh restart count"""
+        self.stop_service(service_id)
+        with self._lock:
+            service = self.services[service_id]
+            service.update(stopping=False, restarts=0,
+                           backoff=float(self.config['backoff_initial_seconds']))
+            self._spawn(service)
+            return self.describe(service)
+
+    def describe(self, service):
+        """Public, JSON-serializable state of a service"""
+        uptime = None
+        if service['proc'] is not None and service['started_at']:
+            uptime = time.time() - service['started_at']
+        return {
+            'id': service['id'],
+            'name': service['name'],
+            'type': service['type'],
+            'command': service['command'],
+            'url': service['url'],
+            'pid': service['pid'],
+            'create_time': service['create_time'],
+            'status': service['status'],
+            'restart': service['restart'],
+            'restarts': service['restarts'],
+            'max_restarts': service['max_restarts'],
+            'last_exit_code': service['last_exit_code'],
+            'started_at': service['started_at'],
+            'uptime': uptime,
+            'next_start': service['next_start'],
+            'error': service['error'],
+            'log_path': str(self.log_dir / f"{service['id']}.log")
+        }
+
+    def status(self, service_id=None):
+        """State of one service, or of all of them"""
+        with self._lock:
+            if service_id is None:
+                return [self.describe(service) for service in self.services.values()]
+            if service_id not in self.services:
+                raise KeyError(service_id)
+            return self.describe(self.services[service_id])
+
+    def tail_log(self, service_id, lines=50):
+        """Last lines of a service's current log file"""
+        try:
+            with open(self.log_dir / f"{service_id}.log", 'r', encoding='utf-8', errors='replace') as f:
+                return [line.rstrip("\n") for line in deque(f, maxlen=int(lines))]
+        except OSError:
+            return []
+
+    def shutdown(self):
+        """Stop every service and the monitor"""
+        for service_id in list(self.services):
+            try:
+                self.stop_service(service_id)
+            except KeyError:
+                continue
+        self._stopped.set()
+
+    def handle_request(self, request):
+        """Dispatch one API request
+
+        Returns:
+            Result of the command (JSON-serializable)
+        """
+        command = request.get('cmd')
+        if command == "ping":
+            return {'pid': os.getpid(), 'started_at': self.started_at, 'services': len(self.services)}
+        if command == "start":
+            return self.start_service(request['id'], request['command'],
+                                      name=request.get('name'), cwd=request.get('cwd'),
+                                      shell=request.get('shell', False), env=request.get('env'),
+                                      url=request.get('url'), service_type=request.get('type', "service"),
+                                      restart=request.get('restart'), max_restarts=request.get('max_restarts'))
+        if command == "stop":
+            return self.stop_service(request['id'], remove=request.get('remove', False))
+        if command == "restart":
+            return self.restart_service(request['id'])
+        if command == "status":
+            return self.status(request['id'])
+        if command == "list":
+            return self.status()
+        if command == "logs":
+            return self.tail_log(request['id'], request.get('lines', 50))
+        if command == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return True
+        raise ValueError(f"Unknown command: {command}")
+
+    def serve(self, port=0):
+        """Run the API on 127.0.0.1 until a shutdown request arrives
+
+        The chosen port and a random token go into supervisor.json; clients
+        must send the token with every request, so other local users cannot
+        drive the supervisor.
+        """
+        supervisor = self
+        token = secrets.token_hex(16)
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        request = json.loads(line)
+                        if request.get('token') != token:
+                            raise PermissionError("invalid token")
+                        response = {'ok': True, 'result': supervisor.handle_request(request)}
+                    except KeyError as e:
+                        response = {'ok': False, 'error': f"unknown service or field: {e.args[0]}"}
+                    except Exception as e:
+                        response = {'ok': False, 'error': str(e) or type(e).__name__}
+                    self.wfile.write((json.dumps(response) + "\n").encode('utf-8'))
+                    self.wfile.flush()
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        state_path = self.ai_env_path / STATE_FILE_NAME
+        with Server(("127.0.0.1", port), Handler) as server:
+            state = {'pid': os.getpid(), 'port': server.server_address[1],
+                     'token': token, 'started_at': self.started_at}
+            temp_path = state_path.with_suffix(".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2)
+            os.replace(temp_path, state_path)
+
+            threading.Thread(target=self.monitor, name="supervisor-monitor", daemon=True).start()
+            threading.Thread(target=server.serve_forever, name="supervisor-api", daemon=True).start()
+            try:
+                self._stopped.wait()
+            except KeyboardInterrupt:
+                self.shutdown()
+            finally:
+                server.shutdown()
+                try:
+                    with open(state_path, 'r', encoding='utf-8') as f:
+                        if json.load(f).get('pid') == os.getpid():
+                            state_path.unlink()
+                except (OSError, ValueError):
+                    pass
+
+class SupervisorClient:
+    """JSON-lines client of a running supervisor
+
+    The port and token are read from supervisor.json on every connection,
+    so a restarted supervisor is picked up without recreating the client.
+    """
+
+    def __init__(self, ai_env_path, timeout=10.0):
+        """Initialize Supervisor Client
+
+        Args:
+            ai_env_path (Path): AI Environment root
+            timeout (float): Socket timeout per request in seconds
+        """
+        self.ai_env_path = Path(ai_env_path)
+        self.state_path = self.ai_env_path / STATE_FILE_NAME
+        self.timeout = timeout
+
+    def _read_state(self):
+        """Port and token of the running supervisor (None if there is none)"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def request(self, action, **params):
+        """Send one request and return its result
+
+        Raises:
+            SupervisorError: Supervisor not running or request rejected
+        """
+        state = self._read_state()
+        if not state:
+            raise SupervisorError("supervisor is not running")
+        params.update(cmd=action, token=state['token'])
+        try:
+            with socket.create_connection(("127.0.0.1", state['port']), timeout=self.timeout) as sock:
+                sock.sendall((json.dumps(params) + "\n").encode('utf-8'))
+                with sock.makefile('r', encoding='utf-8') as reader:
+                    line = reader.readline()
+        except OSError as e:
+            raise SupervisorError(f"cannot reach supervisor: {e}")
+        if not line:
+            raise SupervisorError("supervisor closed the connection")
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise SupervisorError(response.get('error', "request failed"))
+        return response['result']
+
+    def is_running(self):
+        """True if a supervisor answers"""
+        try:
+            self.request("ping")
+            return True
+        except (SupervisorError, ValueError):
+            return False
+
+    def ensure_running(self, timeout=10.0):
+        """Start the supervisor daemon unless one is already answering
+
+        Returns:
+            bool: True once a supervisor answers
+        """
+        if self.is_running():
+            return True
+
+        kwargs = {}
+        if sys.platform == "win32":
+            kwargs['creationflags'] = (subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+                                       | subprocess.CREATE_NO_WINDOW)
+        else:
+            kwargs['start_new_session'] = True
+        try:
+            subprocess.Popen(
+                [sys.executable, str(Path(__file__).resolve()), "--serve",
+                 "--ai-env-path", str(self.ai_env_path)],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                close_fds=True,
+                **kwargs
+            )
+        except OSError:
+            return False
+        answered, elapsed = wait_until(self.is_running, timeout=timeout)
+        return bool(answered)
+
+    def start(self, service_id, command, **spec):
+        """Start a service (see Supervisor.start_service for the spec fields)"""
+        return self.request("start", id=service_id, command=command, **spec)
+
+    def stop(self, service_id, remove=False):
+        """Stop a service"""
+        return self.request("stop", id=service_id, remove=remove)
+
+    def restart(self, service_id):
+        """Restart a service"""
+        return self.request("restart", id=service_id)
+
+    def status(self, service_id):
+        """State of one service"""
+        return self.request("status", id=service_id)
+
+    def list(self):
+        """State of all services"""
+        return self.request("list")
+
+    def logs(self, service_id, lines=50):
+        """Last lines of a service's log"""
+        return self.request("logs", id=service_id, lines=lines)
+
+    def shutdown(self):
+        """Stop all services and the supervisor"""
+        return self.request("shutdown")
+
+def get_supervisor_client(ai_env_path):
+    """Client of the supervisor, or None if it is disabled in install_config.json"""
+    if not load_supervisor_config(ai_env_path).get('enabled', True):
+        return None
+    return SupervisorClient(ai_env_path)
+
+def print_services(services):
+    """Print service states as returned by SupervisorClient.list"""
+    if not services:
+        print(f"{Fore.YELLOW}[INFO] No supervised services{Style.RESET_ALL}")
+        return
+    colors = {'running': Fore.GREEN, 'backoff': Fore.YELLOW, 'starting': Fore.YELLOW}
+    for service in services:
+        color = colors.get(service['status'], Fore.RED)
+        uptime = f", up {service['uptime']:.0f}s" if service['uptime'] is not None else ""
+        exit_code = f", last exit {service['last_exit_code']}" if service['last_exit_code'] is not None else ""
+        print(f"{color}{service['id']:<28} {service['status']:<9}{Style.RESET_ALL} "
+              f"PID {service['pid'] or '-'}{uptime}, restarts {service['restarts']}/{service['max_restarts']}"
+              f"{exit_code}")
+
+def main():
+    """Command line entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='AI Environment process supervisor')
+    parser.add_argument('--ai-env-path', default='D:/AI_Environment', help='AI Environment root')
+    parser.add_argument('--serve', action='store_true', help='Run the supervisor in the foreground')
+    parser.add_argument('--port', type=int, default=0, help='API port for --serve (default: any free port)')
+    parser.add_argument('--list', action='store_true', help='Show supervised services')
+    parser.add_argument('--logs', metavar='SERVICE_ID', help='Show the log of a service')
+    parser.add_argument('--lines', type=int, default=50, help='Log lines to show')
+    parser.add_argument('--stop', metavar='SERVICE_ID', help='Stop a service')
+    parser.add_argument('--shutdown', action='store_true', help='Stop all services and the supervisor')
+    args = parser.parse_args()
+
+    if args.serve:
+        Supervisor(args.ai_env_path).serve(args.port)
+        return
+
+    client = SupervisorClient(args.ai_env_path)
+    try:
+        if args.logs:
+            print("\n".join(client.logs(args.logs, args.lines)))
+        elif args.stop:
+            print_services([client.stop(args.stop)])
+        elif args.shutdown:
+            client.shutdown()
+            print(f"{Fore.GREEN}[OK] Supervisor shutting down{Style.RESET_ALL}")
+        else:
+            print_services(client.list())
+    except SupervisorError as e:
+        print(f"{Fore.RED}[ERROR] {e}{Style.RESET_ALL}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+AI Test Results
+JSONL history of component test results with timing regression checks
+
+Version: 3.0.23
+Author: AI Environment Team
+Date: 2026-10-18
+
+Usage:
+    python ai_test_results.py --results D:/AI_Environment/test_results.jsonl
+    python ai_test_results.py --results test_results.jsonl --test python_packages --last 50
+    python ai_test_results.py --results test_results.jsonl --compare --threshold 0.5
+    python ai_test_results.py --results test_results.jsonl --compare --all-hosts
+"""
+
+import json
+import platform
+import re
+import sys
+import time
+import uuid
+from pathlib import Path
+
+try:
+    from colorama import Fore, Style
+except ImportError:
+    class Fore:
+        GREEN = RED = YELLOW = CYAN = ""
+    class Style:
+        RESET_ALL = ""
+
+DEFAULT_THRESHOLD = 0.5
+# Slowdowns smaller than this are timer noise, whatever the ratio
+DEFAULT_MIN_DELTA = 0.25
+DEFAULT_WINDOW = 20
+OUTPUT_LINES = 20
+ANSI_PATTERN = re.compile(r"\x1b\[[0-9;]*m")
+
+def percentile(values, percent):
+    """Linear-interpolated percentile of a list of numbers (None if empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * percent / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+class TestResultStore:
+    """Append-only store of test results, one JSON record per line
+
+    Every record carries the run id, time and host, so files collected
+    from several machines can simply be concatenated.
+    """
+
+    def __init__(self, path):
+        """Initialize Test Result Store
+
+        Args:
+            path (Path): JSONL file (created on first write)
+        """
+        self.path = Path(path)
+
+    def record_run(self, results, wall_time=None):
+        """Append the results of one test run
+
+        Args:
+            results (list): Result dicts from TestScheduler.run
+            wall_time (float, optional): Wall-clock duration of the whole run
+
+        Returns:
+            str: Run id of the recorded run
+        """
+        run_id = uuid.uuid4().hex[:12]
+        timestamp = time.time()
+        host = platform.node()
+        lines = []
+        for result in results:
+            output = ANSI_PATTERN.sub("", result.get('output') or "").strip().splitlines()
+            lines.append(json.dumps({
+                'run_id': run_id,
+                'timestamp': timestamp,
+                'host': host,
+                'name': result['name'],
+                'status': result['status'],
+                'duration': round(result['duration'], 4),
+                'wall_time': round(wall_time, 4) if wall_time is not None else None,
+                'details': {
+                    'error': result.get('error'),
+                    'output': output[-OUTPUT_LINES:]
+                }
+            }, ensure_ascii=False))
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        return run_id
+
+    def load(self, name=None, host=None):
+        """Load stored records, oldest first; unreadable lines are skipped"""
+        records = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if name and record.get('name') != name:
+                        continue
+                    if host and record.get('host') != host:
+                        continue
+                    records.append(record)
+        except OSError:
+            pass
+        return records
+
+    def durations(self, records=None, window=None, passed_only=True):
+        """Group durations by test name
+
+        Args:
+            records (list, optional): Records to use (default: the whole store)
+            window (int, optional): Keep only the newest N durations per test
+            passed_only (bool): Ignore failed, skipped and timed-out runs
+
+        Returns:
+            dict: test name -> list of durations, oldest first
+        """
+        grouped = {}
+        for record in self.load() if records is None else records:
+            if passed_only and record.get('status') != "passed":
+                continue
+            grouped.setdefault(record['name'], []).append(record['duration'])
+        if window:
+            grouped = {name: values[-window:] for name, values in grouped.items()}
+        return grouped
+
+    def compare(self, results, history=None, threshold=DEFAULT_THRESHOLD,
+                min_delta=DEFAULT_MIN_DELTA, window=DEFAULT_WINDOW, host=None, all_hosts=False):
+        """Find tests that got slower than their stored history
+
+        The baseline of a test is the median of its last ``window`` passing
+        durations on the same host (timings of other machines say nothing
+        about this one). A test regressed if it is more than ``threshold``
+        (0.5 = 50%) slower than that and at least ``min_delta`` seconds slower.
+
+        Args:
+            results (list): Result dicts (or stored records) of the new run
+            history (list, optional): Records to compare against (default: the store)
+            host (str, optional): Host whose history is the baseline (default: this one)
+            all_hosts (bool): Use the history of every host
+
+        Returns:
+            list: dicts with name, duration, baseline, ratio, samples, sorted
+                  by ratio (worst first)
+        """
+        if history is None:
+            history = self.load()
+        if not all_hosts:
+            host = host or platform.node()
+            history = [record for record in history if record.get('host') == host]
+        baselines = self.durations(history, window=window)
+        regressions = []
+        for result in results:
+            samples = baselines.get(result['name'])
+            if not samples or result['status'] != "passed":
+                continue
+            baseline = percentile(samples, 50)
+            delta = result['duration'] - baseline
+            if delta >= min_delta and result['duration'] > baseline * (1 + threshold):
+                regressions.append({
+                    'name': result['name'],
+                    'duration': result['duration'],
+                    'baseline': baseline,
+                    'ratio': result['duration'] / baseline if baseline > 0 else float('inf'),
+                    'samples': len(samples)
+                })
+        return sorted(regressions, key=lambda entry: entry['ratio'], reverse=True)
+
+    def last_run(self):
+        """Split the store into (records of the newest run, all earlier records)"""
+        records = self.load()
+        if not records:
+            return [], []
+        run_id = records[-1]['run_id']
+        return ([r for r in records if r['run_id'] == run_id],
+                [r for r in records if r['run_id'] != run_id])
+
+def print_regressions(regressions, threshold=DEFAULT_THRESHOLD):
+    """Print duration regressions found by TestResultStore.compare"""
+    if not regressions:
+        print(f"{Fore.GREEN}[OK] No test slowed down by more than {threshold:.0%}{Style.RESET_ALL}")
+        return
+    print(f"{Fore.YELLOW}[WARNING] {len(regressions)} test(s) slower than their history:{Style.RESET_ALL}")
+    for entry in regressions:
+        print(f"  {entry['name']:<24} {entry['duration']:7.2f}s  vs median {entry['baseline']:.2f}s "
+              f"({entry['ratio']:.1f}x, {entry['samples']} runs)")
+
+def print_percentiles(store, name=None, last=None, host=None):
+    """Print per-test latency percentiles of passing runs"""
+    records = store.load(name=name, host=host)
+    grouped = store.durations(records, window=last)
+    if not grouped:
+        print(f"{Fore.YELLOW}[INFO] No passing results stored in {store.path}{Style.RESET_ALL}")
+        return
+
+    runs = len({record['run_id'] for record in records})
+    print(f"{Fore.CYAN}Test latency over {runs} run(s) ({store.path}){Style.RESET_ALL}")
+    print(f"  {'test':<24} {'n':>4} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    for test_name in sorted(grouped):
+        values = grouped[test_name]
+        print(f"  {test_name:<24} {len(values):>4} "
+              + " ".join(f"{percentile(values, p):7.2f}s" for p in (50, 90, 99))
+              + f" {max(values):7.2f}s")
+
+def main():
+    """Command line entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Query stored component test results')
+    parser.add_argument('--results', default='test_results.jsonl', help='Results JSONL file')
+    parser.add_argument('--test', help='Only show this test')
+    parser.add_argument('--host', help='Only use results from this host (--compare: this machine by default)')
+    parser.add_argument('--all-hosts', action='store_true',
+                       help='Compare against the history of every host')
+    parser.add_argument('--last', type=int, help='Only use the newest N results per test')
+    parser.add_argument('--compare', action='store_true',
+                       help='Compare the newest run against the runs before it')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                       help='Relative slowdown that counts as a regression (0.5 = 50%%)')
+    args = parser.parse_args()
+
+    store = TestResultStore(args.results)
+    if args.compare:
+        latest, history = store.last_run()
+        if not latest:
+            print(f"{Fore.YELLOW}[INFO] No results stored in {store.path}{Style.RESET_ALL}")
+            sys.exit(0)
+        regressions = store.compare(latest, history, threshold=args.threshold,
+                                    window=args.last or DEFAULT_WINDOW,
+                                    host=args.host or latest[0].get('host'), all_hosts=args.all_hosts)
+        print_regressions(regressions, args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    print_percentiles(store, args.test, args.last, args.host)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+AI Test Scheduler
+Runs component checks concurrently along their dependency graph
+
+Version: 3.0.23
+Author: AI Environment Team
+Date: 2026-10-18
+"""
+
+import sys
+import threading
+import time
+import traceback
+from io import StringIO
+from queue import Queue, Empty
+
+DEFAULT_TIMEOUT = 60
+
+class ThreadOutput:
+    """sys.stdout replacement that keeps each test thread's output apart
+
+    Threads that registered a buffer write into it; every other thread
+    writes straight through to the real stream.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    def capture(self, buffer):
+        """Route the calling thread's output into buffer"""
+        self._local.buffer = buffer
+
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self):
+        if getattr(self._local, 'buffer', None) is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+class TestScheduler:
+    """Dependency-aware concurrent test runner
+
+    Tests are registered with the names of the tests they depend on. A
+    test starts as soon as all of its dependencies passed, on a daemon
+    thread, up to ``max_workers`` at a time; if a dependency fails, the
+    test is skipped. A test that exceeds its timeout is reported as such
+    and its thread is abandoned, so one hanging check cannot hold up the
+    run. Output of each test is captured and printed as one block, in
+    registration order, so parallel tests do not interleave.
+    """
+
+    def __init__(self, max_workers=8, default_timeout=DEFAULT_TIMEOUT):
+        """Initialize Test Scheduler
+
+        Args:
+            max_workers (int): Maximum number of tests running at once
+            default_timeout (float): Seconds a test may run unless it sets its own
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.default_timeout = default_timeout
+        self.tests = {}
+
+    def add(self, name, func, description=None, depends_on=(), timeout=None):
+        """Register a test
+
+        Args:
+            name (str): Unique test name
+            func (callable): Test function returning True on success
+            description (str, optional): Header printed above the test output
+            depends_on (iterable): Names of tests that must pass first
+            timeout (float, optional): Seconds before the test is abandoned
+        """
+        if name in self.tests:
+            raise ValueError(f"Duplicate test: {name}")
+        self.tests[name] = {
+            'func': func,
+            'description': description or name,
+            'depends_on': tuple(depends_on),
+            'timeout': timeout or self.default_timeout
+        }
+
+    def _check_graph(self):
+        """Reject unknown dependencies and cycles"""
+        for name, test in self.tests.items():
+            for dependency in test['depends_on']:
+                if dependency not in self.tests:
+                    raise ValueError(f"{name} depends on unknown test {dependency}")
+
+        state = {}
+
+        def visit(name):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Dependency cycle at {name}")
+            state[name] = "visiting"
+            for dependency in self.tests[name]['depends_on']:
+                visit(dependency)
+            state[name] = "done"
+
+        for name in self.tests:
+            visit(name)
+
+    def _worker(self, name, output, done):
+        """Run one test on its own thread and report to the scheduler"""
+        buffer = StringIO()
+        output.capture(buffer)
+        status, error = "failed", None
+        start = time.perf_counter()
+        try:
+            if self.tests[name]['func']():
+                status = "passed"
+        except Exception as e:
+            status, error = "error", f"{type(e).__name__}: {e}"
+            buffer.write(traceback.format_exc())
+        done.put((name, status, error, time.perf_counter() - start, buffer.getvalue()))
+
+    def critical_path(self, results):
+        """Longest dependency chain by measured duration
+
+        Returns:
+            tuple: (seconds, list of test names along the path)
+        """
+        durations = {result['name']: result['duration'] for result in results}
+        best = {}
+
+        def longest(name):
+            if name not in best:
+                chains = [longest(dependency) for dependency in self.tests[name]['depends_on']]
+                seconds, path = max(chains, default=(0.0, []))
+                best[name] = (seconds + durations.get(name, 0.0), path + [name])
+            return best[name]
+
+        return max((longest(name) for name in self.tests), default=(0.0, []))
+
+    def run(self, on_result=None):
+        """Run all tests and wait for them to finish
+
+        Args:
+            on_result (callable, optional): Called with each result dict, in
+                registration order, while output is still being captured for
+                tests that are running
+
+        Returns:
+            list: One result dict per test (name, description, status, passed,
+                  duration, error, output) in registration order; status is
+                  "passed", "failed", "error", "timeout" or "skipped"
+        """
+        self._check_graph()
+        order = list(self.tests)
+        results = {}
+        running = {}
+        done = Queue()
+        reported = 0
+
+        output = ThreadOutput(sys.stdout)
+        sys.stdout = output
+        try:
+            while len(results) < len(order):
+                # Resolve tests whose dependencies are settled
+                for name in order:
+                    if name in results or name in running:
+                        continue
+                    dependencies = self.tests[name]['depends_on']
+                    if any(dep in results and not results[dep]['passed'] for dep in dependencies):
+                        failed = [dep for dep in dependencies if dep in results and not results[dep]['passed']]
+                        results[name] = self._result(name, "skipped", f"dependency failed: {', '.join(failed)}")
+                    elif all(dep in results for dep in dependencies) and len(running) < self.max_workers:
+                        thread = threading.Thread(target=self._worker, args=(name, output, done),
+                                                  name=f"test-{name}", daemon=True)
+                        running[name] = time.perf_counter()
+                        thread.start()
+
+                # Wait for the next finished test or the nearest deadline
+                if running:
+                    now = time.perf_counter()
+                    deadline = min(started + self.tests[name]['timeout'] for name, started in running.items())
+                    try:
+                        name, status, error, duration, text = done.get(timeout=max(0.0, deadline - now))
+                        if name in running:
+                            del running[name]
+                            results[name] = self._result(name, status, error, duration, text)
+                    except Empty:
+                        now = time.perf_counter()
+                        for name, started in list(running.items()):
+                            timeout = self.tests[name]['timeout']
+                            if now - started >= timeout:
+                                del running[name]
+                                results[name] = self._result(name, "timeout", f"timed out after {timeout}s",
+                                                             now - started)
+
+                # Hand results over in registration order
+                while reported < len(order) and order[reported] in results:
+                    if on_result:
+                        on_result(results[order[reported]])
+                    reported += 1
+        finally:
+            sys.stdout = output.stream
+
+        return [results[name] for name in order]
+
+    def _result(self, name, status, error=None, duration=0.0, output=""):
+        """Build a result record"""
+        return {
+            'name': name,
+            'description': self.tests[name]['description'],
+            'status': status,
+            'passed': status == "passed",
+            'duration': duration,
+            'error': error,
+            'output': output
+        }
+
+def print_timing_summary(scheduler, results, wall_time):
+    """Print wall-clock time against summed test time and the critical path"""
+    summed = sum(result['duration'] for result in results)
+    path_time, path = scheduler.critical_path(results)
+    speedup = summed / wall_time if wall_time > 0 else 1.0
+    print(f"Wall-clock time: {wall_time:.2f}s (summed test time {summed:.2f}s, {speedup:.1f}x)")
+    print(f"Slowest path: {' -> '.join(path)} ({path_time:.2f}s)")
+    slowest = sorted(results, key=lambda result: result['duration'], reverse=True)[:3]
+    print("Slowest tests: " + ", ".join(f"{r['name']} {r['duration']:.2f}s" for r in slowest))
@@ -10,13 +10,39 @@ Version: 3.0.1
 
 import os
 import sys
+import json
+import time
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
 
 # Version information
 SCRIPT_VERSION = "3.0.1"
 SCRIPT_DATE = "2025-08-12"
 
+# Files are read in 1 MB blocks; hashlib releases the GIL while hashing
+# blocks this large, so worker threads hash on separate cores
+HASH_BUFFER_SIZE = 1024 * 1024
+
+# Digests of previously verified files, keyed by path and validated by
+# size, mtime_ns and inode so only changed files are read again
+CACHE_FILE = ".checksum_cache.json"
+# Files modified this recently are not cached: a second write within the
+# filesystem's timestamp granularity would leave the stat key unchanged
+CACHE_MIN_AGE_NS = 2 * 1000**3
+
+# Subtrees never scanned for extra files (VCS data, notebook autosaves,
+# bytecode and Ollama model blobs)
+IGNORED_DIRS = {".git", ".ipynb_checkpoints", "__pycache__", ".pytest_cache", "blobs"}
+IGNORED_SUFFIXES = (".pyc", ".tmp")
+# State the AI Environment writes to the package root while it runs
+RUNTIME_FILES = {
+    ".version_cache.json", "env_state_cache.json", "background_processes.wal.jsonl",
+    "background_processes.lock", "supervisor.json", "port_registry.json", "port_registry.lock",
+    "download_history.json", "test_results.jsonl", "kernel_pool_stats.json"
+}
+
 # Color codes for cross-platform support
 class Colors:
     if os.name == 'nt':  # Windows
@@ -32,17 +58,92 @@ class Colors:
         RED = '\033[91m'
         CYAN = '\033[96m'
 
-def calculate_sha256(filepath):
-    """Calculate SHA256 hash of a file"""
+def calculate_sha256(filepath, progress=None):
+    """Calculate SHA256 hash of a file
+    
+    Args:
+        filepath (str): File to hash
+        progress (callable, optional): Called with the byte count of each block read
+    """
     sha256_hash = hashlib.sha256()
+    buffer = bytearray(HASH_BUFFER_SIZE)
+    view = memoryview(buffer)
     try:
-        with open(filepath, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
+        with open(filepath, "rb", buffering=0) as f:
+            while True:
+                size = f.readinto(buffer)
+                if not size:
+                    break
+                sha256_hash.update(view[:size])
+                if progress:
+                    progress(size)
         return sha256_hash.hexdigest()
     except Exception as e:
         return None
 
+def load_hash_cache(cache_file=CACHE_FILE):
+    """Load the stat-keyed digest cache"""
+    try:
+        with open(cache_file, 'r') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def save_hash_cache(cache, cache_file=CACHE_FILE):
+    """Write the digest cache atomically"""
+    temp_file = cache_file + ".tmp"
+    try:
+        with open(temp_file, 'w') as f:
+            json.dump(cache, f, separators=(',', ':'))
+        os.replace(temp_file, cache_file)
+    except OSError as e:
+        print(f"{Colors.YELLOW}[WARNING] Could not save checksum cache: {e}{Colors.RESET}")
+
+def stat_key(st):
+    """Cache key part identifying one version of a file"""
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+def default_jobs():
+    """Default number of hashing threads"""
+    return min(32, os.cpu_count() or 1)
+
+def format_bytes(size):
+    """Format a byte count, e.g. 1.5 GB"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+class ByteProgress:
+    """Thread-safe byte counter for hashing progress"""
+    
+    def __init__(self, total_bytes):
+        self.total_bytes = total_bytes
+        self.done_bytes = 0
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+    
+    def add(self, size):
+        """Record bytes read by a worker"""
+        with self._lock:
+            self.done_bytes += size
+    
+    def elapsed(self):
+        return time.perf_counter() - self.start
+    
+    def throughput(self):
+        """Bytes per second so far"""
+        elapsed = self.elapsed()
+        return self.done_bytes / elapsed if elapsed > 0 else 0.0
+    
+    def line(self):
+        """Progress line, e.g. [*] 42.0% 1.2 GB / 2.9 GB at 850.0 MB/s"""
+        percent = (self.done_bytes / self.total_bytes * 100) if self.total_bytes else 100.0
+        return (f"[*] {percent:5.1f}%  {format_bytes(self.done_bytes)} / {format_bytes(self.total_bytes)}"
+                f"  at {format_bytes(self.throughput())}/s")
+
 def print_header():
     """Print the header banner"""
     print("================================================================")
@@ -69,8 +170,10 @@ def load_checksums():
                     parts = line.split('  ', 1)
                     if len(parts) == 2:
                         expected_hash, filepath = parts
-                        # Remove ./ prefix if present
-                        filepath = filepath.lstrip('./')
+                        # Remove ./ prefix if present (keeps dotfiles intact)
+                        filepath = filepath.replace('\\', '/')
+                        if filepath.startswith('./'):
+                            filepath = filepath[2:]
                         checksums[filepath] = expected_hash
         
         print(f"{Colors.GREEN}[OK] Loaded checksums for {len(checksums)} files{Colors.RESET}")
@@ -80,8 +183,18 @@ def load_checksums():
         print(f"{Colors.RED}[ERROR] Failed to load checksums: {e}{Colors.RESET}")
         return None
 
-def verify_files(expected_checksums):
-    """Verify all files against expected checksums"""
+def verify_files(expected_checksums, jobs=None, cache=None):
+    """Verify all files against expected checksums
+    
+    Files are hashed concurrently by a thread pool; results are printed as
+    they complete, followed by a byte-based progress line. Files whose
+    size, mtime_ns and inode match the cache are not read at all.
+    
+    Args:
+        expected_checksums (dict): filepath -> expected SHA256
+        jobs (int, optional): Number of hashing threads (default: CPU count)
+        cache (dict, optional): Digest cache, updated in place
+    """
     print("\n================================================================")
     print("                    FILE INTEGRITY VERIFICATION")
     print("================================================================")
@@ -91,34 +204,75 @@ def verify_files(expected_checksums):
         'verified': 0,
         'missing': 0,
         'corrupted': 0,
-        'errors': 0
+        'errors': 0,
+        'cached': 0
     }
     
-    for filepath, expected_hash in expected_checksums.items():
-        print(f"[*] Verifying: {filepath}")
-        
-        if not os.path.exists(filepath):
-            print(f"{Colors.RED}[MISSING] {filepath} - File not found{Colors.RESET}")
-            stats['missing'] += 1
-            continue
-        
-        actual_hash = calculate_sha256(filepath)
-        if actual_hash is None:
-            print(f"{Colors.RED}[ERROR] {filepath} - Cannot calculate checksum{Colors.RESET}")
-            stats['errors'] += 1
-            continue
-        
+    def check_hash(filepath, expected_hash, actual_hash, note=""):
         if actual_hash == expected_hash:
-            print(f"{Colors.GREEN}[OK] {filepath} - Checksum verified{Colors.RESET}")
+            print(f"{Colors.GREEN}[OK] {filepath} - Checksum verified{note}{Colors.RESET}")
             stats['verified'] += 1
         else:
-            print(f"{Colors.RED}[CORRUPTED] {filepath} - Checksum mismatch{Colors.RESET}")
+            print(f"{Colors.RED}[CORRUPTED] {filepath} - Checksum mismatch{note}{Colors.RESET}")
             print(f"    Expected: {expected_hash}")
             print(f"    Actual:   {actual_hash}")
             stats['corrupted'] += 1
+    
+    # Stat everything first: missing files are reported immediately and
+    # the byte total for the progress line is known up front
+    pending_files = {}
+    for filepath, expected_hash in expected_checksums.items():
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            st = None
+        if st is None or not os.path.isfile(filepath):
+            print(f"{Colors.RED}[MISSING] {filepath} - File not found{Colors.RESET}")
+            stats['missing'] += 1
+            continue
         
-        print()
+        entry = cache.get(filepath) if cache is not None else None
+        if entry and entry[:3] == stat_key(st):
+            check_hash(filepath, expected_hash, entry[3], " (cached)")
+            stats['cached'] += 1
+            continue
+        pending_files[filepath] = (expected_hash, st)
+    
+    jobs = max(1, jobs or default_jobs())
+    progress = ByteProgress(sum(st.st_size for _, st in pending_files.values()))
+    if stats['cached']:
+        print(f"[INFO] {stats['cached']} unchanged files verified from cache")
+    print(f"[INFO] Hashing {len(pending_files)} files ({format_bytes(progress.total_bytes)}) "
+          f"with {jobs} threads")
+    
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(calculate_sha256, filepath, progress.add): filepath
+            for filepath in pending_files
+        }
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            # Clear the progress line before printing results
+            print("\r" + " " * 72 + "\r", end="")
+            for future in done:
+                filepath = futures[future]
+                expected_hash, st = pending_files[filepath]
+                actual_hash = future.result()
+                
+                if actual_hash is None:
+                    print(f"{Colors.RED}[ERROR] {filepath} - Cannot calculate checksum{Colors.RESET}")
+                    stats['errors'] += 1
+                    continue
+                check_hash(filepath, expected_hash, actual_hash)
+                if cache is not None and time.time_ns() - st.st_mtime_ns > CACHE_MIN_AGE_NS:
+                    cache[filepath] = stat_key(st) + [actual_hash]
+            print(progress.line(), end="", flush=True)
     
+    print()
+    print(f"[INFO] Hashed {format_bytes(progress.done_bytes)} in {progress.elapsed():.2f}s "
+          f"({format_bytes(progress.throughput())}/s)")
+    print()
     return stats
 
 def load_json_expected_files():
@@ -152,48 +306,74 @@ def load_json_expected_files():
     
     return expected_files
 
-def check_extra_files():
-    """Check for unexpected files - only among AI Environment files"""
+def scan_managed_files(managed_dirs, root="."):
+    """Collect the files of the package with an os.scandir walk
+    
+    The package root is listed without descending; only the managed
+    directories (those holding manifest entries, e.g. src, config, help)
+    are walked recursively, so installations such as Miniconda or Ollama
+    next to them are never touched. IGNORED_DIRS subtrees are pruned.
+    
+    Args:
+        managed_dirs (set): Top-level directories to walk recursively
+        root (str): Package root
+        
+    Returns:
+        set: Relative paths with '/' separators
+    """
+    found = set()
+    stack = [(root, "", False)]
+    stack.extend((os.path.join(root, name), name + "/", True) for name in managed_dirs)
+    
+    while stack:
+        path, prefix, recursive = stack.pop()
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and entry.name not in IGNORED_DIRS:
+                            stack.append((entry.path, prefix + entry.name + "/", True))
+                    elif not entry.name.endswith(IGNORED_SUFFIXES):
+                        found.add(prefix + entry.name)
+        except OSError:
+            continue
+    return found
+
+def check_extra_files(expected_checksums):
+    """Check for unexpected and missing AI Environment files in one walk
+    
+    Args:
+        expected_checksums (dict): Manifest loaded by load_checksums
+        
+    Returns:
+        tuple: (extra files count, count of missing files listed only in the
+                JSON config; missing manifest files are counted by verify_files)
+    """
     print("================================================================")
     print("                    EXTRA FILES CHECK")
     print("================================================================")
     
-    # Get expected files from checksums
-    checksum_files = set()
-    if os.path.exists("CHECKSUMS.sha256"):
-        with open("CHECKSUMS.sha256", 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    parts = line.split('  ', 1)
-                    if len(parts) == 2:
-                        filepath = parts[1].lstrip('./')
-                        checksum_files.add(filepath)
-    
     # Get expected files from JSON config
     json_files = load_json_expected_files()
     
     # Add verification files
-    verification_files = {"CHECKSUMS.sha256", "verify_checksums.py", "PACKAGE_INFO.txt", "version_config.json"}
+    verification_files = {"CHECKSUMS.sha256", "verify_checksums.py", "PACKAGE_INFO.txt", "version_config.json", CACHE_FILE}
+    verification_files |= RUNTIME_FILES
     
     # All expected files
-    all_expected = checksum_files | json_files | verification_files
+    all_expected = set(expected_checksums) | json_files | verification_files
+    managed_dirs = {path.split('/', 1)[0] for path in all_expected if '/' in path}
     
-    # Only check files that should be part of AI Environment
-    # Don't scan the entire directory - only check specific AI Environment files
-    ai_env_files = set()
+    start = time.perf_counter()
+    found_files = scan_managed_files(managed_dirs)
+    elapsed = time.perf_counter() - start
     
-    # Check only the files we expect to exist
-    for expected_file in all_expected:
-        if os.path.exists(expected_file):
-            ai_env_files.add(expected_file)
+    extra_files = found_files - all_expected
+    missing_files = (all_expected - verification_files) - found_files
     
-    # Find extra files only among AI Environment related files
-    extra_files = ai_env_files - all_expected
-    
-    print(f"{Colors.GREEN}[INFO] Checking only AI Environment files (not scanning entire directory){Colors.RESET}")
+    print(f"{Colors.GREEN}[INFO] Scanned package root and {', '.join(sorted(managed_dirs)) or 'no directories'}: "
+          f"{len(found_files)} files in {elapsed:.2f}s{Colors.RESET}")
     print(f"{Colors.GREEN}[INFO] Expected AI Environment files: {len(all_expected)}{Colors.RESET}")
-    print(f"{Colors.GREEN}[INFO] Found AI Environment files: {len(ai_env_files)}{Colors.RESET}")
     
     if extra_files:
         print(f"{Colors.YELLOW}[WARNING] Found {len(extra_files)} unexpected AI Environment files:{Colors.RESET}")
@@ -202,11 +382,16 @@ def check_extra_files():
     else:
         print(f"{Colors.GREEN}[OK] No unexpected AI Environment files found{Colors.RESET}")
     
-    print(f"{Colors.CYAN}[INFO] Note: Only checking AI Environment files, ignoring system installations{Colors.RESET}")
+    if missing_files:
+        print(f"{Colors.RED}[WARNING] {len(missing_files)} expected files are not present:{Colors.RESET}")
+        for file in sorted(missing_files):
+            print(f"  - {file}")
+    
+    print(f"{Colors.CYAN}[INFO] Note: Only managed directories are scanned; system installations are ignored{Colors.RESET}")
     print()
-    return len(extra_files)
+    return len(extra_files), len(missing_files - set(expected_checksums))
 
-def print_summary(stats, extra_files_count):
+def print_summary(stats, extra_files_count, missing_config_count=0):
     """Print verification summary"""
     print("================================================================")
     print("                    VERIFICATION SUMMARY")
@@ -217,10 +402,13 @@ def print_summary(stats, extra_files_count):
     print(f"Files missing: {stats['missing']}")
     print(f"Files corrupted: {stats['corrupted']}")
     print(f"Verification errors: {stats['errors']}")
+    print(f"Verified from cache: {stats['cached']}")
     print(f"Extra files found: {extra_files_count}")
+    print(f"Config files missing: {missing_config_count}")
     print()
     
-    if stats['verified'] == stats['total'] and stats['missing'] == 0 and stats['corrupted'] == 0 and stats['errors'] == 0:
+    if (stats['verified'] == stats['total'] and stats['missing'] == 0 and stats['corrupted'] == 0
+            and stats['errors'] == 0 and missing_config_count == 0):
         print(f"{Colors.GREEN}[SUCCESS] All files verified successfully!{Colors.RESET}")
         print(f"{Colors.GREEN}[INFO] Package integrity confirmed - all files are present and correct{Colors.RESET}")
         if extra_files_count == 0:
@@ -234,10 +422,25 @@ def print_summary(stats, extra_files_count):
             print(f"{Colors.RED}[ACTION] {stats['corrupted']} files are corrupted - re-download the package{Colors.RESET}")
         if stats['errors'] > 0:
             print(f"{Colors.YELLOW}[ACTION] {stats['errors']} files had verification errors{Colors.RESET}")
+        if missing_config_count > 0:
+            print(f"{Colors.RED}[ACTION] {missing_config_count} files listed in version_config.json "
+                  f"are missing - re-extract the package{Colors.RESET}")
         return False
 
+def parse_arguments():
+    """Parse command line arguments"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Verify AI Environment file integrity')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                       help=f'Number of hashing threads (default: {default_jobs()})')
+    parser.add_argument('--full', action='store_true',
+                       help='Ignore the checksum cache and rehash every file')
+    return parser.parse_args()
+
 def main():
     """Main function"""
+    args = parse_arguments()
     print_header()
     
     # Load expected checksums
@@ -250,13 +453,16 @@ def main():
     print()
     
     # Verify files
-    stats = verify_files(expected_checksums)
+    cache = {} if args.full else load_hash_cache()
+    stats = verify_files(expected_checksums, args.jobs, cache)
+    # Keep only entries for files still listed in the manifest
+    save_hash_cache({path: entry for path, entry in cache.items() if path in expected_checksums})
     
     # Check for extra files
-    extra_files_count = check_extra_files()
+    extra_files_count, missing_config_count = check_extra_files(expected_checksums)
     
     # Print summary
-    success = print_summary(stats, extra_files_count)
+    success = print_summary(stats, extra_files_count, missing_config_count)
     
     print("================================================================")
     print("                 CHECKSUM VERIFICATION COMPLETE")